@@ -0,0 +1,7 @@
+
+#-----------------------------------------------------#
+#                  Pages de l'application             #
+#-----------------------------------------------------#
+
+# Une page par module, importé seulement quand la page est sélectionnée dans la barre latérale
+# (dossier nommé app_pages et non pages : Streamlit transformerait pages/ en navigation multipage)
@@ -0,0 +1,141 @@
+
+#-----------------------------------------------------#
+#                      Imports                        #
+#-----------------------------------------------------#
+
+import os                                               # Appeler l'API securisé
+import streamlit as st                                  # Neccessaire pour utilier Streamlit
+import streamlit.components.v1 as components            # Utiliser pour le scroll up automatique (utilisé dans fonction)
+from dotenv import load_dotenv                          # Masquer l'API utilisé
+import instrumentation                                  # Panneau de diagnostic et endpoint /metrics
+from instrumentation import cached                      # Compteurs de cache
+
+#-----------------------------------------------------#
+#                   Global Variables                  #
+#-----------------------------------------------------#
+
+# Recolte de la map souhaité (pour les pages VCub et Bus • Tram •BatCub)
+load_dotenv()                                                                                   # Securisation de l'API
+map_api_key = os.getenv("maptiler_api_key")                                                     # Appel de la cle API securisé
+maptiler_tile = f"https://api.maptiler.com/maps/dataviz/{{z}}/{{x}}/{{y}}.png?key={map_api_key}"  # Url de ma map
+#maptiler_tile = "https://api.maptiler.com/maps/openstreetmap/{z}/{x}/{y}.jpg?key={map_api_key}"  # 2ème choix de map
+
+# Mode tuiles vectorielles (optionnel) : activé par vector_tiles=1 dans le .env, archive créée par vector_tiles.py
+use_vector_tiles = os.getenv("vector_tiles") == "1" and os.path.exists('./Data/tiles.mbtiles')
+# URL publique du serveur de tuiles vectorielles (ex. https://mon-domaine.fr/tiles, servi par tile_server.py derrière
+# le reverse proxy) ; sans elle, chaque processus démarre un serveur local, lisible seulement depuis la machine
+vector_tiles_url = os.getenv("vector_tiles_url")
+
+# Proxy des tuiles MapTiler (optionnel) : activé par tile_proxy=1 dans le .env ; URL publique du proxy commun
+# (ex. https://mon-domaine.fr/basemap, python tile_proxy.py serve derrière le reverse proxy), sinon proxy local par processus
+use_tile_proxy = os.getenv("tile_proxy") == "1"
+tile_proxy_url = os.getenv("tile_proxy_url")
+
+# Jeux de données partagés entre processus (optionnel) : activé par shared_data=1 dans le .env, publiés par
+# python shared_data.py publish ; l'application relit la version publiée au plus toutes les shared_data_ttl secondes
+use_shared_data = os.getenv("shared_data") == "1"
+shared_data_ttl = 30
+
+#-----------------------------------------------------#
+#                     Functions                       #
+#-----------------------------------------------------#
+
+# Logos et images lus une seule fois par processus (plus de lecture / décodage à chaque rerun)
+@cached(st.cache_resource(show_spinner=False))
+def load_image(file_path):
+    """Raw bytes of an image file, shared by every session"""
+    with open(file_path, 'rb') as file:
+        return file.read()
+
+# Fonction pour charger les fun facts à partir du fichier .txt (Temps d'attente / U.X), une fois par processus
+@cached(st.cache_resource(show_spinner=False))
+def load_facts(file_path):
+    try:
+        with open(file_path, 'r', encoding='utf-8') as file:
+            facts = file.read().splitlines()
+        return facts
+    except FileNotFoundError:
+        st.error("Fait amusant non disponible...")
+        return []
+
+# Adresse des tuiles vectorielles : URL publique si elle est configurée, sinon serveur local démarré une seule fois
+# par processus sur un port libre (aucun conflit entre plusieurs processus de l'application)
+@st.cache_resource(show_spinner=False)
+def load_tile_server():
+    """Base URL of the vector tile server (public URL, or a local server started on a free port)"""
+    if vector_tiles_url:
+        return vector_tiles_url.rstrip('/')
+    from tile_server import start_tile_server
+    server = start_tile_server()
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}"
+
+# Adresse du proxy / cache des tuiles MapTiler : URL publique si elle est configurée, sinon proxy local démarré
+# une seule fois par processus sur un port libre (la clé API reste côté serveur, les tuiles ne sont téléchargées qu'une fois)
+@st.cache_resource(show_spinner=False)
+def load_tile_proxy():
+    """Base URL of the MapTiler tile proxy (public URL, or a local proxy started on a free port)"""
+    if tile_proxy_url:
+        return tile_proxy_url.rstrip('/')
+    from tile_proxy import start_tile_proxy
+    return start_tile_proxy(maptiler_tile)
+
+# Fond de carte des cartes mises en cache sur disque : adresse fictive, remplacée par le vrai fond de carte à l'affichage
+# (la clé API MapTiler et le port du proxy local n'entrent ni dans les clés ni dans le contenu du cache disque)
+basemap_placeholder = 'https://basemap.invalid/{z}/{x}/{y}.png'
+
+def with_basemap(html, tile):
+    """Replace the placeholder basemap of a cached map HTML with the actual tile URL"""
+    return html.replace(basemap_placeholder, tile)
+
+# Fond de carte des pages VCub et Bus • Tram • BatCub (proxy démarré au premier affichage d'une carte)
+def basemap_tile():
+    """Tile URL of the basemap, through the tile proxy when enabled"""
+    if use_tile_proxy:
+        return f"{load_tile_proxy()}/tiles/{{z}}/{{x}}/{{y}}.png"
+    return maptiler_tile
+
+# Version publiée d'un jeu de données partagé (None s'il n'est pas encore publié)
+# (lecture seule du pointeur, sans verrou ni publication : une nouvelle version est vue au plus tard après shared_data_ttl)
+@cached(st.cache_data(show_spinner=False, ttl=shared_data_ttl))
+def shared_data_version(name):
+    """Current published version of a shared dataset"""
+    from shared_data import DataService
+    return DataService().current_version(name)
+
+# Endpoint /metrics de l'instrumentation (instrumentation_endpoint=1 dans le .env), démarré une seule fois par processus
+# sur un port libre : chaque processus expose ses propres mesures sans conflit ; l'adresse est affichée dans le panneau
+# de diagnostic et écrite dans le journal structuré
+@st.cache_resource(show_spinner=False)
+def load_metrics_server():
+    """Start the metrics endpoint on a free port and return its URL"""
+    server = instrumentation.start_metrics_server()
+    host, port = server.server_address[:2]
+    url = f"http://{host}:{port}/metrics"
+    instrumentation.log_run({'event': 'metrics_endpoint', 'pid': os.getpid(), 'url': url})
+    return url
+
+# Panneau de diagnostic (barre latérale) : mesures de la dernière exécution et agrégats du processus
+def render_debug_panel(page_run):
+    metrics_url = load_metrics_server() if os.getenv("instrumentation_endpoint") == "1" else None
+    if not st.toggle('Diagnostic des performances'):
+        return
+    if metrics_url:
+        st.caption(f"Endpoint : {metrics_url}")
+    st.markdown("**Dernière exécution**")
+    st.json(page_run, expanded=False)
+    st.markdown("**Processus**")
+    st.json(instrumentation.metrics.snapshot(), expanded=False)
+
+# Fonction pour remonter en haut de page (Applicable sur une seul page malheureusement)
+def scroll_to_top():
+    components.html(
+        """
+        <script>
+        const anchor = document.createElement('a');
+        anchor.setAttribute('href', '#');
+        anchor.click();
+        </script>
+        """,
+        height=0
+    )
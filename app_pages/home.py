@@ -0,0 +1,18 @@
+
+#-----------------------------------------------------#
+#                      Imports                        #
+#-----------------------------------------------------#
+
+import streamlit as st                                  # Neccessaire pour utilier Streamlit
+from app_pages.common import load_image                 # Logo lu une seule fois par processus
+
+#-----------------------------------------------------#
+#                    Pages HOME                       #
+#-----------------------------------------------------#
+
+# Page d'accueil (aucune dépendance géographique : pandas, geopandas et folium ne sont pas importés)
+def render():
+    # Créer 3 colonnes invisible pour centrer le logo en utilisant celle du milieu
+    col1, col2, col3 = st.columns([1, 6, 1])
+    with col2:
+        st.image(load_image('./Images/Logo_live_sync.png'), use_column_width=True)
@@ -0,0 +1,242 @@
+
+#-----------------------------------------------------#
+#                      Imports                        #
+#-----------------------------------------------------#
+
+import random                                           # Affichage aléatoire des funfacts pendant le temps de chargement de carte
+import streamlit as st                                  # Neccessaire pour utilier Streamlit
+import streamlit.components.v1 as components            # Affichage du HTML de la carte déjà rendu
+import geopandas as gpd                                 # Traiter les données Géospatial
+from streamlit_folium import st_folium                  # Carte interactive (formes dessinées)
+import instrumentation                                  # Durées des étapes, caches et taille du HTML (si activé)
+from instrumentation import cached, span                # Compteurs de cache et chronomètres
+from spatial_index import SpatialIndex, query_drawing, station_positions  # Requêtes spatiales sur les formes dessinées
+from network_delay import delay_statistics, late_lines_by_threshold  # Statistiques de retard des lignes
+from network_map import build_network_map, file_digest, render_map_html  # Carte Bus • Tram • BatCub
+from network_simplify import current_lod_path, network_lod_zoom  # Niveau de détail précalculé des lignes (s'il est à jour)
+from shared_data import DataService, read_network       # Lignes du réseau partagées entre processus
+from app_pages.common import (
+    basemap_placeholder, basemap_tile, load_facts, load_tile_server, scroll_to_top, shared_data_version, use_shared_data,
+    use_vector_tiles, with_basemap,
+)
+
+#-----------------------------------------------------#
+#                     Functions                       #
+#-----------------------------------------------------#
+
+# Fichier des lignes Bus, Tram et BatCub : niveau de détail simplifié s'il est à jour, sinon fichier brut
+# (vérifié à chaque exécution : un nouveau fichier brut n'est jamais masqué par un niveau de détail plus ancien)
+def network_data_path():
+    """Path of the network lines file to display"""
+    return current_lod_path(network_lod_zoom)
+
+# Version des lignes du réseau : version publiée du service partagé, ou empreinte du fichier GeoJSON
+def network_data_version():
+    """Cache key of the current network data"""
+    shared = shared_data_version('network') if use_shared_data else None
+    if shared:
+        return f'shared-{shared}'
+    return file_digest(network_data_path())
+
+# Chargement des données Bus, Tram et BatCub (table partagée ou fichier GeoJSON), une fois par processus et par version
+# (cache_resource : plus de copie du GeoDataFrame à chaque appel ; les fonctions appelantes ne le modifient pas)
+@cached(st.cache_resource(show_spinner=False, max_entries=2))
+def load_network_frame(version):
+    """GeoDataFrame of the network lines for one data version"""
+    if version.startswith('shared-'):
+        return read_network(DataService(), version.split('-', 1)[1])
+    return gpd.read_file(network_data_path())
+
+# Carte Bus • Tram • BatCub rendue une seule fois par version du fichier de données
+# (les lignes sont lues pour cette même version : un nouveau fichier produit une nouvelle entrée de cache
+#  construite à partir des nouvelles lignes ; le seuil de retard est appliqué dans le navigateur).
+# Rendue avec le fond de carte fictif basemap_placeholder : ni la clé API ni l'adresse du proxy ne sont écrites
+# dans le cache disque, le fond de carte est inséré par with_basemap à l'affichage
+@cached(st.cache_data(show_spinner=False, persist='disk', max_entries=8))
+def load_network_map_html(data_version):
+    """Render the network map HTML with the placeholder basemap, cached on the data version"""
+    gdf = load_network_frame(data_version)
+    return render_map_html(build_network_map(gdf, basemap_placeholder))
+
+# Statistiques de retard (percentiles, classes, agrégats par véhicule), une fois par version des données
+@cached(st.cache_data(show_spinner=False))
+def load_delay_statistics(data_version):
+    """Delay statistics of the network lines"""
+    return delay_statistics(load_network_frame(data_version))
+
+# Lignes en retard pour chaque seuil du contrôle de la carte à tuiles vectorielles, une fois par version des données
+@cached(st.cache_data(show_spinner=False))
+def load_late_lines(data_version):
+    """Late lines per vehicle type for every threshold of the map delay control"""
+    return late_lines_by_threshold(load_network_frame(data_version))
+
+# Archive de tuiles vectorielles construite à partir du fichier des lignes actuel ; sinon la carte GeoJSON est affichée
+# (une archive périmée n'est jamais servie : python vector_tiles.py la reconstruit)
+def current_tile_archive():
+    """True when the vector tile archive matches the network lines file"""
+    from vector_tiles import tile_archive_is_current
+    if tile_archive_is_current():
+        return True
+    st.warning("Archive de tuiles vectorielles périmée : carte GeoJSON affichée (relancer python vector_tiles.py)")
+    return False
+
+# Carte Bus • Tram • BatCub (objet folium) pour l'affichage interactif, une fois par version des données
+@cached(st.cache_resource(show_spinner=False, max_entries=4))
+def load_network_map(data_version, tile):
+    """Build the network folium map, cached on (data version, tile)"""
+    return build_network_map(load_network_frame(data_version), tile)
+
+# Index spatial des stations VCub (dernière position connue) et des lignes, une fois par version des deux jeux de données
+@cached(st.cache_resource(show_spinner=False, max_entries=2))
+def load_spatial_index(data_version, vcub_version):
+    """STRtree index over VCub stations and network lines"""
+    from app_pages.vcub import load_v3_store  # Store VCub partagé avec la page VCub (importé seulement en mode spatial)
+    store = load_v3_store(vcub_version)
+    return SpatialIndex(station_positions(store.day(store.dates[-1][0])), load_network_frame(data_version))
+
+# Fonctions pour la description de la page 3
+def render_page_3_description():
+    return """
+        <div style="text-align: justify; background-color: #f5f5f5; padding: 20px; border-radius: 10px; border: 2px solid #000;">
+            <h2 style="text-align: center;">Bus • Tram • BatCub</h2>
+            <p>Dans la continuité des 14 jours de données que nous avons explorés, découvrez maintenant les lignes de Bus, Tram et BatCub de la métropole bordelaise.
+                Chaque véhicule est associé à une couleur distincte pour les identifier facilement sur la carte.
+                En changeant de couche, vous avez la possibilité de sélectionner quel type de véhicule vous souhaitez afficher.
+                De plus, vous pouvez desactiver / activer la visualisation des lignes en retard, qui apparaissent en rouge pour une identification rapide.</p>
+        </div>
+    """
+
+# Titre de presentation Rapport d'analyse Bus • Tram • BatCub
+def render_powerbi_info_2():
+    return """
+    <div style="margin-top: 20px; text-align: center; background-color: #f5f5f5; padding: 20px; border-radius: 10px; border: 2px solid #000;">
+        <h2>Rapport d'analyse Bus • Tram • BatCub</h2>
+        <p>Pour visualiser ce rapport, veuillez vous connecter à un compte Power BI</p>
+    </div>
+    """
+
+# Affichage du raport Bus • Tram • BatCub
+def render_powerbi_iframe():
+    return """
+    <div style="width: 1000px; height: 1200px; overflow: hidden; position: relative;">
+        <iframe
+            title="TRAM • BUS • BATEAU"
+            width="945"
+            height="2000"
+            src="https://app.powerbi.com/reportEmbed?reportId=7f601950-66d2-4060-840b-21740784a6dc&autoAuth=true&ctid=5892e2db-e39d-4cc1-a179-dc66550efc30"
+            frameborder="0"
+            allowfullscreen
+            style="position: absolute;">
+        </iframe>
+    </div>
+    """
+
+#-----------------------------------------------------#
+#              Pages Bus • Tram • VCub                #
+#-----------------------------------------------------#
+
+# Début de la page "Bus • Tram • BatCub"
+def render():
+    scroll_to_top()
+
+    st.markdown(render_page_3_description(), unsafe_allow_html=True)
+
+    # Espace pour la mise en page
+    st.markdown("""<div style="height: 20px;"></div>""", unsafe_allow_html=True)
+
+    # Charger les faits (lus une seule fois par processus)
+    facts = load_facts("./facts.txt")
+
+    # Conteneur temporaire pour le fait
+    fact_container = st.empty()
+
+    # Sélectionner un fait aléatoire
+    random_fact = random.choice(facts) if facts else ''
+    fact_container.markdown(f"""
+        <div style="background-color:#f0f2f6; padding:10px; border-radius:10px;">
+            <h4 style="color:#0078D4;"><i class="fas fa-lightbulb"></i>💡 Le saviez-vous ?</h4>
+            <p>{random_fact}</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+    # Espace pour la mise en page
+    st.markdown("""<div style="height: 20px;"></div>""", unsafe_allow_html=True)
+
+    # Suite de la page "Bus • Tram • BatCub"
+    with st.spinner('Chargement de la carte ...'):
+        new_tile = basemap_tile()
+        data_version = network_data_version()
+
+        # Carte déjà rendue en HTML, mise en cache selon la version des données et le fond de carte
+        # (le seuil de retard se règle sur la carte elle-même, sans rerun ni rechargement de la carte)
+        # Analyse spatiale : la carte renvoie les formes dessinées à l'application
+        spatial_mode = st.toggle('Analyse spatiale des formes dessinées')
+
+        if spatial_mode:
+            # Afficher la carte interactive (les formes dessinées sont renvoyées à chaque modification)
+            with span('network.map_build'):
+                network_map = load_network_map(data_version, new_tile)
+            with span('network.st_folium'):
+                drawing = st_folium(network_map, width=945, height=450, returned_objects=['last_active_drawing'])
+        else:
+            with span('network.map_html'):
+                if use_vector_tiles and current_tile_archive():
+                    from vector_tiles import build_network_tile_map
+                    network_map_html = render_map_html(
+                        build_network_tile_map(load_tile_server(), new_tile, late_lines=load_late_lines(data_version))
+                    )
+                else:
+                    network_map_html = with_basemap(load_network_map_html(data_version), new_tile)
+            instrumentation.payload('network.map_html', network_map_html)
+
+            # Afficher la carte dans Streamlit (HTML identique d'un rerun à l'autre : la carte n'est pas rechargée)
+            components.html(network_map_html, width=945, height=460)
+
+        # Statistiques de retard : percentiles et agrégats précalculés (indépendants du seuil ; le nombre de lignes
+        # au-delà du seuil est affiché dans le contrôle des retards de la carte, seul réglage du seuil)
+        with st.expander('Statistiques de retard'), span('network.delay_stats'):
+            delay_stats = load_delay_statistics(data_version)
+            col1, col2 = st.columns(2)
+            with col1:
+                st.dataframe(delay_stats['percentiles'].rename('retard (s)'), use_container_width=True)
+                st.dataframe(delay_stats['classes'], use_container_width=True)
+            with col2:
+                st.dataframe(delay_stats['by_vehicle'], use_container_width=True)
+                st.caption('Lignes au-delà du seuil choisi : voir le contrôle des retards, en bas à gauche de la carte')
+
+        # Résultats des requêtes spatiales pour la dernière forme dessinée
+        if spatial_mode:
+            feature = (drawing or {}).get('last_active_drawing')
+            if feature:
+                distance_m = st.slider('Distance autour de la forme (m)', 0, 1000, 300, step=50)
+                with span('network.spatial_query'):
+                    from app_pages.vcub import v3_data_version
+                    spatial_index = load_spatial_index(data_version, v3_data_version())
+                    results = query_drawing(spatial_index, feature, distance_m)
+                st.markdown(f"**Stations VCub à moins de {distance_m} m :** {len(results['stations'])}")
+                st.dataframe(results['stations'], use_container_width=True, hide_index=True)
+                st.markdown(f"**Lignes traversant la forme :** {len(results['lines'])}")
+                st.dataframe(results['lines'], use_container_width=True, hide_index=True)
+                if 'nearest' in results:
+                    st.markdown("**Stations VCub les plus proches :**")
+                    st.dataframe(results['nearest'], use_container_width=True, hide_index=True)
+            else:
+                st.info("Dessinez un polygone, un rectangle, un cercle ou un marqueur sur la carte.")
+
+        # Ajout d'un espace pour la mise en page
+        st.markdown("""<div style="margin-bottom: 10px;"></div>""", unsafe_allow_html=True)
+
+        # Ligne horizontale pour marquer la transition
+        st.markdown("---")
+
+        # Ajout d'un espace pour la mise en page
+        st.markdown("""<div style="margin-bottom: 10px;"></div>""", unsafe_allow_html=True)
+
+    # Effacer le fait après le chargement
+    fact_container.empty()
+
+    #------------- Tableau de bord Power BI --------------#
+
+    st.markdown(render_powerbi_info_2(), unsafe_allow_html=True)               # Texte d'information pour visualiser le rapport
+    st.markdown("<div style='height: 20px;'></div>", unsafe_allow_html=True)   # Ajout d'un espace
+    st.markdown(render_powerbi_iframe(), unsafe_allow_html=True)               # Affichage du rapport d'analyse VCub
@@ -0,0 +1,301 @@
+
+#-----------------------------------------------------#
+#                      Imports                        #
+#-----------------------------------------------------#
+
+import os                                               # Agrégats matérialisés et URL de la vidéo (.env)
+import streamlit as st                                  # Neccessaire pour utilier Streamlit
+import pandas as pd                                     # Manipulation des bases de données
+import streamlit.components.v1 as components            # Affichage du HTML de la carte rendu une seule fois
+import instrumentation                                  # Durées des étapes, caches et taille du HTML (si activé)
+from instrumentation import cached, span                # Compteurs de cache et chronomètres
+from vcub_map import (                                  # Création de la carte des stations VCub
+    create_v3_map, create_v3_playback_map, build_day_playback, build_grid_levels, create_v3_diff_map,
+)
+from vcub_diff import station_matrix                    # Variations des stations entre deux instants
+from vcub_precompute import read_artifact               # Instantanés pré-rendus par vcub_precompute.py
+from vcub_data import (                                 # Index des instantanés VCub par (date, heure)
+    SnapshotStore, PartitionedSnapshotStore, load_vcub_frame, partitions_version, vcub_data_version,
+    vcub_partition_root,
+)
+from shared_data import DataService, read_vcub           # Relevé VCub partagé entre processus (memory-map)
+from vcub_analytics import RollupEngine, rollup_path     # Agrégats VCub natifs (occupation, rotation, ...)
+from network_map import render_map_html                 # Sérialisation HTML de la carte folium
+from app_pages.common import (                          # Fond de carte, tuiles locales et données partagées
+    basemap_tile, load_tile_server, shared_data_version, use_shared_data, use_vector_tiles,
+)
+
+#-----------------------------------------------------#
+#                   Global Variables                  #
+#-----------------------------------------------------#
+
+# Vidéo de présentation des stations VCub
+video_path = './Video/VCub_video.mp4'
+
+#-----------------------------------------------------#
+#                     Functions                       #
+#-----------------------------------------------------#
+
+# Vidéo lue une seule fois par processus (fichier fermé après lecture)
+# (st.video la confie au gestionnaire de médias de Streamlit : une seule copie, servie par /media avec les requêtes Range)
+@cached(st.cache_resource(show_spinner=False))
+def load_video(file_path):
+    """Raw bytes of the video, shared by every session"""
+    with open(file_path, 'rb') as file:
+        return file.read()
+
+# Version des données VCub : partitions du collecteur, version publiée du service partagé ou version du CSV (cache Feather)
+# (une nouvelle publication est prise en compte sans redémarrage ; tant que rien n'est publié, le cache Feather est utilisé)
+def v3_data_version():
+    """Cache key of the current VCub data"""
+    partitions = partitions_version(vcub_partition_root)
+    if partitions:
+        return f'partitions-{partitions}'
+    shared = shared_data_version('vcub') if use_shared_data else None
+    if shared:
+        return f'shared-{shared}'
+    return f'feather-{vcub_data_version()}'
+
+# Chargement des données VCube (partitions du collecteur, table partagée ou cache binaire colonne) et indexation par instantané
+# (cache_resource : le store est partagé entre les sessions, sans copie à chaque appel ; l'ancienne version
+#  reste utilisable par les sessions en cours après une publication)
+@cached(st.cache_resource(show_spinner=False, max_entries=2))
+def load_v3_store(version):
+    """Load V3 data as a SnapshotStore for one data version"""
+    if version.startswith('partitions-'):
+        return load_partitioned_store()
+    if version.startswith('shared-'):
+        return SnapshotStore(read_vcub(DataService(), version.split('-', 1)[1]))
+    return SnapshotStore(load_vcub_frame())
+
+# Store des partitions unique par processus : il relit lui-même les journées modifiées par le collecteur,
+# les journées déjà lues restent en cache d'une version des partitions à la suivante
+@cached(st.cache_resource(show_spinner=False))
+def load_partitioned_store():
+    """Self-refreshing store over the collector's day partitions"""
+    return PartitionedSnapshotStore(vcub_partition_root)
+
+def load_v3_data():
+    """SnapshotStore of the current VCub data"""
+    return load_v3_store(v3_data_version())
+
+# Journée VCub encodée pour la lecture animée côté navigateur (une fois par date et par version des données)
+@cached(st.cache_data(show_spinner=False))
+def load_v3_playback(date, version):
+    """Delta-encoded playback data of one VCub day"""
+    return build_day_playback(load_v3_store(version).day(date))
+
+# Grille agrégée d'un instantané, précalculée une fois pour tous les zooms
+@cached(st.cache_data(show_spinner=False, max_entries=64))
+def load_v3_grid(date, time, version):
+    """Zoom-dependent aggregated cells of one VCub snapshot"""
+    return build_grid_levels(load_v3_store(version).snapshot(date, time))
+
+# Matrice instantané x station des journées comparées (une seule lecture par couple de dates)
+@cached(st.cache_resource(show_spinner=False, max_entries=8))
+def load_v3_matrix(dates, version):
+    """StationMatrix over a tuple of VCub dates"""
+    return station_matrix(load_v3_store(version), dates)
+
+# Agrégats VCub matérialisés par vcub_analytics.py (rechargés seulement quand le fichier change)
+@cached(st.cache_data(show_spinner=False))
+def load_v3_rollups(rollup_version):
+    """Per-station and per-hour VCub indicators"""
+    engine = RollupEngine.load()
+    return engine.station_rollup(), engine.hourly_rollup()
+
+# Titre de presentation de l'analyse VCub native
+def render_v3_analysis_info():
+    return """
+    <div style="margin-top: 20px; text-align: center; background-color: #f5f5f5; padding: 20px; border-radius: 10px; border: 2px solid #000;">
+        <h2>Indicateurs VCub</h2>
+        <p>Taux d'occupation, durées à vide ou pleine, part de vélos électriques et rotation, calculés sur l'ensemble des relevés</p>
+    </div>
+    """
+# Titre de presentation Rapport d'analyse VCub
+def render_powerbi_info():
+    return """
+    <div style="margin-top: 20px; text-align: center; background-color: #f5f5f5; padding: 20px; border-radius: 10px; border: 2px solid #000;">
+        <h2>Rapport d'analyse VCub</h2>
+        <p>Pour visualiser ce rapport, veuillez vous connecter à un compte Power BI</p>
+    </div>
+    """
+# Affichage du rapport VCub
+def render_powerbi_report_vcub():
+    return """
+    <div style="width: 1000px; height: 650px; overflow: hidden; position: relative;">
+        <iframe
+            title="V3"
+            width="980"
+            height="600"
+            src="https://app.powerbi.com/reportEmbed?reportId=a5a6fa02-137c-48ca-9754-8467b7366089&autoAuth=true&ctid=5892e2db-e39d-4cc1-a179-dc66550efc30"
+            frameborder="0"
+            allowfullscreen
+            style="position: absolute;">
+        </iframe>
+    </div>
+    """
+
+#-----------------------------------------------------#
+#                    Pages VCub                       #
+#-----------------------------------------------------#
+
+# Page VCub
+def render():
+
+    # Présentation de la visualisation des besoins en vélos VCub (justifié)
+    st.markdown("""
+    <div style="text-align: justify; background-color: #f5f5f5; padding: 20px; border-radius: 10px; border: 2px solid #000;">
+        <h2 style="text-align: center;">Visualisation en temps réel des besoins en vélos VCub</h2>
+        <p>Cette carte offre une visualisation en temps réel des besoins en vélos classiques et électriques VCub. Les données sont collectées en temps réel à différents intervalles en fonction des jeux de données disponibles, puis affichées en temps réel sur la carte.</p>
+        <p>La taille du cercle représente la disponibilité des vélos : plus le cercle est grand, plus il y a de vélos disponibles, et plus il est petit, moins il y a de vélos disponibles. La couleur du cercle indique également l'état de la station.</p>
+        <p>Pour une expérience plus immersive, placez le curseur à 4 minutes lors de la fête nationale du 14 juillet, entre 20 heures et 3 heures du matin, sur la place du Miroir d'Eau, lieu habituel pour admirer le feu d'artifice, où les stations connaissent un mouvement considérable.</p>
+        <p>La collecte de données a été volontairement interrompue après 14 jours en raison de limitations matérielles.</p>
+    </div>
+    <div style="margin-bottom: 20px;"></div>
+""", unsafe_allow_html=True)
+
+    # Affichage de la vidéo : URL externe (video_url dans le .env) ou copie unique en mémoire partagée par les sessions
+    st.video(os.getenv("video_url") or load_video(video_path))
+
+
+    # Ligne horizontale pour marquer la transition
+    st.markdown("---")
+
+    # Ajout d'un espace
+    st.markdown("""<div style="margin-bottom: 20px;"></div>""", unsafe_allow_html=True)
+
+    # Présentation de la deuxième démonstration
+    st.markdown("""
+    <div style="text-align: justify; background-color: #f5f5f5; padding: 20px; border-radius: 10px; border: 2px solid #000;">
+        <h2 style="text-align: center;">Exploration des données VCub</h2>
+        <p>Dans cette démonstration, vous avez la possibilité de choisir parmi les 14 jours de données sur l'utilisation des vélos classiques et électriques VCub dans la métropole bordelaise.</p>
+        <p>Sélectionnez une date et une heure pour afficher la disponibilité des vélos sur la carte interactive.</p>
+        <p>En cliquant sur une station (extrémité du cercle), vous pouvez obtenir des détails sur le nombre de vélos disponibles, ainsi que le nombre de places que peut accueillir la station.</p>
+        <p>Explorez les variations de la demande VCub au fil du temps !</p>
+    </div>
+""", unsafe_allow_html=True)
+
+    # Ajout d'un espace
+    st.markdown("""<div style="margin-bottom: 20px;"></div>""", unsafe_allow_html=True)
+
+    # Témoin de chargement
+    with st.spinner('Chargement de la carte ...'):
+
+        # Chargement des données VCub (indexées par date et heure)
+        with span('vcub.load'):
+            data_version = v3_data_version()
+            store = load_v3_store(data_version)
+        # Ajout d'un espace
+        st.markdown("""<div style="margin-bottom: 20px;"></div>""", unsafe_allow_html=True)
+
+        # Dates formatées uniques, déjà triées par le store
+        unique_dates = store.dates[1:]
+
+        # Liste déroulante pour des dates formaté
+        selected_date = st.selectbox('Selectionnez une date :',
+                                     unique_dates, format_func=lambda x: x[1] if x != 'Selectionnez une date..' else x)
+
+        # Heures de la date choisie, déjà triées par le store (seule la partition de cette date est lue)
+        unique_times = store.times_for(selected_date[0])
+
+        # Lecture animée de toute la journée (aucun aller-retour serveur par pas de temps)
+        playback = st.toggle('Lecture animée de la journée')
+
+        # Stations regroupées par cellule de grille selon le zoom (nombre de points affichés borné)
+        grid_mode = st.toggle('Regrouper les stations (grille selon le zoom)', disabled=playback)
+
+        # Liste déroulante des heures uniques
+        selected_time = st.selectbox('Selectionnez une heure :', options=unique_times, disabled=playback)
+
+        # Comparaison avec un instant de référence : seules les stations modifiées sont affichées
+        compare = st.toggle('Comparer avec un autre instant', disabled=playback)
+        if compare and not playback:
+            col1, col2 = st.columns(2)
+            with col1:
+                reference_date = st.selectbox('Date de référence :', unique_dates,
+                                              index=unique_dates.index(selected_date), format_func=lambda x: x[1])
+            reference_times = store.times_for(reference_date[0])
+            with col2:
+                reference_time = st.selectbox(
+                    'Heure de référence :', reference_times,
+                    index=max(0, reference_times.index(selected_time) - 1) if selected_time in reference_times else 0,
+                )
+
+        # Ajout d'un espace
+        st.markdown("""<div style="margin-bottom: 20px;"></div>""", unsafe_allow_html=True)
+
+        # Application de la carte jour ou nuit en fonction du lévé et coucher du soleil (Période réel)
+        if '06:20' <= selected_time < '21:40':
+            selected_tile = basemap_tile()
+        else:
+            selected_tile = 'CartoDB dark_matter'
+
+        # Instantané correspondant à la date et à l'heure sélectionnées (accès direct, sans filtrage)
+        with span('vcub.filter'):
+            filtered_data = (
+                store.snapshot(selected_date[0], selected_time)
+                if selected_date != 'Selectionnez une date..' else pd.DataFrame()
+            )
+
+        # Création de la carte interactive VCub (client léger des tuiles locales si le mode est activé)
+        with span('vcub.map_build'):
+            if playback and selected_date != 'Selectionnez une date..':
+                m = create_v3_playback_map(load_v3_playback(selected_date[0], data_version), selected_tile)
+            elif compare and selected_date != 'Selectionnez une date..':
+                matrix = load_v3_matrix(tuple(sorted({reference_date[0], selected_date[0]})), data_version)
+                changes = matrix.diff((reference_date[0], reference_time), (selected_date[0], selected_time))
+                m = create_v3_diff_map(changes, selected_tile)
+            elif grid_mode and selected_date != 'Selectionnez une date..':
+                grid = load_v3_grid(selected_date[0], selected_time, data_version)
+                m = create_v3_map(filtered_data, selected_tile, mode='grid', grid=grid)
+            elif use_vector_tiles and selected_date != 'Selectionnez une date..':
+                from vector_tiles import create_v3_tile_map
+                m = create_v3_tile_map(load_tile_server(), selected_date[0], selected_time, selected_tile)
+            else:
+                # Artefact pré-rendu s'il existe (aucune construction du GeoJSON dans la requête)
+                artifact = read_artifact(selected_date[0], selected_time) if selected_date != 'Selectionnez une date..' else None
+                m = create_v3_map(filtered_data, selected_tile, geojson=artifact)
+
+        # Affichage de la carte interactive VCub (même HTML que folium_static, sérialisé une fois et mesuré)
+        with span('vcub.html_serialize'):
+            map_html = instrumentation.payload('vcub.map_html', render_map_html(m))
+        components.html(map_html, width=945, height=460)
+
+        # Bilan de la comparaison et stations les plus actives sur une fenêtre glissante
+        if compare and not playback and selected_date != 'Selectionnez une date..':
+            col1, col2, col3, col4, col5 = st.columns(5)
+            col1.metric('Stations modifiées', len(changes))
+            col2.metric('Vélos gagnés', int(changes['delta_velos'].clip(lower=0).sum()))
+            col3.metric('Vélos perdus', int(-changes['delta_velos'].clip(upper=0).sum()))
+            col4.metric('Devenues vides', int(changes['devenue_vide'].sum()))
+            col5.metric('Devenues pleines', int(changes['devenue_pleine'].sum()))
+            with st.expander('Stations les plus actives'):
+                window = st.slider('Fenêtre (nombre de relevés avant l\'heure choisie)', 1, 48, 6)
+                st.dataframe(matrix.hotspots((selected_date[0], selected_time), window),
+                             use_container_width=True, hide_index=True)
+
+        # Ligne de séparation de sujet
+        st.markdown("---")
+
+    #---------------- Analyse VCub native ----------------#
+
+        st.markdown(render_v3_analysis_info(), unsafe_allow_html=True)           # Présentation de l'analyse native
+        st.markdown("<div style='height: 20px;'></div>", unsafe_allow_html=True) # Ajout d'un espace
+        if os.path.exists(rollup_path):
+            station_rollup, hourly_rollup = load_v3_rollups(os.path.getmtime(rollup_path))
+
+            # Taux d'occupation moyen et part de VCub électriques par heure de la journée
+            st.bar_chart(hourly_rollup[['occupancy_rate', 'elec_share']])
+
+            # Stations le plus souvent vides (durée cumulée) avec leurs autres indicateurs
+            st.dataframe(station_rollup.sort_values('empty_hours', ascending=False).head(15), use_container_width=True)
+        else:
+            st.info("Agrégats non disponibles : lancez `python vcub_analytics.py` pour les calculer.")
+        st.markdown("---")
+
+    #------------- Tableau de bord Power BI --------------#
+
+        st.markdown(render_powerbi_info(), unsafe_allow_html=True)               # Texte d'information pour visualiser le rapport
+        st.markdown("<div style='height: 20px;'></div>", unsafe_allow_html=True) # Ajout d'un espace
+        st.markdown(render_powerbi_report_vcub(), unsafe_allow_html=True)        # Affichage du rapport d'analyse VCub
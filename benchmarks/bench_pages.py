@@ -0,0 +1,219 @@
+
+#-----------------------------------------------------#
+#    Benchmark : pages VCub et Bus • Tram • BatCub    #
+#-----------------------------------------------------#
+
+# Usage : python benchmarks/bench_pages.py [--scales 14j 6m 10x] [--sessions 1 4 16] [--compare resultats.json]
+# Pour chaque échelle (benchmarks/synthetic_data.py), un processus neuf exécuté dans le dossier de l'échelle mesure :
+#   - les étapes des pages (chargement, filtrage, construction de la carte, sérialisation HTML),
+#   - le premier affichage des pages avec AppTest (à froid puis à chaud),
+#   - la latence de N sessions simultanées (un AppTest par session, dans le même processus comme sur le serveur),
+#   - le pic de mémoire résidente.
+# Les résultats sont enregistrés dans benchmarks/results/ et comparés au précédent fichier de résultats.
+
+import os
+import sys
+import json
+import glob
+import time
+import resource
+import argparse
+import datetime
+import platform
+import threading
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from synthetic_data import prepare_scale, repo_root, scales  # noqa: E402
+
+results_root = os.path.join(repo_root, 'benchmarks', 'results')
+
+# Pages pilotées avec AppTest
+pages = ['VCub', 'Bus • Tram • BatCub']
+
+# Écart relatif au-delà duquel une mesure est signalée comme régression
+regression_ratio = 1.2
+
+#-----------------------------------------------------#
+#                     Functions                       #
+#-----------------------------------------------------#
+
+def peak_rss_mb():
+    """Peak resident set size of the current process (Mo)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+# Chronomètre d'une étape
+def timed(func, *args, **kwargs):
+    """Return (result, seconds)"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+# Étapes de la page VCub : ingestion du CSV, chargement, filtrage d'un instantané, carte, HTML
+def vcub_stages():
+    from vcub_data import SnapshotStore, ingest_csv, load_vcub_frame
+    from vcub_map import create_v3_map
+
+    _, ingest_s = timed(ingest_csv)
+    store, load_s = timed(lambda: SnapshotStore(load_vcub_frame()))
+    keys = store.keys()
+    sample = keys[::max(1, len(keys) // 50)]
+    start = time.perf_counter()
+    for date, time_ in sample:
+        snapshot = store.snapshot(date, time_)
+    filter_s = (time.perf_counter() - start) / len(sample)
+    m, build_s = timed(create_v3_map, snapshot, 'CartoDB dark_matter')
+    html, serialize_s = timed(lambda: m.get_root().render())
+    return {
+        'rows': len(store.data), 'snapshots': len(keys),
+        'ingest_s': ingest_s, 'load_s': load_s, 'filter_s': filter_s,
+        'map_build_s': build_s, 'html_serialize_s': serialize_s, 'html_bytes': len(html.encode('utf-8')),
+    }
+
+# Étapes de la page Bus • Tram • BatCub : lecture du GeoJSON, carte, HTML
+def network_stages():
+    import geopandas as gpd
+    from network_map import build_network_map, render_map_html
+    from network_simplify import network_raw_path
+
+    gdf, load_s = timed(gpd.read_file, network_raw_path)
+    m, build_s = timed(build_network_map, gdf, 'CartoDB dark_matter')
+    html, serialize_s = timed(render_map_html, m)
+    return {
+        'lines': len(gdf), 'load_s': load_s,
+        'map_build_s': build_s, 'html_serialize_s': serialize_s, 'html_bytes': len(html.encode('utf-8')),
+    }
+
+# Premier affichage de chaque page (à froid : caches vides, à chaud : caches remplis)
+def page_runs():
+    from bench_startup import page_app
+
+    results = {}
+    for page in pages:
+        cold = page_app(page)
+        _, cold_s = timed(cold.run)
+        _, warm_s = timed(page_app(page).run)
+        results[page] = {'cold_s': cold_s, 'warm_s': warm_s, 'errors': [str(error.value) for error in cold.exception]}
+    return results
+
+# N sessions lancées en même temps sur une page (caches déjà remplis par page_runs)
+def concurrent_runs(page, sessions):
+    from bench_startup import page_app
+
+    latencies = []
+    barrier = threading.Barrier(sessions)
+
+    def session():
+        app = page_app(page)
+        barrier.wait()
+        _, seconds = timed(app.run)
+        latencies.append(seconds)
+
+    threads = [threading.Thread(target=session) for _ in range(sessions)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall_s = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'wall_s': wall_s,
+        'latency_p50_s': latencies[len(latencies) // 2],
+        'latency_p95_s': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        'latency_max_s': latencies[-1],
+    }
+
+# Mesure complète d'une échelle, dans le processus enfant
+def measure_scale(scale, sessions):
+    """All metrics of one scale, run from the scale's directory"""
+    os.chdir(prepare_scale(scale))
+    sys.path.insert(0, repo_root)
+    result = {'params': scales[scale]}
+    result['vcub'] = vcub_stages()
+    result['network'] = network_stages()
+    result['stages_peak_rss_mb'] = peak_rss_mb()
+    result['pages'] = page_runs()
+    result['concurrency'] = {
+        page: {str(n): concurrent_runs(page, n) for n in sessions} for page in pages
+    }
+    result['peak_rss_mb'] = peak_rss_mb()
+    return result
+
+# Mesures numériques à plat (« 14j.vcub.load_s ») pour la comparaison
+def flatten(metrics, prefix=''):
+    flat = {}
+    for key, value in metrics.items():
+        name = f'{prefix}.{key}' if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+# Comparaison avec un fichier de résultats précédent : temps, octets et mémoire (plus petit = meilleur)
+def compare(current, previous_path):
+    """Print the ratio of every metric to a previous run and flag regressions"""
+    with open(previous_path, encoding='utf-8') as file:
+        previous = flatten(json.load(file)['scales'])
+    print(f"\ncomparaison avec {os.path.basename(previous_path)}")
+    regressions = 0
+    for name, value in flatten(current['scales']).items():
+        if not name.endswith(('_s', '_bytes', '_mb')) or not previous.get(name):
+            continue
+        ratio = value / previous[name]
+        flag = 'RÉGRESSION' if ratio > regression_ratio else ''
+        regressions += bool(flag)
+        print(f"{name:>60} {previous[name]:>12.3f} {value:>12.3f} {ratio:>7.2f}x {flag}")
+    return regressions
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scales', nargs='+', default=['14j'], choices=list(scales))
+    parser.add_argument('--sessions', nargs='+', type=int, default=[1, 4, 16])
+    parser.add_argument('--compare', help='fichier de résultats de référence (par défaut : le plus récent)')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure_scale(args.child, args.sessions)))
+        sys.exit(0)
+
+    # Une échelle par processus : pic de mémoire et caches Streamlit propres à chaque échelle
+    previous_runs = sorted(glob.glob(os.path.join(results_root, 'pages-*.json')))
+    current = {
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=repo_root,
+                                 capture_output=True, text=True).stdout.strip(),
+        'python': platform.python_version(),
+        'scales': {},
+    }
+    for scale in args.scales:
+        print(f"échelle {scale} ...", flush=True)
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--child', scale,
+             '--sessions', *map(str, args.sessions)],
+            capture_output=True, text=True, check=True,
+        ).stdout
+        result = current['scales'][scale] = json.loads(output.strip().splitlines()[-1])
+        for page in ['vcub', 'network']:
+            stages = result[page]
+            print(f"  {page:>8} chargement {stages['load_s']:.3f} s, carte {stages['map_build_s']:.3f} s, "
+                  f"HTML {stages['html_serialize_s']:.3f} s ({stages['html_bytes'] / 1024:.0f} Ko)")
+        for page, runs in result['pages'].items():
+            print(f"  {page:>20} froid {runs['cold_s']:.3f} s, chaud {runs['warm_s']:.3f} s")
+            for n, latency in result['concurrency'][page].items():
+                print(f"  {'':>20} {n:>3} sessions : p50 {latency['latency_p50_s']:.3f} s, "
+                      f"p95 {latency['latency_p95_s']:.3f} s")
+        print(f"  pic mémoire {result['peak_rss_mb']:.0f} Mo")
+
+    os.makedirs(results_root, exist_ok=True)
+    output_path = os.path.join(results_root, f"pages-{datetime.datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(output_path, 'w', encoding='utf-8') as file:
+        json.dump(current, file, indent=2, ensure_ascii=False)
+    print(f"\nrésultats : {output_path}")
+
+    reference = args.compare or (previous_runs[-1] if previous_runs else None)
+    if reference:
+        sys.exit(1 if compare(current, reference) else 0)
@@ -0,0 +1,126 @@
+
+#-----------------------------------------------------#
+#  Benchmark : mémoire des données VCub et du réseau  #
+#-----------------------------------------------------#
+
+# Usage : python benchmarks/bench_shared_data.py [--scale 6m] [--processes 4] [--sessions 8]
+# Chaque stratégie lance N processus (comme N workers de l'application) qui servent chacun S sessions,
+# puis relève, une fois tous les processus chargés, la mémoire de chacun dans /proc/self/smaps_rollup (Linux) :
+#   - RSS : pages résidentes (les pages partagées sont comptées dans chaque processus),
+#   - PSS : pages partagées divisées entre les processus qui les utilisent (la somme = mémoire réelle de l'hôte),
+#   - USS : pages propres au processus.
+# Les données sont celles de benchmarks/synthetic_data.py.
+
+import os
+import sys
+import json
+import pickle
+import argparse
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from synthetic_data import prepare_scale, scales  # noqa: E402
+
+# Stratégies comparées
+strategies = {
+    'copie': "cache_data : une copie (pickle) par session",
+    'processus': "cache_resource : un chargement par processus (Feather / GeoJSON)",
+    'partagé': "shared_data.py : table Arrow memory-map partagée par l'hôte",
+}
+
+#-----------------------------------------------------#
+#                     Functions                       #
+#-----------------------------------------------------#
+
+# Mémoire du processus courant (Mo)
+def memory_mb():
+    """RSS, PSS and USS of the current process from smaps_rollup"""
+    fields = {}
+    with open('/proc/self/smaps_rollup') as file:
+        for line in file:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1]) / 1024
+    return {
+        'rss': fields.get('Rss', 0),
+        'pss': fields.get('Pss', 0),
+        'uss': fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0),
+    }
+
+# Chargement des deux jeux de données par un processus selon la stratégie
+def load(strategy):
+    """(VCub DataFrame, network GeoDataFrame) loaded with one strategy"""
+    import geopandas as gpd
+    from vcub_data import load_vcub_frame, vcub_csv_path
+    from network_simplify import network_raw_path
+    from shared_data import DataService, network_table, read_network, read_vcub, vcub_table
+
+    if strategy == 'partagé':
+        service = DataService()
+        vcub = read_vcub(service, service.ensure('vcub', vcub_csv_path, vcub_table))
+        network = read_network(service, service.ensure('network', network_raw_path, network_table))
+        return vcub, network
+    return load_vcub_frame(), gpd.read_file(network_raw_path)
+
+# Mesure dans un processus enfant : chargement, S sessions, puis relevé quand le parent le demande
+def child(strategy, sessions):
+    vcub, network = load(strategy)
+    if strategy == 'copie':
+        # Comme st.cache_data : chaque session reçoit une copie désérialisée de la valeur en cache
+        held = [pickle.loads(pickle.dumps((vcub, network))) for _ in range(sessions)]
+    else:
+        held = [(vcub, network)] * sessions
+    # Lecture complète des colonnes (les pages mappées deviennent résidentes)
+    for data, gdf in held:
+        data['nbvelos'].sum()
+        gdf.total_bounds
+    print('ready', flush=True)
+    sys.stdin.readline()
+    print(json.dumps(memory_mb()), flush=True)
+
+# Lancement de N processus enfants, relevé simultané une fois tous chargés
+def measure(strategy, processes, sessions, directory):
+    """Per-process memory of N workers serving S sessions each"""
+    children = [
+        subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), '--child', strategy, '--sessions', str(sessions)],
+            cwd=directory, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+        )
+        for _ in range(processes)
+    ]
+    for process in children:
+        if process.stdout.readline().strip() != 'ready':
+            raise RuntimeError(f"Échec du processus de mesure ({strategy})")
+    for process in children:
+        process.stdin.write('measure\n')
+        process.stdin.flush()
+    results = [json.loads(process.stdout.readline()) for process in children]
+    for process in children:
+        process.wait()
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Mémoire des données partagées entre processus")
+    parser.add_argument('--scale', default='6m', choices=list(scales))
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--sessions', type=int, default=8)
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.sessions)
+        sys.exit(0)
+
+    directory = prepare_scale(args.scale)
+    # Publication préalable (une seule fois, hors mesure)
+    measure('partagé', 1, 1, directory)
+
+    print(f"Échelle {args.scale}, {args.processes} processus x {args.sessions} sessions")
+    print(f"{'stratégie':>10} {'RSS total (Mo)':>15} {'PSS total (Mo)':>15} {'USS / processus (Mo)':>21}")
+    for strategy, description in strategies.items():
+        results = measure(strategy, args.processes, args.sessions, directory)
+        rss = sum(result['rss'] for result in results)
+        pss = sum(result['pss'] for result in results)
+        uss = sum(result['uss'] for result in results) / len(results)
+        print(f"{strategy:>10} {rss:>15.0f} {pss:>15.0f} {uss:>21.0f}   {description}")
@@ -0,0 +1,55 @@
+
+#-----------------------------------------------------#
+#    Benchmark : index spatial vs parcours complet    #
+#-----------------------------------------------------#
+
+# Usage : python benchmarks/bench_spatial_index.py [nombre_de_stations ...]
+
+import os
+import sys
+import time
+
+import numpy as np
+import geopandas as gpd
+import shapely
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from spatial_index import SpatialIndex, brute_force_stations_within  # noqa: E402
+from bench_v3_map import synthetic_snapshot  # noqa: E402
+
+# Lignes synthétiques : segments aléatoires autour de Bordeaux
+def synthetic_lines(n_lines, seed=0):
+    """Random polylines with the gdfbustrambat.json attribute columns"""
+    rng = np.random.default_rng(seed)
+    starts = np.column_stack((-0.5792 + rng.normal(0, 0.05, n_lines), 44.8378 + rng.normal(0, 0.04, n_lines)))
+    steps = rng.normal(0, 0.005, (n_lines, 20, 2)).cumsum(axis=1)
+    return gpd.GeoDataFrame(
+        {'ligne_com': [f'Ligne {i}' for i in range(n_lines)], 'vehicule': 'BUS'},
+        geometry=[shapely.LineString(start + path) for start, path in zip(starts, steps)],
+        crs='EPSG:4326',
+    )
+
+# Temps moyen d'une requête (ms)
+def timed(func, repeat=50):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return 1000 * (time.perf_counter() - start) / repeat
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [180, 10_000, 100_000]
+    point = shapely.Point(-0.5700, 44.8410)
+    polygon = shapely.box(-0.59, 44.83, -0.56, 44.85)
+    print(f"{'stations':>9} {'requête':>22} {'index (ms)':>11} {'parcours (ms)':>14}")
+    for n in sizes:
+        index = SpatialIndex(synthetic_snapshot(n)[['nom', 'latitude', 'longitude']], synthetic_lines(500))
+        assert len(index.stations_within(point, 300)) == len(brute_force_stations_within(index, point, 300))
+        for label, indexed, brute in [
+            ('rayon 300 m', lambda: index.stations_within(point, 300),
+             lambda: brute_force_stations_within(index, point, 300)),
+            ('polygone', lambda: index.stations_within(polygon),
+             lambda: brute_force_stations_within(index, polygon)),
+            ('5 plus proches', lambda: index.nearest_stations(point),
+             lambda: brute_force_stations_within(index, point, np.inf).head(5)),
+        ]:
+            print(f"{n:>9} {label:>22} {timed(indexed):>11.3f} {timed(brute):>14.3f}")
@@ -0,0 +1,83 @@
+
+#-----------------------------------------------------#
+#    Benchmark : temps de premier affichage par page  #
+#-----------------------------------------------------#
+
+# Usage : python benchmarks/bench_startup.py [page ...]
+# Chaque page est exécutée avec AppTest dans un processus neuf : le premier run mesure le démarrage à froid
+# (imports + chargement des données + rendu), le second run dans le même processus le démarrage à chaud.
+
+import os
+import sys
+import json
+import time
+import subprocess
+
+repo_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Script exécuté pour chaque page : application complète pour HOME (page par défaut), module de la page sinon
+page_scripts = {
+    'HOME': None,
+    'VCub': 'app_pages.vcub',
+    'Bus • Tram • BatCub': 'app_pages.network',
+}
+
+# Modules lourds dont on vérifie qu'ils ne sont pas importés inutilement
+heavy_modules = ['pandas', 'pyarrow', 'geopandas', 'shapely', 'folium', 'streamlit_folium']
+
+# AppTest d'une page (une nouvelle instance = une nouvelle session)
+def page_app(page):
+    """AppTest running one page of the app"""
+    from streamlit.testing.v1 import AppTest
+    if page_scripts[page] is None:
+        return AppTest.from_file(os.path.join(repo_root, 'App_streamlit.py'), default_timeout=600)
+    return AppTest.from_string(
+        "import streamlit as st\n"
+        "import importlib\n"
+        "st.set_page_config(layout='wide')\n"
+        f"importlib.import_module({page_scripts[page]!r}).render()\n",
+        default_timeout=600,
+    )
+
+# Mesure dans le processus enfant : deux runs consécutifs de la même page
+def measure_page(page):
+    """Cold and warm time-to-first-render of one page, in the current process"""
+    os.chdir(repo_root)
+    sys.path.insert(0, repo_root)
+    start = time.perf_counter()
+    from streamlit.testing.v1 import AppTest  # noqa: F401
+    streamlit_s = time.perf_counter() - start
+
+    def run():
+        app = page_app(page)
+        start = time.perf_counter()
+        app.run()
+        return time.perf_counter() - start, [str(error.value) for error in app.exception]
+
+    cold_s, errors = run()
+    warm_s, _ = run()
+    return {
+        'page': page,
+        'streamlit_import_s': streamlit_s,
+        'cold_s': cold_s,
+        'warm_s': warm_s,
+        'heavy_modules': [name for name in heavy_modules if name in sys.modules],
+        'errors': errors,
+    }
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    if args[:1] == ['--child']:
+        print(json.dumps(measure_page(args[1])))
+        sys.exit(0)
+
+    print(f"{'page':>20} {'streamlit (s)':>14} {'froid (s)':>10} {'chaud (s)':>10}  modules lourds")
+    for page in args or list(page_scripts):
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--child', page], capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{page:>20} {result['streamlit_import_s']:>14.3f} {result['cold_s']:>10.3f} {result['warm_s']:>10.3f}  "
+              f"{', '.join(result['heavy_modules']) or '-'}")
+        for error in result['errors']:
+            print(f"{'':>20} erreur : {error}")
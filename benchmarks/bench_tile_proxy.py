@@ -0,0 +1,70 @@
+
+#-----------------------------------------------------#
+#    Benchmark : proxy de tuiles sur amont simulé     #
+#-----------------------------------------------------#
+
+# Usage : python benchmarks/bench_tile_proxy.py [sessions] [latence_amont_ms]
+# Aucun accès réseau : l'amont MapTiler est remplacé par un serveur local qui renvoie une tuile factice.
+
+import os
+import sys
+import time
+import asyncio
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import aiohttp  # noqa: E402
+from aiohttp import web  # noqa: E402
+from tile_proxy import TileCache, bordeaux_bbox, make_app, tiles_for_bbox  # noqa: E402
+
+# Amont simulé : latence fixe et compteur de requêtes reçues
+def make_mock_upstream(latency):
+    """aiohttp app returning a fixed PNG-sized payload after a delay"""
+    counter = {'requests': 0}
+
+    async def tile(request):
+        counter['requests'] += 1
+        await asyncio.sleep(latency)
+        return web.Response(body=b'\x89PNG' + os.urandom(20000), content_type='image/png')
+
+    app = web.Application()
+    app.router.add_get('/{z}/{x}/{y}.png', tile)
+    return app, counter
+
+async def serve(app, port):
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', port)
+    await site.start()
+    return runner
+
+# Chaque session demande toutes les tuiles de Bordeaux au zoom 12 et 13 (comme un premier affichage)
+async def main(sessions, latency):
+    upstream_app, counter = make_mock_upstream(latency)
+    upstream = await serve(upstream_app, 8901)
+    with tempfile.TemporaryDirectory() as root:
+        cache = TileCache('http://127.0.0.1:8901/{z}/{x}/{y}.png', root=root)
+        proxy = await serve(make_app(cache), 8902)
+        tiles = list(tiles_for_bbox(bordeaux_bbox, [12, 13]))
+
+        async with aiohttp.ClientSession() as client:
+            async def viewer():
+                for z, x, y in tiles:
+                    async with client.get(f'http://127.0.0.1:8902/tiles/{z}/{x}/{y}.png') as response:
+                        await response.read()
+
+            for label in ['à froid', 'à chaud']:
+                start = time.perf_counter()
+                await asyncio.gather(*(viewer() for _ in range(sessions)))
+                elapsed = time.perf_counter() - start
+                print(f"{label:>8} : {sessions} sessions x {len(tiles)} tuiles en {elapsed:.2f} s, "
+                      f"requêtes amont cumulées {counter['requests']}")
+            async with client.get('http://127.0.0.1:8902/metrics') as response:
+                print(await response.json())
+        await proxy.cleanup()
+    await upstream.cleanup()
+
+if __name__ == '__main__':
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    latency = (int(sys.argv[2]) if len(sys.argv) > 2 else 80) / 1000
+    asyncio.run(main(sessions, latency))
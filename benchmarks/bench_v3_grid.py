@@ -0,0 +1,42 @@
+
+#-----------------------------------------------------#
+#   Benchmark : carte VCub agrégée vs stations seules #
+#-----------------------------------------------------#
+
+# Usage : python benchmarks/bench_v3_grid.py [nombre_de_stations ...]
+# Le mode 'markers' (un CircleMarker folium par station) n'est mesuré que jusqu'à 10 000 stations.
+# Le build du mode 'grid' inclut le précalcul ; dans l'application la grille vient du cache de l'instantané.
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_v3_map import measure, synthetic_snapshot  # noqa: E402
+from vcub_map import build_grid_levels  # noqa: E402
+
+# Au-delà, le mode historique prend plusieurs minutes sans rien apprendre de plus
+max_markers = 10_000
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000]
+    print(f"{'stations':>8} {'mode':>8} {'précalcul (s)':>14} {'build (s)':>10} {'render (s)':>11} "
+          f"{'HTML (Ko)':>10} {'éléments':>9}")
+    for n in sizes:
+        snapshot = synthetic_snapshot(n)
+
+        # Précalcul de la grille (fait une fois par instantané et mis en cache dans l'application)
+        start = time.perf_counter()
+        grid = build_grid_levels(snapshot)
+        grid_s = time.perf_counter() - start
+        cells = sum(len(level['lat']) for level in grid['levels'].values())
+
+        for mode in ['markers', 'geojson', 'grid']:
+            if mode == 'markers' and n > max_markers:
+                continue
+            build_s, render_s, size = measure(snapshot, mode)
+            elements = cells if mode == 'grid' else n
+            precompute = f"{grid_s:>14.3f}" if mode == 'grid' else f"{'-':>14}"
+            print(f"{n:>8} {mode:>8} {precompute} {build_s:>10.3f} {render_s:>11.3f} "
+                  f"{size / 1024:>10.1f} {elements:>9}")
@@ -0,0 +1,52 @@
+
+#-----------------------------------------------------#
+#      Benchmark : carte VCub (GeoJSON vs boucle)     #
+#-----------------------------------------------------#
+
+# Usage : python benchmarks/bench_v3_map.py [nombre_de_stations ...]
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from vcub_map import create_v3_map  # noqa: E402
+
+# Génération d'un instantané VCub synthétique autour de Bordeaux
+def synthetic_snapshot(n_stations, seed=0):
+    """Random VCub snapshot with the stations_VCube.csv columns"""
+    rng = np.random.default_rng(seed)
+    nbvelos = rng.integers(0, 30, n_stations)
+    nbelec = rng.integers(0, nbvelos + 1)
+    return pd.DataFrame({
+        'nom': [f'Station {i}' for i in range(n_stations)],
+        'etat': rng.choice(['CONNECTEE', 'MAINTENANCE', 'DECONNECTEE'], n_stations, p=[0.9, 0.05, 0.05]),
+        'latitude': 44.8378 + rng.normal(0, 0.03, n_stations),
+        'longitude': -0.5792 + rng.normal(0, 0.04, n_stations),
+        'nbvelos': nbvelos,
+        'nbelec': nbelec,
+        'nbclassiq': nbvelos - nbelec,
+        'nbplaces': rng.integers(0, 30, n_stations),
+    })
+
+# Temps de construction de la carte et taille du HTML produit pour un mode donné
+def measure(snapshot, mode):
+    """Return (build seconds, render seconds, HTML bytes)"""
+    start = time.perf_counter()
+    m = create_v3_map(snapshot, 'CartoDB dark_matter', mode=mode)
+    built = time.perf_counter()
+    html = m.get_root().render()
+    rendered = time.perf_counter()
+    return built - start, rendered - built, len(html.encode('utf-8'))
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [180, 1000, 5000]
+    print(f"{'stations':>8} {'mode':>8} {'build (s)':>10} {'render (s)':>11} {'HTML (Ko)':>10}")
+    for n in sizes:
+        snapshot = synthetic_snapshot(n)
+        for mode in ['markers', 'geojson']:
+            build_s, render_s, size = measure(snapshot, mode)
+            print(f"{n:>8} {mode:>8} {build_s:>10.3f} {render_s:>11.3f} {size / 1024:>10.1f}")
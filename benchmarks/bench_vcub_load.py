@@ -0,0 +1,90 @@
+
+#-----------------------------------------------------#
+#     Benchmark : chargement VCub (CSV / Feather)     #
+#-----------------------------------------------------#
+
+# Usage : python benchmarks/bench_vcub_load.py [échelle ...]
+# Chaque stratégie est mesurée dans un processus neuf (démarrage à froid) sur les données de benchmarks/synthetic_data.py :
+#   - csv : lecture du CSV et libellé de date formaté ligne par ligne (chargement d'origine de l'application),
+#   - ingest : conversion unique du CSV en cache Feather (python vcub_data.py),
+#   - feather : lecture du cache Feather par memory-map (load_vcub_frame).
+# La mémoire résidente (RSS, /proc/self/smaps_rollup) est relevée après le chargement puis après une lecture
+# complète des colonnes (les pages mappées deviennent alors résidentes).
+
+import os
+import sys
+import json
+import time
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from synthetic_data import prepare_scale, scales  # noqa: E402
+
+strategies = ['csv', 'ingest', 'feather']
+
+#-----------------------------------------------------#
+#                     Functions                       #
+#-----------------------------------------------------#
+
+# Mémoire résidente du processus courant (Mo)
+def rss_mb():
+    with open('/proc/self/smaps_rollup') as file:
+        for line in file:
+            if line.startswith('Rss:'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+# Chargement d'origine : CSV analysé et date formatée par babel pour chaque ligne
+def load_csv():
+    import pandas as pd
+    from babel.dates import format_date
+
+    data = pd.read_csv('./Data/stations_VCube.csv')
+    data['mdate'] = pd.to_datetime(data['mdate'])
+    data['time'] = data['mdate'].dt.strftime('%H:%M')
+    data['formatted_date'] = data['mdate'].apply(lambda x: format_date(x, 'EEEE d MMMM y', locale='fr'))
+    return data
+
+# Mesure dans un processus enfant (imports compris dans le temps mesuré)
+def child(strategy):
+    baseline = rss_mb()
+    start = time.perf_counter()
+    if strategy == 'csv':
+        data = load_csv()
+    elif strategy == 'ingest':
+        from vcub_data import ingest_csv, load_vcub_frame
+        ingest_csv()
+        data = load_vcub_frame()
+    else:
+        from vcub_data import load_vcub_frame
+        data = load_vcub_frame()
+    seconds = time.perf_counter() - start
+    loaded = rss_mb()
+    for column in ['nbvelos', 'nbelec', 'nbplaces', 'latitude', 'longitude']:
+        data[column].sum()
+    data['formatted_date'].astype(str).nunique()
+    print(json.dumps({
+        'rows': len(data), 'seconds': seconds, 'rss_loaded': loaded - baseline, 'rss_read': rss_mb() - baseline,
+    }))
+
+def measure(strategy, directory):
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', strategy],
+        cwd=directory, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    if args[:1] == ['--child']:
+        child(args[1])
+        sys.exit(0)
+
+    print(f"{'échelle':>8} {'stratégie':>10} {'lignes':>10} {'temps (s)':>10} {'RSS chargé (Mo)':>16} {'RSS lu (Mo)':>12}")
+    for scale in args or ['14j', '6m']:
+        directory = prepare_scale(scale)
+        for strategy in strategies:
+            result = measure(strategy, directory)
+            print(f"{scale:>8} {strategy:>10} {result['rows']:>10} {result['seconds']:>10.2f} "
+                  f"{result['rss_loaded']:>16.0f} {result['rss_read']:>12.0f}", flush=True)
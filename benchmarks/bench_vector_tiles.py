@@ -0,0 +1,60 @@
+
+#-----------------------------------------------------#
+#  Benchmark : carte embarquée vs tuiles vectorielles #
+#-----------------------------------------------------#
+
+# Usage : python benchmarks/bench_vector_tiles.py
+# Nécessite ./Data/gdfbustrambat.json et ./Data/tiles.mbtiles (python vector_tiles.py)
+
+import os
+import sys
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import geopandas as gpd  # noqa: E402
+from network_map import build_network_map, render_map_html  # noqa: E402
+from network_simplify import network_raw_path  # noqa: E402
+from tile_server import start_tile_server  # noqa: E402
+from vector_tiles import (  # noqa: E402
+    build_network_tile_map, lonlat_to_mercator, tile_archive_path, tiles_for_bounds,
+)
+
+# Fenêtre de la carte dans Streamlit (pixels) et centre / zoom initial de la carte Bus • Tram • BatCub
+viewport_width, viewport_height = 945, 450
+center, zoom = (44.84101, -0.64265), 12
+
+# Tuiles visibles dans la fenêtre initiale
+def viewport_tiles(center, zoom):
+    """(x, y) tiles covering the initial map viewport"""
+    x, y = lonlat_to_mercator([center[1]], [center[0]])
+    meters_per_px = 2 * 20037508.342789244 / (256 * 2 ** zoom)
+    half_w, half_h = viewport_width / 2 * meters_per_px, viewport_height / 2 * meters_per_px
+    return list(tiles_for_bounds((x[0] - half_w, y[0] - half_h, x[0] + half_w, y[0] + half_h), zoom))
+
+if __name__ == '__main__':
+    gdf = gpd.read_file(network_raw_path)
+
+    # Carte embarquée : tout le GeoJSON dans le HTML
+    start = time.perf_counter()
+    embedded_html = render_map_html(build_network_map(gdf, 'OpenStreetMap'))
+    embedded_s = time.perf_counter() - start
+
+    # Carte cliente : HTML léger + tuiles visibles servies par le serveur local
+    server = start_tile_server(tile_archive_path, port=0)
+    url = f'http://127.0.0.1:{server.server_address[1]}'
+    start = time.perf_counter()
+    client_html = render_map_html(build_network_tile_map(url, 'OpenStreetMap'))
+    tile_bytes = 0
+    for x, y in viewport_tiles(center, zoom):
+        with urllib.request.urlopen(f'{url}/network/{zoom}/{x}/{y}.pbf') as response:
+            tile_bytes += len(response.read())
+    client_s = time.perf_counter() - start
+    server.shutdown()
+
+    # Premier affichage approché par : construction serveur + octets à transférer avant l'affichage des lignes
+    print(f"{'mode':>10} {'HTML (Ko)':>10} {'tuiles (Ko)':>12} {'total (Ko)':>11} {'serveur (s)':>12}")
+    print(f"{'embarqué':>10} {len(embedded_html.encode()) / 1024:>10.1f} {0:>12.1f} "
+          f"{len(embedded_html.encode()) / 1024:>11.1f} {embedded_s:>12.3f}")
+    print(f"{'tuiles':>10} {len(client_html.encode()) / 1024:>10.1f} {tile_bytes / 1024:>12.1f} "
+          f"{(len(client_html.encode()) + tile_bytes) / 1024:>11.1f} {client_s:>12.3f}")
@@ -0,0 +1,102 @@
+
+#-----------------------------------------------------#
+#  Benchmark : mémoire de la vidéo par session active #
+#-----------------------------------------------------#
+
+# Usage : python benchmarks/bench_video_memory.py [sessions] [fichier.mp4]
+# Chaque stratégie est mesurée dans un processus neuf : N sessions affichent la vidéo en même temps
+# (reruns simultanés), puis on relève le pic de mémoire résidente et les descripteurs de fichiers ouverts.
+# Sans fichier vidéo, un fichier factice de 20 Mo est utilisé.
+
+import os
+import sys
+import json
+import resource
+import tempfile
+import threading
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# Stratégies comparées
+strategies = {
+    'lecture': "open().read() à chaque rerun (ancien code)",
+    'cache': "copie unique par processus (load_video)",
+    'url': "URL externe (video_url)",
+}
+
+def peak_rss_mb():
+    """Peak resident set size of the current process (Mo)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def open_fds():
+    """Number of open file descriptors (Linux), or -1"""
+    return len(os.listdir('/proc/self/fd')) if os.path.isdir('/proc/self/fd') else -1
+
+# Mesure dans le processus enfant
+def measure(strategy, sessions, video_path):
+    """Peak memory of N concurrent sessions showing the video with one strategy"""
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+
+    # Gestionnaire de médias de Streamlit (celui qui sert /media avec les requêtes Range)
+    manager = MediaFileManager(MemoryMediaFileStorage('/media'))
+    with open(video_path, 'rb') as file:
+        cached = file.read() if strategy == 'cache' else None
+    baseline = peak_rss_mb()
+    barrier = threading.Barrier(sessions + 1)
+    handles = []
+
+    def session(index):
+        if strategy == 'lecture':
+            video_file = open(video_path, 'rb')      # Jamais fermé, comme dans l'ancien code
+            handles.append(video_file)
+            data = video_file.read()
+        elif strategy == 'cache':
+            data = cached
+        else:
+            data = None
+        if data is not None:
+            manager.add(data, 'video/mp4', f'{index}.video')
+        barrier.wait()                              # Toutes les sessions en cours de rerun au même moment
+        barrier.wait()
+
+    threads = [threading.Thread(target=session, args=(index,)) for index in range(sessions)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    fds = open_fds()
+    barrier.wait()
+    for thread in threads:
+        thread.join()
+    return {
+        'strategy': strategy,
+        'baseline_mb': baseline,
+        'peak_mb': peak_rss_mb(),
+        'per_session_mb': (peak_rss_mb() - baseline) / sessions,
+        'open_fds': fds,
+    }
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    if args[:1] == ['--child']:
+        print(json.dumps(measure(args[1], int(args[2]), args[3])))
+        sys.exit(0)
+
+    sessions = int(args[0]) if args else 50
+    video_path = args[1] if len(args) > 1 else './Video/VCub_video.mp4'
+    if not os.path.exists(video_path):
+        video_path = os.path.join(tempfile.mkdtemp(), 'video.mp4')
+        with open(video_path, 'wb') as file:
+            file.write(os.urandom(20 * 1024 ** 2))
+
+    print(f"vidéo : {os.path.getsize(video_path) / 1024 ** 2:.1f} Mo, {sessions} sessions simultanées")
+    print(f"{'stratégie':>10} {'base (Mo)':>10} {'pic (Mo)':>10} {'par session (Mo)':>17} {'fichiers ouverts':>17}  description")
+    for strategy in strategies:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--child', strategy, str(sessions), video_path],
+            capture_output=True, text=True, check=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{strategy:>10} {result['baseline_mb']:>10.1f} {result['peak_mb']:>10.1f} "
+              f"{result['per_session_mb']:>17.2f} {result['open_fds']:>17}  {strategies[strategy]}")
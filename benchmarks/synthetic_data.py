@@ -0,0 +1,132 @@
+
+#-----------------------------------------------------#
+#      Jeux de données synthétiques (benchmarks)      #
+#-----------------------------------------------------#
+
+# Usage : python benchmarks/synthetic_data.py [échelle ...]
+# Chaque échelle produit un dossier benchmarks/data/<échelle>/ qui reproduit l'arborescence de l'application
+# (Data/stations_VCube.csv, Data/gdfbustrambat.json, Images/, Video/, facts.txt) : l'application
+# et les modules de données s'y exécutent sans modification, leurs chemins étant relatifs.
+
+import os
+import sys
+import datetime
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+repo_root = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+bench_data_root = os.path.join(repo_root, 'benchmarks', 'data')
+
+# Échelles : jours de relevés, nombre de stations, intervalle entre relevés (min), nombre de lignes du réseau
+scales = {
+    '14j': {'days': 14, 'stations': 180, 'interval_min': 10, 'lines': 150},
+    '6m': {'days': 183, 'stations': 180, 'interval_min': 10, 'lines': 150},
+    '10x': {'days': 14, 'stations': 1800, 'interval_min': 10, 'lines': 1500},
+}
+
+# Centre de Bordeaux et premier jour des relevés synthétiques
+center = (44.8378, -0.5792)
+start_date = datetime.date(2023, 7, 1)
+
+#-----------------------------------------------------#
+#                     Functions                       #
+#-----------------------------------------------------#
+
+# Relevés VCub écrits jour par jour (mémoire bornée quelle que soit la durée)
+def write_vcub_csv(path, days, stations, interval_min, seed=0):
+    """Write a synthetic stations_VCube.csv with the real file's columns"""
+    rng = np.random.default_rng(seed)
+    names = np.array([f'Station {i}' for i in range(stations)])
+    latitude = (center[0] + rng.normal(0, 0.03, stations)).round(6)
+    longitude = (center[1] + rng.normal(0, 0.04, stations)).round(6)
+    capacity = rng.integers(10, 40, stations)
+    bikes = rng.integers(0, capacity + 1)
+    steps = 24 * 60 // interval_min
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as file:
+        for day in range(days):
+            # Marche aléatoire du nombre de vélos, bornée par la capacité de chaque station
+            moves = rng.integers(-2, 3, (steps, stations))
+            counts = np.empty((steps, stations), dtype=np.int64)
+            for step in range(steps):
+                bikes = np.clip(bikes + moves[step], 0, capacity)
+                counts[step] = bikes
+            elec = (counts * rng.uniform(0.2, 0.6, (steps, stations))).astype(np.int64)
+            etat = rng.choice(['CONNECTEE', 'MAINTENANCE', 'DECONNECTEE'], (steps, stations), p=[0.96, 0.02, 0.02])
+            mdate = pd.Timestamp(start_date + datetime.timedelta(days=day)) + pd.to_timedelta(
+                np.arange(steps) * interval_min, unit='min'
+            )
+            frame = pd.DataFrame({
+                'mdate': np.repeat(mdate, stations),
+                'nom': np.tile(names, steps),
+                'etat': etat.ravel(),
+                'latitude': np.tile(latitude, steps),
+                'longitude': np.tile(longitude, steps),
+                'nbvelos': counts.ravel(),
+                'nbelec': elec.ravel(),
+                'nbclassiq': (counts - elec).ravel(),
+                'nbplaces': (capacity - counts).ravel(),
+            })
+            frame.to_csv(file, header=day == 0, index=False, date_format='%Y-%m-%d %H:%M:%S')
+    return path
+
+# Lignes du réseau : polylignes aléatoires autour de Bordeaux avec les propriétés de gdfbustrambat.json
+def write_network_geojson(path, lines, vertices=200, seed=0):
+    """Write a synthetic gdfbustrambat.json"""
+    import geopandas as gpd
+    from shapely.geometry import LineString
+
+    rng = np.random.default_rng(seed)
+    vehicule = rng.choice(['BUS', 'TRAM', 'BATEAU'], lines, p=[0.85, 0.12, 0.03])
+    geometries = []
+    for _ in range(lines):
+        start = (center[1] + rng.normal(0, 0.05), center[0] + rng.normal(0, 0.04))
+        steps = rng.normal(0, 0.0008, (vertices, 2)).cumsum(axis=0)
+        geometries.append(LineString(np.asarray(start) + steps))
+    gdf = gpd.GeoDataFrame({
+        'ligne_com': [f'Ligne {i}' for i in range(lines)],
+        'libelle': [f'Terminus {i}' for i in range(lines)],
+        'vehicule': vehicule,
+        'retard': rng.gamma(2, 60, lines).round(),
+        'vitesse': rng.uniform(10, 35, lines).round(1),
+        'nb_vehicule': rng.integers(1, 20, lines),
+    }, geometry=geometries, crs='EPSG:4326')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    gdf.to_file(path, driver='GeoJSON')
+    return path
+
+# Dossier complet d'une échelle (réutilisé s'il existe déjà)
+def prepare_scale(scale, root=bench_data_root):
+    """Build (once) the synthetic app directory of one scale and return its path"""
+    params = scales[scale]
+    directory = os.path.join(root, scale)
+    csv_path = os.path.join(directory, 'Data', 'stations_VCube.csv')
+    geojson_path = os.path.join(directory, 'Data', 'gdfbustrambat.json')
+    if not os.path.exists(csv_path):
+        write_vcub_csv(csv_path, params['days'], params['stations'], params['interval_min'])
+    if not os.path.exists(geojson_path):
+        write_network_geojson(geojson_path, params['lines'])
+
+    # Ressources statiques de l'application (liens), vidéo factice si le dépôt n'en contient pas
+    for name in ['Images', 'facts.txt']:
+        link = os.path.join(directory, name)
+        if not os.path.lexists(link):
+            os.symlink(os.path.join(repo_root, name), link)
+    video_path = os.path.join(directory, 'Video', 'VCub_video.mp4')
+    if not os.path.exists(video_path):
+        os.makedirs(os.path.dirname(video_path), exist_ok=True)
+        source = os.path.join(repo_root, 'Video', 'VCub_video.mp4')
+        if os.path.exists(source):
+            os.symlink(source, video_path)
+        else:
+            with open(video_path, 'wb') as file:
+                file.write(np.random.default_rng(0).bytes(5 * 1024 ** 2))
+    return directory
+
+if __name__ == '__main__':
+    for scale in sys.argv[1:] or list(scales):
+        print(f"{scale} : {prepare_scale(scale)}")
@@ -0,0 +1,264 @@
+
+#-----------------------------------------------------#
+#                      Imports                        #
+#-----------------------------------------------------#
+
+import os                                               # Activation par le .env et mémoire du processus
+import sys                                              # Taille des objets de la session
+import json                                             # Journal structuré et endpoint /metrics
+import time                                             # Chronométrage des étapes
+import logging                                          # Journal structuré (une ligne JSON par exécution)
+import resource                                         # Pic de mémoire du processus
+import functools                                        # Enveloppe des fonctions mises en cache
+import threading                                        # Exécution courante (un thread par session Streamlit)
+from collections import deque                           # Dernières durées de chaque étape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # Endpoint /metrics
+from dotenv import load_dotenv                          # Activation dans le .env
+
+#-----------------------------------------------------#
+#                   Global Variables                  #
+#-----------------------------------------------------#
+
+# Instrumentation activée par instrumentation=1 dans le .env (désactivée : aucune mesure, aucune enveloppe)
+load_dotenv()
+enabled = os.getenv("instrumentation") == "1"
+
+# Journal structuré : fichier défini par instrumentation_log dans le .env, sinon la sortie d'erreur
+metrics_logger = logging.getLogger('bordeaux_data_sync.metrics')
+
+# Nombre de durées conservées par étape pour les percentiles
+max_samples = 1000
+
+#-----------------------------------------------------#
+#                     Functions                       #
+#-----------------------------------------------------#
+
+# Registre du processus : durées par étape, succès / échecs des caches, octets des pages
+class MetricsRegistry:
+    """Process-wide stage timings, cache counters and payload sizes"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.durations = {}
+        self.cache = {}
+        self.payloads = {}
+        self.runs = 0
+
+    def record(self, name, seconds):
+        with self._lock:
+            self.durations.setdefault(name, deque(maxlen=max_samples)).append(seconds)
+
+    def count_cache(self, name, outcome):
+        with self._lock:
+            counters = self.cache.setdefault(name, {'hits': 0, 'misses': 0})
+            counters[outcome] += 1
+
+    def record_run(self, page, seconds):
+        self.record(f'page.{page}', seconds)
+        with self._lock:
+            self.runs += 1
+
+    def record_payload(self, name, size):
+        with self._lock:
+            self.payloads[name] = size
+
+    def snapshot(self):
+        """Aggregated metrics as a JSON-serializable dict"""
+        with self._lock:
+            stages = {}
+            for name, samples in self.durations.items():
+                ordered = sorted(samples)
+                stages[name] = {
+                    'count': len(ordered),
+                    'p50_s': ordered[len(ordered) // 2],
+                    'p95_s': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                    'max_s': ordered[-1],
+                }
+            cache = {
+                name: dict(counters, hit_rate=counters['hits'] / max(1, counters['hits'] + counters['misses']))
+                for name, counters in self.cache.items()
+            }
+            return {
+                'runs': self.runs, 'stages': stages, 'cache': cache,
+                'payload_bytes': dict(self.payloads), 'rss_mb': rss_mb(), 'peak_rss_mb': peak_rss_mb(),
+            }
+
+metrics = MetricsRegistry()
+
+# Exécution en cours du script (propre au thread de la session)
+_local = threading.local()
+
+def current_run():
+    """Measurements of the script run in progress on this thread, or None"""
+    return getattr(_local, 'run', None)
+
+# Mémoire résidente actuelle (Linux) et pic du processus, en Mo
+def rss_mb():
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    except OSError:
+        return peak_rss_mb()
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+# Chronomètre d'une étape (contexte partagé sans effet quand l'instrumentation est désactivée)
+class _NoSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_no_span = _NoSpan()
+
+class _Span:
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.start
+        metrics.record(self.name, seconds)
+        run = current_run()
+        if run is not None:
+            run['spans'][self.name] = run['spans'].get(self.name, 0.0) + seconds
+        return False
+
+def span(name):
+    """Context manager timing one stage"""
+    return _Span(name) if enabled else _no_span
+
+# Taille d'une charge envoyée au navigateur (HTML de carte, ...)
+def payload(name, data):
+    """Record the byte size of a rendered payload and return it unchanged"""
+    if enabled:
+        size = len(data.encode('utf-8')) if isinstance(data, str) else len(data)
+        metrics.record_payload(name, size)
+        run = current_run()
+        if run is not None:
+            run['payload_bytes'][name] = size
+    return data
+
+# Compteurs succès / échecs d'une fonction st.cache_data / st.cache_resource
+# (le corps de la fonction ne s'exécute qu'en cas d'échec : chaque appel sans exécution est un succès)
+def cached(cache_decorator):
+    """Apply a Streamlit cache decorator and count its hits and misses"""
+    def wrap(func):
+        if not enabled:
+            return cache_decorator(func)
+        name = f'{func.__module__}.{func.__qualname__}'   # Deux pages peuvent avoir une fonction du même nom
+
+        # Pile des appels en cours : une fonction en cache peut en appeler une autre
+        @functools.wraps(func)
+        def miss(*args, **kwargs):
+            _local.calls[-1] = True
+            return func(*args, **kwargs)
+
+        cached_func = cache_decorator(miss)
+
+        @functools.wraps(func)
+        def call(*args, **kwargs):
+            if not hasattr(_local, 'calls'):
+                _local.calls = []
+            _local.calls.append(False)
+            try:
+                with span(f'cache.{name}'):
+                    result = cached_func(*args, **kwargs)
+            finally:
+                missed = _local.calls.pop()
+            outcome = 'misses' if missed else 'hits'
+            metrics.count_cache(name, outcome)
+            run = current_run()
+            if run is not None:
+                run['cache'][name] = outcome
+            return result
+
+        call.clear = cached_func.clear
+        return call
+    return wrap
+
+# Mémoire approchée des objets propres à la session (st.session_state)
+def session_bytes(state):
+    """Shallow size of the values held in a session state mapping"""
+    total = 0
+    for value in list(state.values()):
+        memory_usage = getattr(value, 'memory_usage', None)
+        total += int(memory_usage(deep=False).sum()) if callable(memory_usage) else sys.getsizeof(value)
+    return total
+
+# Une exécution complète du script : étapes, caches, octets envoyés et mémoire, puis une ligne JSON dans le journal
+class PageRun:
+    """Context manager measuring one script run of one page"""
+
+    def __init__(self, page, state=None):
+        self.page = page
+        self.state = state
+        self.record = None
+
+    def __enter__(self):
+        if enabled:
+            self.record = {'page': self.page, 'spans': {}, 'cache': {}, 'payload_bytes': {}}
+            self.rss_start = rss_mb()
+            self.start = time.perf_counter()
+            _local.run = self.record
+        return self.record
+
+    def __exit__(self, *exc):
+        if self.record is None:
+            return False
+        _local.run = None
+        self.record.update({
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'duration_s': time.perf_counter() - self.start,
+            'rss_mb': rss_mb(),
+            'rss_delta_mb': rss_mb() - self.rss_start,
+            'session_bytes': session_bytes(self.state) if self.state is not None else None,
+        })
+        metrics.record_run(self.page, self.record['duration_s'])
+        log_run(self.record)
+        return False
+
+# Journal structuré : une ligne JSON par exécution
+def log_run(record):
+    if not metrics_logger.handlers:
+        log_path = os.getenv("instrumentation_log")
+        handler = logging.FileHandler(log_path, encoding='utf-8') if log_path else logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        metrics_logger.addHandler(handler)
+        metrics_logger.setLevel(logging.INFO)
+        metrics_logger.propagate = False
+    metrics_logger.info(json.dumps(record, ensure_ascii=False, default=str))
+
+#-----------------------------------------------------#
+#                   Endpoint /metrics                 #
+#-----------------------------------------------------#
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    """Serve the registry snapshot as JSON on /metrics"""
+
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = json.dumps(metrics.snapshot()).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+# Démarrage de l'endpoint dans un thread de fond (une fois par processus Streamlit)
+# (port libre par défaut : plusieurs processus de l'application démarrent chacun le leur sans conflit)
+def start_metrics_server(host='127.0.0.1', port=0):
+    """Start the /metrics endpoint in a daemon thread and return the server (actual port in server_address)"""
+    server = ThreadingHTTPServer((host, port), MetricsRequestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
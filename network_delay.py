@@ -0,0 +1,55 @@
+
+#-----------------------------------------------------#
+#                      Imports                        #
+#-----------------------------------------------------#
+
+import numpy as np                                      # Bornes des classes de retard
+import pandas as pd                                     # Manipulation des bases de données
+
+#-----------------------------------------------------#
+#                   Global Variables                  #
+#-----------------------------------------------------#
+
+# Classes de retard moyen (en secondes)
+delay_bins = [-np.inf, 60, 120, 300, np.inf]
+delay_labels = ['< 1 min', '1 à 2 min', '2 à 5 min', '> 5 min']
+
+# Percentiles calculés sur les retards moyens des lignes
+delay_percentiles = [0.5, 0.75, 0.9, 0.95]
+
+#-----------------------------------------------------#
+#                     Functions                       #
+#-----------------------------------------------------#
+
+# Classe de retard de chaque ligne, en une seule opération sur la colonne
+def delay_classes(gdf):
+    """Categorical delay class of every line"""
+    return pd.cut(gdf['retard'], bins=delay_bins, labels=delay_labels)
+
+# Statistiques de retard indépendantes du seuil : calculées une fois par version des données
+def delay_statistics(gdf):
+    """Delay percentiles, class counts and per-vehicle aggregates"""
+    retard = gdf['retard']
+    by_vehicle = gdf.groupby('vehicule')['retard'].agg(
+        lignes='count',
+        retard_moyen='mean',
+        retard_median='median',
+        retard_p90=lambda values: values.quantile(0.9),
+        retard_max='max',
+    )
+    return {
+        'percentiles': retard.quantile(delay_percentiles).rename(lambda q: f'p{int(q * 100)}'),
+        'classes': delay_classes(gdf).value_counts(sort=False).rename_axis('classe').rename('lignes'),
+        'by_vehicle': by_vehicle,
+    }
+
+# Lignes au-delà de chaque seuil du contrôle des retards, par type de véhicule : une recherche dans les retards triés
+# de chaque véhicule (la carte affiche ensuite le décompte du seuil choisi, sans aller-retour avec l'application)
+def late_lines_by_threshold(gdf, max_threshold=600, step=10):
+    """Number of lines whose mean delay exceeds each threshold (0, step, ... max_threshold), per vehicle type"""
+    thresholds = np.arange(0, max_threshold + step, step)
+    late = {}
+    for vehicule, retard in gdf.groupby('vehicule')['retard']:
+        retard = np.sort(retard.dropna().to_numpy())
+        late[vehicule] = len(retard) - np.searchsorted(retard, thresholds, side='right')
+    return pd.DataFrame(late, index=pd.Index(thresholds, name='seuil'))
@@ -0,0 +1,227 @@
+
+#-----------------------------------------------------#
+#                      Imports                        #
+#-----------------------------------------------------#
+
+import os                                               # Date de modification du fichier GeoJSON
+import json                                             # Décomptes des lignes en retard transmis au navigateur
+import functools                                        # Mémorisation de l'empreinte du fichier
+import hashlib                                          # Empreinte du fichier GeoJSON (clé de cache)
+import folium                                           # Afficher le choix de carte Folium
+from folium.plugins import Draw                         # Widgets draw (dessin) sur carte en page Bus • Tram • BatCub
+from branca.element import MacroElement                 # Couches GeoJSON stylées côté navigateur
+from jinja2 import Template                             # Gabarits JavaScript des couches et du contrôle des retards
+from network_delay import late_lines_by_threshold       # Lignes en retard pour chaque seuil du contrôle
+
+#-----------------------------------------------------#
+#                   Global Variables                  #
+#-----------------------------------------------------#
+
+# Dictionnaire pour les couleurs des trajets effectués des véhicules
+vehicle_color_map = {
+    'BUS': '#01b1eb',
+    'TRAM': '#831f82',
+    'BATEAU': '#2b9cbf'
+}
+
+# Noms des couches par type de véhicule (contrôle des couches et décompte des lignes en retard)
+vehicle_layer_names = {
+    'TRAM': '🚊 Tram',
+    'BUS': '🚍 Bus',
+    'BATEAU': '🚢 BatCub'
+}
+
+# Dictionnaire pour les emojis des véhicules
+emoji_dict = {'Tram': '🚊', 'Bus': '🚍', 'BatCub': '🚢'}
+
+# Définition de l'épaisseur de ligne
+line_weight = 2  # Ajustez cette valeur pour l'épaisseur souhaitée
+
+# Propriétés des lignes utilisées par les popups et le contrôle des retards
+popup_columns = ['ligne_com', 'libelle', 'vehicule', 'retard', 'vitesse', 'nb_vehicule']
+
+#-----------------------------------------------------#
+#                     Functions                       #
+#-----------------------------------------------------#
+
+# Pour la page Bus Tram BatCub
+def create_popup_text(row, line_emoji, line_color):
+    retard_moyen_minutes = row['retard'] / 60
+    return f"""
+    <div style="font-size:12px; padding:10px; background-color: #F8F9F9; border-radius: 5px; box-shadow: 0 0 10px rgba(0,0,0,0.25); min-width: 300px;">
+        <h4 style="color:{line_color};margin-bottom:10px">{row['ligne_com']}</h4>
+        <p style="margin-bottom:5px"><b>Terminus:</b> {row['libelle']}</p>
+        <p style="margin-bottom:5px"><b>Vehicule:</b> {line_emoji} {row['vehicule']}</p>
+        <p style="margin-bottom:5px"><b>Retard Moyen:</b> {retard_moyen_minutes:.2f} minutes</p>
+        <p style="margin-bottom:5px"><b>Vitesse Moyenne (km/h):</b> {row['vitesse']}</p>
+        <p style="margin-bottom:5px"><b>Nombre de véhicule/ligne:</b> {row['nb_vehicule']}</p>
+    </div>
+    """
+
+# Empreinte SHA-256 du fichier de données : change dès que le contenu du fichier change
+# (recalculée seulement si la date de modification ou la taille du fichier changent)
+def file_digest(file_path):
+    """Return the SHA-256 hex digest of a file"""
+    stat = os.stat(file_path)
+    return _file_digest(file_path, stat.st_mtime_ns, stat.st_size)
+
+@functools.lru_cache(maxsize=32)
+def _file_digest(file_path, mtime_ns, size, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+# Widgets pour dessiner sur la carte (export GeoJSON des formes dessinées)
+def add_draw_control(m):
+    """Add the Draw plugin to a map"""
+    draw = Draw(
+        export=True,
+        filename='data.geojson',
+        position='topleft',
+        draw_options={
+            'polyline': True,
+            'polygon': True,
+            'circle': True,
+            'rectangle': True,
+            'marker': True,
+        },
+        edit_options={'edit': True}
+    )
+    draw.add_to(m)
+    return draw
+
+# Couche d'un type de véhicule : une seule FeatureCollection, style et popups construits par Leaflet
+# (chaque couche s'inscrit dans network_layers pour que le contrôle des retards puisse la restyler)
+class NetworkLayer(MacroElement):
+    """Network lines of one vehicle type as a single client-side styled GeoJSON layer"""
+    _template = Template(u"""
+        {% macro script(this, kwargs) %}
+            window.network_layers = window.network_layers || [];
+            var {{ this.get_name() }} = L.geoJson({{ this.data }}, {
+                style: function(feature) { return {color: {{ this.color|tojson }}, weight: {{ this.weight }}}; },
+                onEachFeature: function(feature, layer) {
+                    var p = feature.properties;
+                    layer.base_color = {{ this.color|tojson }};
+                    layer.bindPopup(`
+                        <div style="font-size:12px; padding:10px; background-color: #F8F9F9; border-radius: 5px; box-shadow: 0 0 10px rgba(0,0,0,0.25); min-width: 300px;">
+                            <h4 style="color:{{ this.color }};margin-bottom:10px">${p.ligne_com}</h4>
+                            <p style="margin-bottom:5px"><b>Terminus:</b> ${p.libelle}</p>
+                            <p style="margin-bottom:5px"><b>Vehicule:</b> {{ this.emoji }} ${p.vehicule}</p>
+                            <p style="margin-bottom:5px"><b>Retard Moyen:</b> ${(p.retard / 60).toFixed(2)} minutes</p>
+                            <p style="margin-bottom:5px"><b>Vitesse Moyenne (km/h):</b> ${p.vitesse}</p>
+                            <p style="margin-bottom:5px"><b>Nombre de véhicule/ligne:</b> ${p.nb_vehicule}</p>
+                        </div>`);
+                }
+            }).addTo({{ this._parent.get_name() }});
+            window.network_layers.push({{ this.get_name() }});
+        {% endmacro %}
+    """)
+
+    def __init__(self, data, color, weight=2, emoji=''):
+        super().__init__()
+        self._name = 'NetworkLayer'
+        self.data = data
+        self.color = color
+        self.weight = weight
+        self.emoji = emoji
+
+# Contrôle des retards : simple changement de style des lignes existantes (aucune géométrie dupliquée, aucun aller-retour
+# avec l'application). Le seuil initial est fixé à la construction de la carte ; les couches de tuiles vectorielles
+# (window.network_tile_layers) lisent window.network_delay dans leur style et sont redessinées à chaque changement.
+# C'est le seul réglage du seuil : le nombre de lignes en retard par véhicule (précalculé pour chaque cran du curseur)
+# est affiché dans le contrôle et suit le seuil choisi
+class DelayControl(MacroElement):
+    """Client-side delay overlay: restyle late lines above an adjustable threshold"""
+    _template = Template(u"""
+        {% macro script(this, kwargs) %}
+            (function() {
+                var map = {{ this._parent.get_name() }};
+                var control = L.control({position: 'bottomleft'});
+                control.onAdd = function() {
+                    var div = L.DomUtil.create('div', 'leaflet-bar');
+                    div.style.background = 'white';
+                    div.style.padding = '6px';
+                    div.innerHTML = '<label><input type="checkbox" checked> Lignes en retards</label> '
+                        + '<input type="range" min="0" max="{{ this.max_threshold }}" step="{{ this.step }}"'
+                        + ' value="{{ this.threshold }}"> <b></b><div></div>';
+                    L.DomEvent.disableClickPropagation(div);
+                    return div;
+                };
+                control.addTo(map);
+                var container = control.getContainer();
+                var checkbox = container.querySelector('input[type=checkbox]');
+                var slider = container.querySelector('input[type=range]');
+                var label = container.querySelector('b');
+                var counts = container.querySelector('div');
+                var lateLines = {{ this.late_lines }};
+
+                var apply = function() {
+                    var threshold = parseInt(slider.value);
+                    window.network_delay = {enabled: checkbox.checked, threshold: threshold};
+                    label.innerHTML = '> ' + threshold + ' s';
+                    counts.innerHTML = lateLines.map(function(entry) {
+                        return entry.name + ' : ' + entry.late[Math.round(threshold / {{ this.step }})];
+                    }).join(' · ');
+                    (window.network_layers || []).forEach(function(group) {
+                        group.eachLayer(function(layer) {
+                            var late = checkbox.checked && layer.feature.properties.retard > threshold;
+                            layer.setStyle({color: late ? 'red' : layer.base_color});
+                            if (late) { layer.bringToFront(); }
+                        });
+                    });
+                    (window.network_tile_layers || []).forEach(function(layer) { layer.redraw(); });
+                };
+                checkbox.onchange = apply;
+                slider.oninput = apply;
+                apply();
+            })();
+        {% endmacro %}
+    """)
+
+    def __init__(self, threshold=100, max_threshold=600, step=10, late_lines=None):
+        super().__init__()
+        self._name = 'DelayControl'
+        self.threshold = threshold
+        self.max_threshold = max_threshold
+        self.step = step
+        late_lines = late_lines if late_lines is not None else {}
+        self.late_lines = json.dumps([
+            {'name': vehicle_layer_names.get(vehicule, vehicule), 'late': [int(count) for count in late_lines[vehicule]]}
+            for vehicule in late_lines
+        ], ensure_ascii=False)
+
+# Construction de la carte Bus • Tram • BatCub (une couche par véhicule, contrôle des retards, dessin)
+def build_network_map(gdf, tile, retard_seuil=100):
+    """Build the Bus / Tram / BatCub folium map"""
+    # Initialisation et ajout de la carte
+    m = folium.Map((44.84101, -0.64265), tiles=None, zoom_start=12)
+    folium.TileLayer(tile, attr='© MapTiler © OpenStreetMap contributors', name='Dataviz Map').add_to(m)
+
+    # Une FeatureCollection par type de véhicule, construite en une passe (sans iterrows)
+    columns = [col for col in popup_columns if col in gdf]
+    for vehicule, name in vehicle_layer_names.items():
+        subset = gdf.loc[gdf['vehicule'] == vehicule, columns + ['geometry']]
+        layer = folium.FeatureGroup(name=name)
+        NetworkLayer(
+            subset.to_json(drop_id=True),
+            vehicle_color_map[vehicule],
+            weight=line_weight,
+            emoji=emoji_dict.get(vehicule, ''),
+        ).add_to(layer)
+        layer.add_to(m)
+
+    # Retards : restylage côté navigateur au-delà du seuil (seuil initial, ajustable sur la carte)
+    DelayControl(retard_seuil, late_lines=late_lines_by_threshold(gdf)).add_to(m)
+
+    # Widgets pour dessiner sur la carte
+    add_draw_control(m)
+
+    folium.LayerControl().add_to(m)
+    return m
+
+# Rendu HTML complet de la carte, tel que l'affiche folium_static
+def render_map_html(m):
+    """Render a folium map to a standalone HTML document"""
+    return folium.Figure().add_child(m).render()
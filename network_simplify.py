@@ -0,0 +1,141 @@
+
+#-----------------------------------------------------#
+#                      Imports                        #
+#-----------------------------------------------------#
+
+import os                                               # Chemins des niveaux de détail
+import sys                                              # Arguments de la ligne de commande
+import time                                             # Mesure du temps de rendu
+import math                                             # Résolution au sol par niveau de zoom
+import numpy as np                                      # Remplacement des géométries vides
+import geopandas as gpd                                 # Traiter les données Géospatial
+import shapely                                          # Simplification, quantification et mesure d'erreur
+from network_map import build_network_map, render_map_html  # Mesure du rendu de la carte Bus • Tram • BatCub
+
+#-----------------------------------------------------#
+#                   Global Variables                  #
+#-----------------------------------------------------#
+
+# Fichier brut des lignes Bus, Tram et BatCub
+network_raw_path = './Data/gdfbustrambat.json'
+
+# Projection métrique (Lambert-93) pour exprimer les tolérances en mètres
+metric_crs = 'EPSG:2154'
+
+# Niveaux de zoom pour lesquels un niveau de détail est précalculé
+lod_zooms = [12, 14, 16]
+
+# Zoom du niveau de détail affiché sur la page Bus • Tram • BatCub
+network_lod_zoom = 14
+
+# Tolérance de simplification en pixels écran (un demi-pixel reste invisible à l'affichage)
+pixel_tolerance = 0.5
+
+# Latitude de référence (Bordeaux) pour la résolution au sol
+reference_latitude = 44.84
+
+# Décimales conservées pour les coordonnées WGS84 des fichiers écrits (1e-6 degré, soit environ 0,1 m)
+coordinate_decimals = 6
+
+#-----------------------------------------------------#
+#                     Functions                       #
+#-----------------------------------------------------#
+
+# Taille d'un pixel au sol (m) au zoom donné, en projection Web Mercator
+def meters_per_pixel(zoom, latitude=reference_latitude):
+    """Ground resolution of a 256 px web-mercator tile pixel"""
+    return 156543.03392 * math.cos(math.radians(latitude)) / 2 ** zoom
+
+# Chemin du niveau de détail d'un zoom donné (ex. gdfbustrambat_z14.json)
+def lod_path(zoom, raw_path=network_raw_path):
+    """Path of the simplified file for one zoom level"""
+    root, ext = os.path.splitext(raw_path)
+    return f'{root}_z{zoom}{ext}'
+
+# Fichier à afficher pour un zoom : niveau de détail s'il est plus récent que le fichier brut, sinon fichier brut
+def current_lod_path(zoom, raw_path=network_raw_path):
+    """Simplified file of one zoom when up to date with the raw file, else the raw file"""
+    path = lod_path(zoom, raw_path)
+    if not os.path.exists(path):
+        return raw_path
+    if os.path.exists(raw_path) and os.path.getmtime(raw_path) > os.path.getmtime(path):
+        return raw_path
+    return path
+
+# Arrondi des coordonnées à la précision écrite dans les fichiers
+def round_coordinates(geometries, decimals=coordinate_decimals):
+    """Geometries with coordinates rounded to a number of decimals"""
+    return shapely.transform(geometries, lambda coords: np.round(coords, decimals))
+
+# Demi-diagonale (m) de la grille des coordonnées arrondies
+def rounding_error(decimals=coordinate_decimals):
+    """Maximum displacement in metres caused by rounding WGS84 coordinates"""
+    return math.sqrt(2) / 2 * 10 ** -decimals * 111_320
+
+# Simplification topologique et quantification des coordonnées pour un zoom
+def simplify_network(gdf, zoom):
+    """Return (simplified GeoDataFrame, max geometric error in metres)"""
+    tolerance = pixel_tolerance * meters_per_pixel(zoom)
+    projected = gdf.geometry.to_crs(metric_crs)
+
+    # Simplification en mètres, sans auto-intersection ni disparition de géométrie
+    simplified = shapely.simplify(projected.values, tolerance, preserve_topology=True)
+
+    # Quantification : grille de la moitié de la tolérance, puis retour en WGS84
+    simplified = shapely.set_precision(simplified, tolerance / 2)
+
+    # Les lignes plus courtes que la grille disparaissent : on conserve alors la géométrie brute
+    simplified = np.where(shapely.is_empty(simplified), projected.values, simplified)
+    simplified = gpd.GeoSeries(simplified, crs=metric_crs, index=gdf.index)
+
+    # Retour en WGS84 et arrondi des coordonnées tel qu'écrit dans le fichier
+    written = round_coordinates(simplified.to_crs(gdf.crs).values)
+
+    # Erreur géométrique maximale (distance de Hausdorff entre géométrie brute et géométrie écrite)
+    written_projected = gpd.GeoSeries(written, crs=gdf.crs, index=gdf.index).to_crs(metric_crs)
+    error = float(shapely.hausdorff_distance(projected.values, written_projected.values).max()) if len(gdf) else 0.0
+
+    result = gdf.copy()
+    result['geometry'] = written
+    return result, error
+
+# Nombre total de sommets des géométries
+def vertex_count(gdf):
+    """Total number of coordinates in the GeoDataFrame"""
+    return int(shapely.get_num_coordinates(gdf.geometry.values).sum())
+
+# Temps de construction + rendu HTML de la carte Bus • Tram • BatCub
+def render_time(gdf):
+    """Seconds to build and render the network map"""
+    start = time.perf_counter()
+    render_map_html(build_network_map(gdf, 'OpenStreetMap'))
+    return time.perf_counter() - start
+
+# Précalcul de tous les niveaux de détail et rapport avant / après
+def build_lods(raw_path=network_raw_path, zooms=lod_zooms):
+    """Write one simplified file per zoom and print a size / error report"""
+    gdf = gpd.read_file(raw_path)
+    raw_bytes = os.path.getsize(raw_path)
+    print(f"{'niveau':>8} {'sommets':>10} {'octets':>12} {'rendu (s)':>10} {'erreur max (m)':>15} {'borne (m)':>10}")
+    print(f"{'brut':>8} {vertex_count(gdf):>10} {raw_bytes:>12} {render_time(gdf):>10.3f} {0.0:>15.2f} {0.0:>10.2f}")
+
+    for zoom in zooms:
+        simplified, error = simplify_network(gdf, zoom)
+        # Borne : tolérance de simplification + demi-diagonales des grilles de quantification et d'arrondi
+        bound = pixel_tolerance * meters_per_pixel(zoom) * (1 + math.sqrt(2) / 4) + rounding_error()
+        path = lod_path(zoom, raw_path)
+        tmp_path = f'{path}.tmp'
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        simplified.to_file(tmp_path, driver='GeoJSON', COORDINATE_PRECISION=coordinate_decimals)
+        print(f"{'z' + str(zoom):>8} {vertex_count(simplified):>10} {os.path.getsize(tmp_path):>12} "
+              f"{render_time(simplified):>10.3f} {error:>15.2f} {bound:>10.2f}")
+        # Le niveau ne remplace le fichier en place qu'une fois la borne vérifiée
+        if error > bound + 1e-6:
+            os.remove(tmp_path)
+            raise ValueError(f"Erreur géométrique {error:.2f} m au-delà de la borne {bound:.2f} m (z{zoom})")
+        os.replace(tmp_path, path)
+
+if __name__ == '__main__':
+    # Usage : python network_simplify.py [zoom ...]
+    build_lods(zooms=[int(arg) for arg in sys.argv[1:]] or lod_zooms)
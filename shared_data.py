@@ -0,0 +1,193 @@
+
+#-----------------------------------------------------#
+#                      Imports                        #
+#-----------------------------------------------------#
+
+import os                                               # Fichiers versionnés et pointeur de version
+import sys                                              # Arguments de la ligne de commande
+import json                                             # Pointeur des versions courantes
+import fcntl                                            # Verrou de publication entre processus
+import time                                             # Date à laquelle une version cesse d'être courante
+import contextlib                                       # Section verrouillée
+import pandas as pd                                     # Manipulation des bases de données
+import pyarrow as pa                                    # Tables Arrow IPC lues par memory-map
+from dotenv import load_dotenv                          # Dossier partagé défini dans le .env
+from vcub_data import add_time_columns, compact_types, file_version, vcub_csv_path  # Préparation du relevé VCub
+
+#-----------------------------------------------------#
+#                   Global Variables                  #
+#-----------------------------------------------------#
+
+# Dossier des jeux de données partagés par tous les processus de l'hôte
+# (shared_data_root dans le .env, par ex. /dev/shm/bordeaux_data_sync pour rester en mémoire vive)
+load_dotenv()
+shared_data_root = os.getenv("shared_data_root", './Data/shared')
+
+# Nombre de versions conservées par jeu de données (un lecteur peut encore utiliser la précédente)
+keep_versions = 2
+
+# Durée minimale de conservation d'une version après qu'elle a cessé d'être courante, en secondes : l'application
+# garde la version résolue jusqu'à shared_data_ttl (30 s, app_pages/common.py), même si plusieurs publications
+# se succèdent pendant ce délai
+version_retention = 120
+
+#-----------------------------------------------------#
+#                     Functions                       #
+#-----------------------------------------------------#
+
+# Jeux de données publiés en fichiers Arrow IPC versionnés, lus sans copie par memory-map
+# (les pages mappées sont partagées par toutes les sessions et tous les processus de l'hôte via le cache du système)
+class DataService:
+    """Versioned Arrow IPC datasets shared by every process on the host"""
+
+    def __init__(self, root=shared_data_root):
+        self.root = root
+        self.pointer_path = os.path.join(root, 'CURRENT.json')
+
+    def _path(self, name, version):
+        return os.path.join(self.root, name, f'{version}.arrow')
+
+    # Versions courantes (petit fichier relu à chaque appel : une publication est visible immédiatement)
+    def versions(self):
+        """{dataset: current version}"""
+        try:
+            with open(self.pointer_path, encoding='utf-8') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+
+    def current_version(self, name):
+        return self.versions().get(name)
+
+    # Verrou exclusif entre processus pendant une publication
+    @contextlib.contextmanager
+    def _locked(self):
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, '.lock'), 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    # Écriture du fichier de la version, puis bascule atomique du pointeur (appelée sous le verrou)
+    def _publish(self, name, table, version):
+        path = self._path(name, version)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if not os.path.exists(path):
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            os.replace(tmp_path, path)
+
+        versions = self.versions()
+        previous = versions.get(name)
+        versions[name] = version
+        tmp_pointer = f'{self.pointer_path}.{os.getpid()}.tmp'
+        with open(tmp_pointer, 'w', encoding='utf-8') as file:
+            json.dump(versions, file)
+        os.replace(tmp_pointer, self.pointer_path)
+
+        # Date de modification de la version remplacée : moment où elle a cessé d'être courante
+        if previous not in (None, version):
+            with contextlib.suppress(FileNotFoundError):
+                os.utime(self._path(name, previous))
+        self._prune(name, version)
+        return path
+
+    # Publication d'une nouvelle version : les lecteurs en cours gardent l'ancienne, les suivants lisent la nouvelle
+    def publish(self, name, table, version):
+        """Write a table as a new version of a dataset and make it current"""
+        with self._locked():
+            return self._publish(name, table, version)
+
+    # Suppression des anciennes versions au-delà de keep_versions, une fois remplacées depuis au moins
+    # version_retention secondes (un fichier encore mappé reste lisible jusqu'à sa fermeture)
+    def _prune(self, name, current):
+        directory = os.path.join(self.root, name)
+        files = sorted(
+            (entry for entry in os.scandir(directory) if entry.name.endswith('.arrow')),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        stale = [entry for entry in files if entry.name != f'{current}.arrow'][:-(keep_versions - 1) or None]
+        for entry in stale:
+            if time.time() - entry.stat().st_mtime >= version_retention:
+                os.remove(entry.path)
+
+    # Lecture sans copie : les colonnes pointent directement dans le fichier mappé
+    # (version déjà supprimée : la version courante est lue à la place, elle remplace la version demandée)
+    def open(self, name, version=None):
+        """Memory-mapped Arrow table of a dataset version (current one by default)"""
+        current = self.current_version(name)
+        version = version or current
+        if version is None:
+            raise FileNotFoundError(f"Jeu de données non publié : {name}")
+        try:
+            source = pa.memory_map(self._path(name, version))
+        except FileNotFoundError:
+            if current is None or version == current:
+                raise
+            return self.open(name, current)
+        with source:
+            return pa.ipc.open_file(source).read_all()
+
+    # Version courante, publiée d'abord si le fichier source a changé (appelée par la ligne de commande ci-dessous,
+    # jamais pendant une requête de l'application ; un seul processus construit la table à la fois)
+    def ensure(self, name, source_path, publisher):
+        """Current version of a dataset, (re)published from its source file when stale"""
+        version = file_version(source_path)
+        if self.current_version(name) != version:
+            with self._locked():
+                if self.current_version(name) != version:
+                    self._publish(name, publisher(source_path), version)
+        return version
+
+#-----------------------------------------------------#
+#                 Jeux de données publiés             #
+#-----------------------------------------------------#
+
+# Relevé VCub complet (types compacts, colonnes heure et date formatée déjà calculées)
+def vcub_table(csv_path=vcub_csv_path):
+    """Arrow table of the VCub readings, sorted by time"""
+    data = pd.read_csv(csv_path, parse_dates=['mdate'])
+    data = compact_types(data.sort_values('mdate', kind='stable').reset_index(drop=True))
+    return pa.Table.from_pandas(add_time_columns(data), preserve_index=False)
+
+def read_vcub(service, version):
+    """VCub DataFrame backed by the shared memory-mapped table"""
+    # split_blocks : les colonnes numériques sans valeur manquante sont lues sans copie
+    return service.open('vcub', version).to_pandas(split_blocks=True)
+
+# Lignes du réseau : attributs en colonnes Arrow, géométries en WKB
+def network_table(path):
+    """Arrow table of the network lines (geometry as WKB)"""
+    import geopandas as gpd
+    import shapely
+
+    gdf = gpd.read_file(path)
+    table = pa.Table.from_pandas(pd.DataFrame(gdf.drop(columns='geometry')), preserve_index=False)
+    table = table.append_column('geometry', pa.array(shapely.to_wkb(gdf.geometry.values), type=pa.binary()))
+    return table.replace_schema_metadata({**(table.schema.metadata or {}), b'crs': str(gdf.crs).encode()})
+
+def read_network(service, version):
+    """Network GeoDataFrame rebuilt from the shared table (attributes without copy)"""
+    import geopandas as gpd
+    import shapely
+
+    table = service.open('network', version)
+    geometry = shapely.from_wkb(table.column('geometry').to_numpy(zero_copy_only=False))
+    crs = table.schema.metadata.get(b'crs', b'EPSG:4326').decode()
+    attributes = table.drop(['geometry']).to_pandas(split_blocks=True)
+    return gpd.GeoDataFrame(attributes, geometry=geometry, crs=crs)
+
+if __name__ == '__main__':
+    # Usage : python shared_data.py publish [réseau.json]   (publie le relevé VCub et les lignes du réseau affichées ;
+    #                                                         à lancer après chaque mise à jour des fichiers, ex. cron)
+    #         python shared_data.py status                   (versions courantes)
+    from network_simplify import current_lod_path, network_lod_zoom
+
+    service = DataService()
+    args = sys.argv[1:] or ['status']
+    if args[0] == 'publish':
+        print('vcub', service.ensure('vcub', vcub_csv_path, vcub_table))
+        network_path = args[1] if len(args) > 1 else current_lod_path(network_lod_zoom)
+        print('network', service.ensure('network', network_path, network_table))
+    else:
+        print(json.dumps(service.versions(), indent=2))
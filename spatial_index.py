@@ -0,0 +1,120 @@
+
+#-----------------------------------------------------#
+#                      Imports                        #
+#-----------------------------------------------------#
+
+import numpy as np                                      # Sélections et distances vectorisées
+import pandas as pd                                     # Résultats des requêtes
+import geopandas as gpd                                 # Projection métrique des géométries
+import shapely                                          # Index R-tree (STRtree) et prédicats spatiaux
+from shapely.geometry import shape                      # Conversion des formes dessinées (GeoJSON)
+
+#-----------------------------------------------------#
+#                   Global Variables                  #
+#-----------------------------------------------------#
+
+# Projection métrique (Lambert-93) : les distances des requêtes sont en mètres
+metric_crs = 'EPSG:2154'
+
+#-----------------------------------------------------#
+#                     Functions                       #
+#-----------------------------------------------------#
+
+# Index spatial des stations VCub et des lignes Bus • Tram • BatCub
+class SpatialIndex:
+    """STRtree-backed radius, viewport and nearest queries on stations and lines"""
+
+    def __init__(self, stations, lines):
+        # Stations : une ligne par station (nom, latitude, longitude)
+        self.stations = stations.reset_index(drop=True)
+        points = gpd.GeoSeries(
+            gpd.points_from_xy(self.stations['longitude'], self.stations['latitude']), crs='EPSG:4326'
+        )
+        self._station_geoms = points.to_crs(metric_crs).values
+        self._station_tree = shapely.STRtree(self._station_geoms)
+
+        # Lignes : GeoDataFrame du réseau, projeté une seule fois
+        self.lines = lines.reset_index(drop=True)
+        self._line_geoms = self.lines.geometry.to_crs(metric_crs).values
+        self._line_tree = shapely.STRtree(self._line_geoms)
+
+    # Conversion d'une géométrie WGS84 (shapely ou GeoJSON) en Lambert-93
+    @staticmethod
+    def to_metric(geometry):
+        """Project a WGS84 geometry or GeoJSON mapping to the metric CRS"""
+        if isinstance(geometry, dict):
+            geometry = shape(geometry.get('geometry', geometry))
+        return gpd.GeoSeries([geometry], crs='EPSG:4326').to_crs(metric_crs).values[0]
+
+    # Stations à moins de distance_m de la forme (0 : à l'intérieur de la forme)
+    def stations_within(self, geometry, distance_m=0):
+        """Stations within distance_m metres of a WGS84 geometry, with their distance"""
+        geometry = self.to_metric(geometry)
+        if distance_m > 0:
+            idx = self._station_tree.query(geometry, predicate='dwithin', distance=distance_m)
+        else:
+            idx = self._station_tree.query(geometry, predicate='intersects')
+        return self._station_result(idx, geometry)
+
+    # Lignes qui croisent la forme (rectangle de la vue, polygone dessiné, ...) ou passent à moins de distance_m
+    def lines_intersecting(self, geometry, distance_m=0):
+        """Network lines intersecting (or within distance_m metres of) a WGS84 geometry"""
+        geometry = self.to_metric(geometry)
+        if distance_m > 0:
+            idx = self._line_tree.query(geometry, predicate='dwithin', distance=distance_m)
+        else:
+            idx = self._line_tree.query(geometry, predicate='intersects')
+        return self.lines.iloc[np.sort(idx)].drop(columns='geometry')
+
+    # Stations dans l'emprise de la vue (ouest, sud, est, nord)
+    def stations_in_viewport(self, west, south, east, north):
+        """Stations inside a WGS84 bounding box"""
+        return self.stations_within(shapely.box(west, south, east, north))
+
+    # k stations les plus proches : rayon doublé jusqu'à trouver k stations, puis tri par distance
+    def nearest_stations(self, geometry, k=5, start_radius=250):
+        """The k stations nearest to a WGS84 geometry"""
+        geometry = self.to_metric(geometry)
+        k = min(k, len(self.stations))
+        radius = start_radius
+        idx = self._station_tree.query(geometry, predicate='dwithin', distance=radius)
+        while len(idx) < k:
+            radius *= 2
+            idx = self._station_tree.query(geometry, predicate='dwithin', distance=radius)
+        return self._station_result(idx, geometry).head(k)
+
+    def _station_result(self, idx, geometry):
+        result = self.stations.iloc[idx].copy()
+        result['distance_m'] = shapely.distance(self._station_geoms[idx], geometry).round(1)
+        return result.sort_values('distance_m')
+
+# Requête de référence sans index (parcours de toutes les stations) pour le benchmark
+def brute_force_stations_within(index, geometry, distance_m=0):
+    """Same result as SpatialIndex.stations_within, by scanning every station"""
+    geometry = index.to_metric(geometry)
+    distances = shapely.distance(index._station_geoms, geometry)
+    return index._station_result(np.flatnonzero(distances <= distance_m), geometry)
+
+# Requêtes pour une forme dessinée (Draw) : un marqueur ou un cercle donne aussi les stations les plus proches
+def query_drawing(index, feature, distance_m):
+    """Run the app's queries for one drawn GeoJSON feature"""
+    geometry = shape(feature['geometry'])
+    # Cercle dessiné : exporté comme un point accompagné de son rayon (m)
+    radius = (feature.get('properties') or {}).get('radius') or 0
+    results = {
+        'stations': index.stations_within(geometry, distance_m + radius),
+        'lines': index.lines_intersecting(geometry, radius),
+    }
+    if geometry.geom_type == 'Point':
+        results['nearest'] = index.nearest_stations(geometry)
+    return results
+
+# Dernière position connue de chaque station
+def station_positions(data):
+    """One (nom, latitude, longitude) row per station"""
+    stations = data.drop_duplicates(subset=['nom'], keep='last')[['nom', 'latitude', 'longitude']]
+    return pd.DataFrame({
+        'nom': stations['nom'].astype(str),
+        'latitude': stations['latitude'].astype('float64'),
+        'longitude': stations['longitude'].astype('float64'),
+    })
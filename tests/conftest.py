@@ -0,0 +1,25 @@
+
+#-----------------------------------------------------#
+#        Tests : modules du dépôt importables         #
+#-----------------------------------------------------#
+
+import os
+import sys
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# Relevé complet de quelques stations VCub à une heure donnée (nombre de vélos par station), pour les tests
+# du collecteur et du pré-rendu
+@pytest.fixture
+def snapshot():
+    """Factory of full VCub readings: snapshot(mdate, bikes) -> one row per station"""
+    def make(mdate, bikes):
+        return pd.DataFrame({
+            'mdate': pd.Timestamp(mdate), 'nom': [f'Station {i}' for i in range(len(bikes))], 'etat': 'CONNECTEE',
+            'latitude': [44.84 + i / 100 for i in range(len(bikes))], 'longitude': -0.57,
+            'nbvelos': bikes, 'nbelec': 0, 'nbclassiq': bikes, 'nbplaces': [20 - b for b in bikes],
+        })
+
+    return make
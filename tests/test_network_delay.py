@@ -0,0 +1,18 @@
+#-----------------------------------------------------#
+#       Tests : statistiques de retard des lignes     #
+#-----------------------------------------------------#
+
+import numpy as np
+import pandas as pd
+from network_delay import late_lines_by_threshold
+
+def test_late_lines_match_a_comparison_per_threshold():
+    rng = np.random.default_rng(0)
+    retard = rng.integers(0, 700, 200).astype('float64')
+    retard[:3] = [100, 100, np.nan]                     # Retards égaux au seuil (non comptés) et retard inconnu
+    gdf = pd.DataFrame({'vehicule': rng.choice(['BUS', 'TRAM', 'BATEAU'], 200), 'retard': retard})
+    late = late_lines_by_threshold(gdf)
+    assert late.index.tolist() == list(range(0, 610, 10))
+    for threshold in late.index:
+        expected = (gdf['retard'] > threshold).groupby(gdf['vehicule']).sum()
+        assert late.loc[threshold].to_dict() == expected.to_dict()
@@ -0,0 +1,106 @@
+#-----------------------------------------------------#
+#    Tests : jeux de données partagés (Arrow IPC)     #
+#-----------------------------------------------------#
+
+import os
+import geopandas as gpd
+import pandas as pd
+import pyarrow as pa
+import pytest
+from shapely.geometry import LineString
+import shared_data
+from shared_data import DataService, network_table, read_network, read_vcub, vcub_table
+
+def table(value):
+    return pa.table({'value': [value, value + 1]})
+
+def versions_on_disk(service, name):
+    return sorted(os.listdir(os.path.join(service.root, name)))
+
+def test_publish_switches_the_current_version(tmp_path):
+    service = DataService(str(tmp_path))
+    assert service.current_version('demo') is None
+    with pytest.raises(FileNotFoundError):
+        service.open('demo')
+
+    service.publish('demo', table(1), 'v1')
+    service.publish('demo', table(2), 'v2')
+    assert service.versions() == {'demo': 'v2'}
+    assert service.open('demo')['value'].to_pylist() == [2, 3]
+    # Version précédente toujours lisible (un lecteur peut encore l'utiliser)
+    assert service.open('demo', 'v1')['value'].to_pylist() == [1, 2]
+
+def test_old_versions_are_pruned(tmp_path, monkeypatch):
+    monkeypatch.setattr(shared_data, 'version_retention', 0)
+    service = DataService(str(tmp_path))
+    for number in range(1, 5):
+        service.publish('demo', table(number), f'v{number}')
+        os.utime(service._path('demo', f'v{number}'), (number, number))
+    assert versions_on_disk(service, 'demo') == ['v3.arrow', 'v4.arrow']
+
+def test_versions_outlive_the_application_version_cache(tmp_path, monkeypatch):
+    service = DataService(str(tmp_path))
+    service.publish('demo', table(1), 'v1')
+    # Deux publications pendant la durée de cache de la version résolue par l'application : v1 reste lisible
+    service.publish('demo', table(2), 'v2')
+    service.publish('demo', table(3), 'v3')
+    assert versions_on_disk(service, 'demo') == ['v1.arrow', 'v2.arrow', 'v3.arrow']
+    assert service.open('demo', 'v1')['value'].to_pylist() == [1, 2]
+
+    # Supprimée une fois remplacée depuis plus de version_retention secondes
+    monkeypatch.setattr(shared_data, 'version_retention', 0)
+    service.publish('demo', table(4), 'v4')
+    assert versions_on_disk(service, 'demo') == ['v3.arrow', 'v4.arrow']
+    # Version supprimée encore demandée par un lecteur : la version courante est lue
+    assert service.open('demo', 'v1')['value'].to_pylist() == [4, 5]
+
+def test_ensure_publishes_only_when_the_source_changes(tmp_path):
+    service = DataService(str(tmp_path / 'shared'))
+    source = tmp_path / 'source.txt'
+    source.write_text('1')
+    calls = []
+
+    def publisher(path):
+        calls.append(path)
+        return table(int(open(path).read()))
+
+    first = service.ensure('demo', str(source), publisher)
+    assert service.ensure('demo', str(source), publisher) == first
+    assert len(calls) == 1
+
+    source.write_text('22')
+    second = service.ensure('demo', str(source), publisher)
+    assert second != first and service.current_version('demo') == second
+    assert service.open('demo')['value'].to_pylist() == [22, 23]
+    assert len(calls) == 2
+
+def test_vcub_round_trip(tmp_path):
+    csv_path = tmp_path / 'stations.csv'
+    pd.DataFrame({
+        'mdate': ['2023-07-01 08:05:00', '2023-07-01 08:00:00'], 'nom': ['B', 'A'], 'etat': 'CONNECTEE',
+        'latitude': [44.84, 44.85], 'longitude': [-0.57, -0.58], 'nbvelos': [3, 4], 'nbelec': [1, 2],
+        'nbclassiq': [2, 2], 'nbplaces': [7, 6],
+    }).to_csv(csv_path, index=False)
+    service = DataService(str(tmp_path / 'shared'))
+    service.publish('vcub', vcub_table(str(csv_path)), 'v1')
+
+    data = read_vcub(service, 'v1')
+    assert data['nom'].astype(str).tolist() == ['A', 'B']
+    assert data['nbvelos'].tolist() == [4, 3]
+    assert data['time'].astype(str).tolist() == ['08:00', '08:05']
+
+def test_network_round_trip(tmp_path):
+    path = tmp_path / 'network.json'
+    lines = gpd.GeoDataFrame(
+        {'libelle': ['Tram A', 'Bus 1'], 'retard': [30, 250]},
+        geometry=[LineString([(-0.58, 44.84), (-0.57, 44.85)]), LineString([(-0.56, 44.83), (-0.55, 44.82)])],
+        crs='EPSG:4326',
+    )
+    lines.to_file(path, driver='GeoJSON')
+    service = DataService(str(tmp_path / 'shared'))
+    service.publish('network', network_table(str(path)), 'v1')
+
+    network = read_network(service, 'v1')
+    assert network.crs == lines.crs
+    assert network['libelle'].tolist() == ['Tram A', 'Bus 1']
+    assert network.geometry.geom_equals(lines.geometry).all()
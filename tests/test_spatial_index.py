@@ -0,0 +1,68 @@
+#-----------------------------------------------------#
+#   Tests : index spatial et formes dessinées         #
+#-----------------------------------------------------#
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+from shapely.geometry import LineString, mapping
+from spatial_index import SpatialIndex, brute_force_stations_within, query_drawing, station_positions
+
+# Stations aléatoires autour de Bordeaux et deux lignes (une est-ouest, une nord-sud)
+def index(stations=300, seed=0):
+    rng = np.random.default_rng(seed)
+    positions = pd.DataFrame({
+        'nom': [f'Station {i}' for i in range(stations)],
+        'latitude': rng.uniform(44.80, 44.88, stations), 'longitude': rng.uniform(-0.62, -0.52, stations),
+    })
+    lines = gpd.GeoDataFrame(
+        {'libelle': ['Est-Ouest', 'Nord-Sud']},
+        geometry=[LineString([(-0.62, 44.84), (-0.52, 44.84)]), LineString([(-0.57, 44.80), (-0.57, 44.82)])],
+        crs='EPSG:4326',
+    )
+    return SpatialIndex(positions, lines)
+
+def test_radius_query_matches_a_full_scan():
+    spatial_index = index()
+    for geometry, distance in [(shapely.Point(-0.57, 44.84), 500), (shapely.box(-0.60, 44.82, -0.56, 44.85), 0),
+                               (shapely.box(-0.60, 44.82, -0.56, 44.85), 200)]:
+        expected = brute_force_stations_within(spatial_index, geometry, distance)
+        actual = spatial_index.stations_within(geometry, distance)
+        assert sorted(actual['nom']) == sorted(expected['nom'])
+        assert actual['distance_m'].is_monotonic_increasing
+
+def test_nearest_stations():
+    spatial_index = index()
+    point = shapely.Point(-0.57, 44.84)
+    nearest = spatial_index.nearest_stations(point, k=5, start_radius=10)
+    expected = brute_force_stations_within(spatial_index, point, 1e6).head(5)
+    assert nearest['nom'].tolist() == expected['nom'].tolist()
+
+def test_drawn_polygon():
+    spatial_index = index()
+    feature = {'type': 'Feature', 'properties': {}, 'geometry': mapping(shapely.box(-0.60, 44.835, -0.58, 44.845))}
+    results = query_drawing(spatial_index, feature, 0)
+    assert results['lines']['libelle'].tolist() == ['Est-Ouest']
+    assert 'nearest' not in results
+    assert sorted(results['stations']['nom']) == sorted(
+        brute_force_stations_within(spatial_index, shapely.box(-0.60, 44.835, -0.58, 44.845))['nom']
+    )
+
+def test_drawn_circle_uses_its_radius():
+    spatial_index = index()
+    # Cercle centré à 5 km au sud de la ligne Est-Ouest (environ 0,045 degré de latitude)
+    center = shapely.Point(-0.57, 44.795)
+    feature = {'type': 'Feature', 'properties': {'radius': 3000}, 'geometry': mapping(center)}
+    results = query_drawing(spatial_index, feature, 100)
+    assert results['lines']['libelle'].tolist() == ['Nord-Sud']
+    assert sorted(results['stations']['nom']) == sorted(brute_force_stations_within(spatial_index, center, 3100)['nom'])
+    assert len(results['nearest']) == 5
+
+def test_station_positions_keep_the_last_reading():
+    data = pd.DataFrame({
+        'nom': pd.Categorical(['A', 'B', 'A']), 'latitude': [44.80, 44.81, 44.82], 'longitude': [-0.57, -0.58, -0.59],
+    })
+    positions = station_positions(data).set_index('nom')
+    assert positions.loc['A', 'latitude'] == 44.82
+    assert len(positions) == 2
@@ -0,0 +1,117 @@
+#-----------------------------------------------------#
+#   Tests : cache disque des tuiles du fond de carte  #
+#-----------------------------------------------------#
+
+import os
+import asyncio
+import aiohttp
+from aiohttp import web
+import tile_proxy
+from tile_proxy import TileCache, make_app
+
+tile_bytes = 1000
+
+# Serveur amont local : une tuile de tile_bytes octets par requête, requêtes comptées
+async def start_upstream(requests, delay=0.01):
+    async def tile(request):
+        requests.append(request.path)
+        await asyncio.sleep(delay)
+        return web.Response(body=b'x' * tile_bytes, content_type='image/png')
+
+    app = web.Application()
+    app.router.add_get('/{z}/{x}/{y}.png', tile)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    host, port = runner.addresses[0][:2]
+    return runner, f'http://{host}:{port}/{{z}}/{{x}}/{{y}}.png'
+
+# Exécution d'un scénario avec un serveur amont et des caches démarrés sur le même dossier
+def run(scenario, root, caches=1, **options):
+    async def main():
+        requests = []
+        runner, upstream = await start_upstream(requests)
+        instances = [TileCache(upstream, root=str(root), **options) for _ in range(caches)]
+        for cache in instances:
+            await cache.start()
+        try:
+            await scenario(*instances)
+        finally:
+            for cache in instances:
+                await cache.close()
+            await runner.cleanup()
+        return requests
+
+    return asyncio.run(main())
+
+def tiles_on_disk(root):
+    return sorted(
+        os.path.relpath(os.path.join(directory, name), root)
+        for directory, _, files in os.walk(root) for name in files if name.endswith('.png')
+    )
+
+def test_hit_after_miss_and_single_upstream_request(tmp_path):
+    async def scenario(cache):
+        # Requêtes simultanées de la même tuile : une seule requête amont
+        assert await asyncio.gather(*(cache.get(12, 1, 2) for _ in range(5))) == [b'x' * tile_bytes] * 5
+        await cache.get(12, 1, 2)
+        assert cache.metrics()['hits'] == 1
+
+    assert run(scenario, tmp_path) == ['/12/1/2.png']
+    assert tiles_on_disk(tmp_path) == [os.path.join('12', '1', '2.png')]
+
+def test_least_recently_used_tiles_are_evicted(tmp_path):
+    async def scenario(cache):
+        for y in range(5):
+            await cache.get(12, 0, y)
+        await cache.get(12, 0, 0)                       # Tuile 0 de nouveau la plus récente
+        for y in range(5, 8):
+            await cache.get(12, 0, y)
+
+    run(scenario, tmp_path, max_bytes=5 * tile_bytes)
+    assert tiles_on_disk(tmp_path) == sorted(os.path.join('12', '0', f'{y}.png') for y in (0, 4, 5, 6, 7))
+
+def test_eviction_accounts_for_other_processes(tmp_path, monkeypatch):
+    monkeypatch.setattr(tile_proxy, 'tile_cache_rescan_writes', 5)
+
+    async def scenario(first, second):
+        for y in range(4):
+            await first.get(12, 0, y)
+        # Un autre processus lit la tuile 0 (la plus ancienne pour le premier) et écrit ses propres tuiles
+        await second.get(12, 0, 0)
+        for y in range(10, 13):
+            await second.get(12, 0, y)
+        # Cinquième écriture du premier : l'index est relu depuis le dossier commun avant l'éviction
+        await first.get(12, 0, 4)
+
+    requests = run(scenario, tmp_path, caches=2, max_bytes=5 * tile_bytes)
+    # Les tuiles 1 à 3 du premier processus sont les moins récemment utilisées, tous processus confondus
+    assert tiles_on_disk(tmp_path) == sorted(os.path.join('12', '0', f'{y}.png') for y in (0, 4, 10, 11, 12))
+    # La tuile 0 écrite par le premier processus est servie au second depuis le disque
+    assert requests.count('/12/0/0.png') == 1
+
+# Statut renvoyé par le proxy pour une tuile, selon l'URL amont et le délai maximal des requêtes amont
+def proxy_status(root, upstream=None, delay=0.01, timeout=1):
+    async def main():
+        upstream_runner, upstream_url = await start_upstream([], delay)
+        runner = web.AppRunner(make_app(TileCache(upstream or upstream_url, root=str(root), timeout=timeout)))
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        host, port = runner.addresses[0][:2]
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(f'http://{host}:{port}/tiles/12/0/0.png') as response:
+                    return response.status
+        finally:
+            await runner.cleanup()
+            await upstream_runner.cleanup()
+
+    return asyncio.run(main())
+
+def test_upstream_failures_map_to_gateway_errors(tmp_path):
+    assert proxy_status(tmp_path) == 200
+    # Serveur amont injoignable (port fermé) : 502 ; serveur amont plus lent que le délai maximal : 504
+    assert proxy_status(tmp_path / 'closed', upstream='http://127.0.0.1:1/{z}/{x}/{y}.png') == 502
+    assert proxy_status(tmp_path / 'slow', delay=1, timeout=0.05) == 504
@@ -0,0 +1,60 @@
+#-----------------------------------------------------#
+#   Tests : archive et serveur de tuiles vectorielles #
+#-----------------------------------------------------#
+
+import os
+import sqlite3
+import urllib.request
+from contextlib import closing
+import geopandas as gpd
+from shapely.geometry import LineString
+from network_map import file_digest
+from tile_server import start_tile_server
+from vector_tiles import archive_source_version, build_tile_archive, tile_archive_is_current
+
+# Fichier des lignes d'une seule ligne de tram, au centre de Bordeaux
+def write_lines(path, retard=30.0):
+    gpd.GeoDataFrame(
+        {'ligne_com': ['Tram A'], 'libelle': ['Terminus'], 'vehicule': ['TRAM'], 'retard': [retard],
+         'vitesse': [20.0], 'nb_vehicule': [4]},
+        geometry=[LineString([(-0.58, 44.83), (-0.56, 44.85)])], crs='EPSG:4326',
+    ).to_file(path, driver='GeoJSON')
+
+def build(raw_path, archive_path):
+    return build_tile_archive(
+        gpd.read_file(raw_path), None, archive_path, snapshot_keys=[], source_version=file_digest(raw_path),
+    )
+
+def test_archive_records_its_source_version(tmp_path):
+    raw_path, archive_path = str(tmp_path / 'lines.json'), str(tmp_path / 'tiles.mbtiles')
+    write_lines(raw_path)
+    build(raw_path, archive_path)
+    assert archive_source_version(archive_path) == file_digest(raw_path)
+    assert tile_archive_is_current(archive_path, raw_path)
+
+    # Nouveau fichier des lignes : l'archive est périmée jusqu'à sa reconstruction
+    write_lines(raw_path, retard=300.0)
+    assert not tile_archive_is_current(archive_path, raw_path)
+    build(raw_path, archive_path)
+    assert tile_archive_is_current(archive_path, raw_path)
+
+    # Archive déployée seule (sans fichier des lignes) : utilisée telle quelle
+    os.remove(raw_path)
+    assert tile_archive_is_current(archive_path, raw_path)
+
+def test_server_serves_tiles_from_the_archive(tmp_path):
+    raw_path, archive_path = str(tmp_path / 'lines.json'), str(tmp_path / 'tiles.mbtiles')
+    write_lines(raw_path)
+    build(raw_path, archive_path)
+    server = start_tile_server(archive_path)
+    try:
+        base = f'http://127.0.0.1:{server.server_address[1]}'
+        with closing(sqlite3.connect(archive_path)) as connection:
+            z, x, row = connection.execute("SELECT zoom_level, tile_column, tile_row FROM tiles LIMIT 1").fetchone()
+        for _ in range(3):                              # Une connexion ouverte puis fermée par requête
+            with urllib.request.urlopen(f'{base}/network/{z}/{x}/{2 ** z - 1 - row}.pbf') as response:
+                assert response.status == 200 and response.headers['Content-Encoding'] == 'gzip'
+        with urllib.request.urlopen(f'{base}/network/14/0/0.pbf') as response:
+            assert response.status == 204
+    finally:
+        server.shutdown()
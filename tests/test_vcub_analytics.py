@@ -0,0 +1,104 @@
+
+#-----------------------------------------------------#
+#      Tests : agrégats VCub en continu (rollups)     #
+#-----------------------------------------------------#
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+import vcub_analytics
+from vcub_analytics import RollupEngine, first_row_after, refresh_rollups
+
+# Relevés de quelques stations toutes les 5 minutes (capacité 20, dont une station parfois vide ou pleine)
+def readings(snapshots=24, stations=3, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for step in range(snapshots):
+        mdate = pd.Timestamp('2023-07-01 07:00') + pd.Timedelta(minutes=5 * step)
+        for station in range(stations):
+            bikes = int(rng.integers(0, 21))
+            elec = int(rng.integers(0, bikes + 1))
+            rows.append({
+                'mdate': mdate, 'nom': f'Station {station}', 'nbvelos': bikes, 'nbelec': elec,
+                'nbclassiq': bikes - elec, 'nbplaces': 20 - bikes,
+            })
+    return pd.DataFrame(rows)
+
+def rollups(engine):
+    return engine.station_rollup(), engine.hourly_rollup()
+
+def assert_same_rollups(left, right):
+    for expected, actual in zip(left, right):
+        pd.testing.assert_frame_equal(expected.sort_index(), actual.sort_index(), check_dtype=False)
+
+def test_chunked_matches_single_pass():
+    data = readings()
+    single = RollupEngine().update(data)
+    # Blocs de 5 lignes pour 3 stations : chaque frontière de bloc coupe un instantané
+    chunked = RollupEngine()
+    for start in range(0, len(data), 5):
+        chunked.update(data.iloc[start:start + 5])
+    assert_same_rollups(rollups(single), rollups(chunked))
+
+def test_resume_from_saved_state_matches_single_pass(tmp_path):
+    data = readings()
+    single = RollupEngine().update(data)
+
+    # Premier passage sur une partie des relevés (coupée au milieu d'un instantané), puis sauvegarde
+    first = RollupEngine().update(data.iloc[:31])
+    first.save(tmp_path / 'sums.feather', tmp_path / 'carry.feather')
+
+    # Reprise : toute la source est relue, seuls les relevés non intégrés de chaque station sont ajoutés
+    engine = RollupEngine.load(tmp_path / 'sums.feather', tmp_path / 'carry.feather')
+    resumed = RollupEngine(carry=engine.carry)
+    for start in range(0, len(data), 7):
+        engine.update(resumed.unseen(data.iloc[start:start + 7]))
+    assert_same_rollups(rollups(single), rollups(engine))
+
+def test_out_of_order_chunk_is_rejected():
+    data = readings()
+    engine = RollupEngine().update(data.iloc[30:])
+    with pytest.raises(ValueError):
+        engine.update(data.iloc[:30])
+
+def test_indicators():
+    data = pd.DataFrame({
+        'mdate': pd.to_datetime(['2023-07-01 08:00', '2023-07-01 08:10', '2023-07-01 08:20']),
+        'nom': ['A'] * 3, 'nbvelos': [0, 5, 10], 'nbelec': [0, 5, 0], 'nbclassiq': [0, 0, 10], 'nbplaces': [10, 5, 0],
+    })
+    station = RollupEngine().update(data).station_rollup().loc['A']
+    assert station['observations'] == 3
+    assert station['occupancy_rate'] == pytest.approx(0.5)
+    # Vide de 08:00 à 08:10 sur 20 minutes observées ; le dernier relevé n'ouvre aucun intervalle
+    assert station['empty_share'] == pytest.approx(0.5)
+    assert station['full_share'] == pytest.approx(0.0)
+    assert station['elec_share'] == pytest.approx(5 / 15)
+    assert station['turnover_per_hour'] == pytest.approx(10 / (20 / 60))
+
+def test_first_row_after_searches_chunk_by_chunk():
+    times = pd.date_range('2023-07-01 07:00', periods=10, freq='5min')
+    column = pa.chunked_array([pa.array(times[:4]), pa.array(times[4:4]), pa.array(times[4:])])
+    assert first_row_after(column, times[0] - pd.Timedelta(minutes=1)) == 0
+    assert first_row_after(column, times[3]) == 4
+    assert first_row_after(column, times[5] + pd.Timedelta(minutes=1)) == 6
+    assert first_row_after(column, times[-1]) == 10
+
+# Rafraîchissement depuis le CSV : seules les lignes postérieures au dernier relevé intégré sont relues
+def test_csv_refresh_reads_only_new_rows(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'Data').mkdir()
+    data = readings(snapshots=36).assign(etat='CONNECTEE', latitude=44.84, longitude=-0.57)
+    data.iloc[:45].to_csv('Data/stations_VCube.csv', index=False)
+    refresh_rollups()
+
+    data.to_csv('Data/stations_VCube.csv', index=False)
+    read = []
+    chunks = vcub_analytics.iter_cache_chunks
+    monkeypatch.setattr(vcub_analytics, 'iter_cache_chunks', lambda **options: (
+        read.append(len(chunk)) or chunk for chunk in chunks(**options)
+    ))
+    engine = refresh_rollups()
+    # 45 lignes = 15 instantanés complets : seuls les 21 suivants sont lus
+    assert sum(read) == len(data) - 45
+    assert_same_rollups(rollups(RollupEngine().update(data)), rollups(engine))
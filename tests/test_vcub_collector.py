@@ -0,0 +1,75 @@
+#-----------------------------------------------------#
+#   Tests : collecteur VCub et partitions par jour    #
+#-----------------------------------------------------#
+
+import os
+import pandas as pd
+import pytest
+from vcub_collector import PartitionWriter, compact_partition
+from vcub_data import PartitionedSnapshotStore, partition_path, partitions_version, read_partition
+
+# Quatre relevés de la même journée (un relevé sans changement à 08:05)
+@pytest.fixture
+def snapshots(snapshot):
+    return lambda: [
+        snapshot('2023-07-01 08:00', [5, 10, 15]),
+        snapshot('2023-07-01 08:05', [5, 10, 15]),
+        snapshot('2023-07-01 08:10', [6, 10, 15]),
+        snapshot('2023-07-01 08:15', [6, 9, 14]),
+    ]
+
+def counts_by_time(data):
+    return data.assign(nom=data['nom'].astype(str)).set_index(['mdate', 'nom'])['nbvelos'].astype(int).sort_index()
+
+def test_only_changed_stations_are_written(tmp_path, snapshots):
+    writer = PartitionWriter(str(tmp_path))
+    assert [writer.write(data) for data in snapshots()] == [3, 0, 1, 2]
+
+def test_read_partition_rebuilds_full_snapshots(tmp_path, snapshots):
+    writer = PartitionWriter(str(tmp_path))
+    for data in snapshots():
+        writer.write(data)
+    day = pd.Timestamp('2023-07-01').date()
+    expected = counts_by_time(pd.concat(snapshots()))
+    # Le relevé sans changement (08:05) n'a produit aucun fichier : il n'est pas reconstitué
+    expected = expected.drop(pd.Timestamp('2023-07-01 08:05'), level='mdate')
+    pd.testing.assert_series_equal(counts_by_time(read_partition(str(tmp_path), day)), expected)
+
+def test_writer_resumes_from_latest_partition(tmp_path, snapshot, snapshots):
+    first = PartitionWriter(str(tmp_path))
+    for data in snapshots()[:3]:
+        first.write(data)
+    # Redémarrage : le dernier état connu est relu, seules les stations modifiées sont écrites
+    resumed = PartitionWriter(str(tmp_path))
+    assert resumed.write(snapshots()[3]) == 2
+    # Nouvelle journée : relevé complet
+    assert resumed.write(snapshot('2023-07-02 00:00', [6, 9, 14])) == 3
+
+def test_compaction_keeps_the_same_snapshots(tmp_path, snapshots):
+    writer = PartitionWriter(str(tmp_path))
+    for data in snapshots():
+        writer.write(data)
+    day = pd.Timestamp('2023-07-01').date()
+    before = counts_by_time(read_partition(str(tmp_path), day))
+
+    assert compact_partition(str(tmp_path), day) == 6
+    assert os.listdir(partition_path(str(tmp_path), day)) == ['compacted.feather']
+    pd.testing.assert_series_equal(counts_by_time(read_partition(str(tmp_path), day)), before)
+
+def test_store_sees_new_snapshots_of_the_current_day(tmp_path, snapshot, snapshots):
+    root = str(tmp_path)
+    writer = PartitionWriter(root)
+    writer.write(snapshots()[0])
+    store = PartitionedSnapshotStore(root)
+    day = pd.Timestamp('2023-07-01').date()
+    version = partitions_version(root)
+    assert store.times_for(day) == ['08:00']
+
+    writer.write(snapshots()[2])
+    assert partitions_version(root) != version
+    assert store.times_for(day) == ['08:00', '08:10']
+    assert store.snapshot(day, '08:10')['nbvelos'].astype(int).tolist() == [6, 10, 15]
+
+    # Nouvelle journée créée par le collecteur : ajoutée à la liste des dates
+    writer.write(snapshot('2023-07-02 00:00', [1, 2, 3]))
+    assert [date for date, _ in store.dates] == [day, pd.Timestamp('2023-07-02').date()]
@@ -0,0 +1,67 @@
+#-----------------------------------------------------#
+#    Tests : cache Feather du relevé VCub (CSV)       #
+#-----------------------------------------------------#
+
+import os
+import numpy as np
+import pandas as pd
+from vcub_data import (
+    add_time_columns, cache_source_version, compact_types, ensure_cache, file_version, ingest_csv, load_vcub_frame,
+)
+
+# Relevé CSV de deux stations, lignes volontairement dans le désordre
+def write_csv(path, bikes):
+    pd.DataFrame({
+        'mdate': ['2023-07-01 08:10:00', '2023-07-01 08:00:00', '2023-07-01 08:00:00'], 'nom': ['A', 'A', 'B'],
+        'etat': 'CONNECTEE', 'latitude': [44.84, 44.84, 44.85], 'longitude': -0.57, 'nbvelos': bikes,
+        'nbelec': 0, 'nbclassiq': bikes, 'nbplaces': [20 - b for b in bikes],
+    }).to_csv(path, index=False)
+
+def test_cache_is_sorted_and_records_its_source(tmp_path):
+    csv_path, cache_path = str(tmp_path / 'stations.csv'), str(tmp_path / 'stations.feather')
+    write_csv(csv_path, [3, 1, 2])
+    data = load_vcub_frame(csv_path, cache_path)
+    assert data['nbvelos'].tolist() == [1, 2, 3]
+    assert data['mdate'].is_monotonic_increasing
+    assert cache_source_version(cache_path) == file_version(csv_path)
+
+def test_csv_replaced_by_an_older_file_is_reconverted(tmp_path):
+    csv_path, cache_path = str(tmp_path / 'stations.csv'), str(tmp_path / 'stations.feather')
+    write_csv(csv_path, [3, 1, 2])
+    ensure_cache(csv_path, cache_path)
+
+    # Nouveau fichier dont la date de modification est antérieure à celle du cache (cp -p, rsync, git checkout)
+    write_csv(csv_path, [13, 11, 12])
+    past = os.path.getmtime(cache_path) - 3600
+    os.utime(csv_path, (past, past))
+    assert load_vcub_frame(csv_path, cache_path)['nbvelos'].tolist() == [11, 12, 13]
+
+def test_cache_without_csv_is_used_as_is(tmp_path):
+    csv_path, cache_path = str(tmp_path / 'stations.csv'), str(tmp_path / 'stations.feather')
+    write_csv(csv_path, [3, 1, 2])
+    ensure_cache(csv_path, cache_path)
+    os.remove(csv_path)
+    assert load_vcub_frame(csv_path, cache_path)['nbvelos'].tolist() == [1, 2, 3]
+
+# Relevés de plusieurs journées mélangés, avec un compteur parfois manquant et une colonne hors schéma VCub
+def write_shuffled_csv(path, rows=600, seed=0):
+    rng = np.random.default_rng(seed)
+    bikes = rng.integers(0, 21, rows).astype('float64')
+    bikes[rng.integers(0, rows, 5)] = np.nan
+    data = pd.DataFrame({
+        'mdate': pd.Timestamp('2023-07-01') + pd.to_timedelta(rng.integers(0, 4 * 24 * 60, rows), unit='min'),
+        'nom': [f'Station {i}' for i in rng.integers(0, 30, rows)],
+        'etat': rng.choice(['CONNECTEE', 'MAINTENANCE'], rows), 'latitude': 44.84, 'longitude': -0.57,
+        'nbvelos': bikes, 'nbplaces': 20, 'gid': rng.integers(0, 1000, rows),
+    })
+    data.to_csv(path, index=False)
+
+def test_chunked_ingest_matches_a_single_read(tmp_path):
+    csv_path = str(tmp_path / 'stations.csv')
+    write_shuffled_csv(csv_path)
+    single = pd.read_csv(csv_path, parse_dates=['mdate']).sort_values('mdate', kind='stable').reset_index(drop=True)
+    # Blocs de 47 lignes : chaque journée est répartie sur tous les blocs, le compteur manquant sur quelques-uns
+    chunked = load_vcub_frame(csv_path, ingest_csv(csv_path, str(tmp_path / 'stations.feather'), chunksize=47))
+    pd.testing.assert_frame_equal(chunked, add_time_columns(compact_types(single)))
+    # Aucun fichier intermédiaire laissé dans le dossier du cache
+    assert sorted(os.listdir(tmp_path)) == ['stations.csv', 'stations.feather']
@@ -0,0 +1,70 @@
+#-----------------------------------------------------#
+#    Tests : comparaison d'instantanés VCub (diff)    #
+#-----------------------------------------------------#
+
+import datetime
+import numpy as np
+import pandas as pd
+from vcub_diff import StationMatrix
+
+day = datetime.date(2023, 7, 1)
+
+# Relevés de trois stations (capacité 10) ; C n'est relevée qu'à partir de 08:10, B n'est pas relevée à 08:05
+def readings():
+    rows = [
+        ('08:00', 'A', 4, 2, 'CONNECTEE'), ('08:00', 'B', 0, 0, 'CONNECTEE'),
+        ('08:05', 'A', 6, 3, 'CONNECTEE'),
+        ('08:10', 'A', 3, 1, 'CONNECTEE'), ('08:10', 'B', 10, 5, 'DECONNECTEE'), ('08:10', 'C', 7, 0, 'CONNECTEE'),
+        ('08:15', 'A', 3, 1, 'CONNECTEE'), ('08:15', 'B', 10, 5, 'DECONNECTEE'), ('08:15', 'C', 0, 0, 'CONNECTEE'),
+    ]
+    data = pd.DataFrame(rows, columns=['time', 'nom', 'nbvelos', 'nbelec', 'etat'])
+    data['mdate'] = pd.to_datetime(f'{day} ' + data.pop('time'))
+    data['nbplaces'] = 10 - data['nbvelos']
+    data['latitude'] = 44.84
+    data['longitude'] = -0.57
+    return data
+
+def test_missing_readings_carry_the_last_state():
+    matrix = StationMatrix.from_frame(readings())
+    assert matrix.keys == [(day, '08:00'), (day, '08:05'), (day, '08:10'), (day, '08:15')]
+    # B garde son état de 08:00 à 08:05 ; C n'est pas encore relevée
+    assert matrix.counts['nbvelos'].tolist() == [[4, 0, -1], [6, 0, -1], [3, 10, 7], [3, 10, 0]]
+
+def test_diff_between_two_snapshots():
+    matrix = StationMatrix.from_frame(readings())
+    result = matrix.diff((day, '08:00'), (day, '08:10')).set_index('nom')
+    # C n'est pas relevée à 08:00 : absente de la comparaison
+    assert list(result.index) == ['B', 'A']
+    assert result.loc['A', 'delta_velos'] == -1
+    assert result.loc['A', 'delta_elec'] == -1
+    assert result.loc['B', 'delta_velos'] == 10
+    assert result.loc['B', 'delta_places'] == -10
+    assert bool(result.loc['B', 'plus_vide']) and bool(result.loc['B', 'devenue_pleine'])
+    assert bool(result.loc['B', 'changement_etat'])
+    assert (result.loc['B', 'etat_avant'], result.loc['B', 'etat_apres']) == ('CONNECTEE', 'DECONNECTEE')
+
+def test_diff_changed_only():
+    matrix = StationMatrix.from_frame(readings())
+    assert matrix.diff((day, '08:10'), (day, '08:15'))['nom'].tolist() == ['C']
+    assert len(matrix.diff((day, '08:10'), (day, '08:15'), changed_only=False)) == 3
+    assert bool(matrix.diff((day, '08:10'), (day, '08:15'))['devenue_vide'].iloc[0])
+
+def test_rolling_windows_match_a_direct_computation():
+    matrix = StationMatrix.from_frame(readings())
+    bikes = matrix.counts['nbvelos'].astype(int)
+    known = bikes != -1
+    for window in (1, 2, 3):
+        expected_deltas = np.where(known[window:] & known[:-window], bikes[window:] - bikes[:-window], 0)
+        np.testing.assert_array_equal(matrix.rolling_deltas(window), expected_deltas)
+
+        steps = np.where(known[1:] & known[:-1], np.abs(np.diff(bikes, axis=0)), 0)
+        expected_activity = np.array([steps[i:i + window].sum(axis=0) for i in range(len(steps) - window + 1)])
+        np.testing.assert_array_equal(matrix.rolling_activity(window), expected_activity)
+
+def test_hotspots():
+    matrix = StationMatrix.from_frame(readings())
+    hotspots = matrix.hotspots((day, '08:15'), window=3, top=2)
+    # A : 2 + 3 + 0 mouvements, B : 0 + 10 + 0, C : relevée seulement à partir de 08:10 (7 mouvements)
+    assert hotspots['nom'].tolist() == ['B', 'C']
+    assert hotspots['mouvements'].tolist() == [10, 7]
+    assert hotspots['delta_velos'].tolist() == [10, 0]
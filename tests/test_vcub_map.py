@@ -0,0 +1,94 @@
+#-----------------------------------------------------#
+#     Tests : encodage des données de la carte VCub   #
+#-----------------------------------------------------#
+
+import numpy as np
+import pandas as pd
+from vcub_map import aggregate_grid, build_day_playback, build_grid_levels, grid_zooms, sparse_deltas
+
+# Journée de quelques stations toutes les 10 minutes ; une station absente de certains relevés
+def day_readings(snapshots=12, stations=5, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for step in range(snapshots):
+        mdate = pd.Timestamp('2023-07-01 07:00') + pd.Timedelta(minutes=10 * step)
+        for station in range(stations):
+            if station == stations - 1 and step % 3 == 1:
+                continue
+            rows.append({
+                'mdate': mdate, 'time': mdate.strftime('%H:%M'), 'nom': f'Station {station}',
+                'etat': str(rng.choice(['CONNECTEE', 'CONNECTEE', 'MAINTENANCE'])),
+                'latitude': 44.84 + station / 100, 'longitude': -0.57, 'nbvelos': int(rng.integers(0, 21)),
+            })
+    return pd.DataFrame(rows)
+
+# Décodage comme dans le navigateur : état initial puis application des deltas
+def decode(playback):
+    counts = [list(playback['initial'])]
+    etats = [list(playback['initial_etat'])]
+    for deltas, changes in zip(playback['deltas'], playback['etat_changes']):
+        c, e = list(counts[-1]), list(etats[-1])
+        for k in range(0, len(deltas), 2):
+            c[deltas[k]] += deltas[k + 1]
+        for k in range(0, len(changes), 2):
+            e[changes[k]] = changes[k + 1]
+        counts.append(c)
+        etats.append(e)
+    return counts, etats
+
+def test_sparse_deltas():
+    values = np.array([[0, 2, 0], [0, 0, 0], [-1, 0, 3]])
+    assert sparse_deltas(values) == [[1, 2], [], [0, -1, 2, 3]]
+    assert sparse_deltas(values, changed=np.ones_like(values, dtype=bool))[1] == [0, 0, 1, 0, 2, 0]
+
+def test_playback_decodes_to_every_snapshot():
+    data = day_readings()
+    playback = build_day_playback(data)
+    counts, etats = decode(playback)
+    names = [station[0] for station in playback['stations']]
+    etat_names = [etat for etat, _ in playback['etats']]
+    assert playback['times'] == sorted(data['time'].unique())
+
+    for t, time in enumerate(playback['times']):
+        rows = data[data['time'] == time].set_index('nom')
+        for station, name in enumerate(names):
+            # Station absente du relevé : son dernier état connu est conservé
+            if name in rows.index:
+                assert counts[t][station] == rows.loc[name, 'nbvelos']
+                assert etat_names[etats[t][station]] == rows.loc[name, 'etat']
+            else:
+                assert counts[t][station] == counts[t - 1][station]
+
+def test_empty_day():
+    playback = build_day_playback(day_readings().iloc[0:0])
+    assert playback['times'] == [] and playback['deltas'] == []
+
+# Instantané de stations réparties sur l'emprise de Bordeaux
+def snapshot_readings(stations=200, seed=0):
+    rng = np.random.default_rng(seed)
+    bikes = rng.integers(0, 21, stations)
+    return pd.DataFrame({
+        'latitude': rng.uniform(44.78, 44.92, stations), 'longitude': rng.uniform(-0.68, -0.50, stations),
+        'nbvelos': bikes, 'nbplaces': 20 - bikes, 'nbelec': bikes // 2,
+    })
+
+def test_grid_keeps_the_totals_at_every_zoom():
+    data = snapshot_readings()
+    for zoom in grid_zooms:
+        cells = aggregate_grid(data, zoom)
+        assert cells['stations'].sum() == len(data)
+        for column in ('nbvelos', 'nbplaces', 'nbelec'):
+            assert cells[column].sum() == data[column].sum()
+        # Position moyenne : chaque cellule reste dans l'emprise des stations
+        assert cells['latitude'].between(data['latitude'].min(), data['latitude'].max()).all()
+
+def test_grid_gets_finer_with_the_zoom():
+    data = snapshot_readings()
+    levels = build_grid_levels(data)
+    cells = [len(levels['levels'][str(zoom)]['stations']) for zoom in levels['zooms']]
+    assert cells == sorted(cells)
+    assert cells[0] < cells[-1] <= len(data)
+
+def test_grid_of_an_empty_snapshot():
+    levels = build_grid_levels(snapshot_readings().iloc[0:0])
+    assert all(level['stations'] == [] for level in levels['levels'].values())
@@ -0,0 +1,59 @@
+#-----------------------------------------------------#
+#   Tests : pré-rendu des instantanés VCub            #
+#-----------------------------------------------------#
+
+import datetime
+import pytest
+import vcub_precompute
+from vcub_collector import PartitionWriter
+from vcub_data import PartitionedSnapshotStore, vcub_partition_root
+from vcub_precompute import pending_keys, read_artifact, render_day
+
+day = datetime.date(2023, 7, 1)
+next_day = datetime.date(2023, 7, 2)
+
+# Partitions du collecteur dans un dossier de travail temporaire (chemins relatifs de l'application)
+@pytest.fixture
+def collector(tmp_path, monkeypatch, snapshot):
+    monkeypatch.chdir(tmp_path)
+    writer = PartitionWriter(vcub_partition_root)
+    for mdate, bikes in [('2023-07-01 08:00', [1, 2]), ('2023-07-01 08:10', [3, 2]), ('2023-07-02 08:00', [4, 5])]:
+        writer.write(snapshot(mdate, bikes))
+    store = PartitionedSnapshotStore(vcub_partition_root)
+    monkeypatch.setattr(vcub_precompute, '_worker_store', store)
+    return writer, store, str(tmp_path / 'artifacts')
+
+def render(store, root, **selection):
+    pending, versions = pending_keys(store, root, **selection)
+    for date, times in pending.items():
+        render_day(root, date, times, versions[date])
+    return pending
+
+def test_resume_renders_only_missing_snapshots(collector):
+    _, store, root = collector
+    assert render(store, root, dates={day}, stop='08:05') == {day: ['08:00']}
+    assert render(store, root) == {day: ['08:10'], next_day: ['08:00']}
+    assert render(store, root) == {}
+    assert '"nbvelos":3' in read_artifact(day, '08:10', root)
+
+def test_incremental_skips_snapshots_before_the_last_render(collector):
+    _, store, root = collector
+    render(store, root, dates={day}, start='08:05')
+    # 08:00 n'a jamais été rendu, mais il précède le dernier instantané rendu
+    assert pending_keys(store, root, incremental=True)[0] == {next_day: ['08:00']}
+    assert pending_keys(store, root)[0] == {day: ['08:00'], next_day: ['08:00']}
+
+def test_changed_source_invalidates_the_day(collector, snapshot):
+    _, store, root = collector
+    render(store, root)
+    # Relevé tardif ajouté à la première journée : ses artefacts ne sont plus servis, la journée est re-rendue
+    PartitionWriter(vcub_partition_root).write(snapshot('2023-07-01 08:20', [0, 0]))
+    assert read_artifact(day, '08:00', root) is None
+    assert read_artifact(next_day, '08:00', root) is not None
+    assert render(store, root, incremental=True) == {day: ['08:00', '08:10', '08:20']}
+    assert read_artifact(day, '08:00', root) is not None
+
+def test_force_renders_everything(collector):
+    _, store, root = collector
+    render(store, root)
+    assert pending_keys(store, root, force=True)[0] == {day: ['08:00', '08:10'], next_day: ['08:00']}
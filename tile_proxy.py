@@ -0,0 +1,334 @@
+
+#-----------------------------------------------------#
+#                      Imports                        #
+#-----------------------------------------------------#
+
+import os                                               # Fichiers du cache disque
+import sys                                              # Arguments de la ligne de commande
+import math                                             # Tuiles couvrant l'emprise de Bordeaux
+import time                                             # TTL et latences
+import fcntl                                            # Verrou du cache disque partagé entre processus
+import asyncio                                          # Récupération asynchrone des tuiles
+import threading                                        # Proxy lancé en tâche de fond depuis Streamlit
+from collections import OrderedDict                     # Ordre LRU des tuiles en cache
+import aiohttp                                          # Client HTTP mutualisé (pool de connexions)
+from aiohttp import web                                 # Serveur HTTP du proxy
+from dotenv import load_dotenv                          # Masquer l'API utilisé
+
+#-----------------------------------------------------#
+#                   Global Variables                  #
+#-----------------------------------------------------#
+
+# Dossier du cache disque, taille maximale et durée de validité des tuiles
+tile_cache_root = './Data/tile_cache'
+tile_cache_max_bytes = 500 * 1024 ** 2
+tile_cache_ttl = 30 * 24 * 3600
+
+# Délai maximal d'une requête amont (au-delà : 504 pour le navigateur)
+tile_fetch_timeout = 10
+
+# Nombre d'écritures après lequel l'index est relu depuis le disque et le cache ramené sous la taille maximale
+# (dossier partagé par plusieurs processus : dépassement borné à processus x tile_cache_rescan_writes tuiles)
+tile_cache_rescan_writes = 50
+
+# Emprise de Bordeaux Métropole (ouest, sud, est, nord) et zooms pré-chargés
+bordeaux_bbox = (-0.80, 44.75, -0.45, 44.95)
+seed_zooms = [12, 13]
+
+#-----------------------------------------------------#
+#                     Functions                       #
+#-----------------------------------------------------#
+
+# Tuile (x, y) contenant un point longitude / latitude au zoom z
+def lonlat_to_tile(longitude, latitude, z):
+    """Return the XYZ tile containing a WGS84 point"""
+    n = 2 ** z
+    x = int((longitude + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(math.radians(latitude))) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+# Toutes les tuiles couvrant une emprise pour une liste de zooms
+def tiles_for_bbox(bbox, zooms):
+    """Yield (z, x, y) tiles covering a WGS84 bounding box"""
+    west, south, east, north = bbox
+    for z in zooms:
+        x0, y0 = lonlat_to_tile(west, north, z)
+        x1, y1 = lonlat_to_tile(east, south, z)
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                yield z, x, y
+
+# Cache disque LRU : taille bornée, durée de validité, et requêtes simultanées mutualisées
+# (les accès disque — lecture, écriture, parcours du dossier et verrou de l'éviction — sont exécutés dans le pool de
+#  threads de la boucle : une tuile lente à lire ou une éviction en cours ne bloquent pas les autres requêtes ;
+#  l'index LRU n'est modifié que depuis la boucle)
+class TileCache:
+    """On-disk LRU tile cache in front of an upstream XYZ tile URL"""
+
+    def __init__(self, upstream, root=tile_cache_root, max_bytes=tile_cache_max_bytes, ttl=tile_cache_ttl,
+                 pool_size=16, timeout=tile_fetch_timeout):
+        self.upstream = upstream
+        self.root = root
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.session = None
+        self._writes = 0
+        self._inflight = {}
+        self._eviction = None
+        self.hits = 0
+        self.misses = 0
+        self.latencies = []
+        self._entries, self._size = self._scan()
+
+    # Reconstruction de l'index à partir du disque (les plus anciennes tuiles en tête de l'ordre LRU)
+    # (la date d'accès des fichiers porte l'ordre LRU de tous les processus qui partagent le dossier)
+    def _scan(self):
+        entries = OrderedDict()
+        size = 0
+        found = []
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                if not name.endswith('.png'):
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:              # Supprimée entre-temps par un autre processus
+                    continue
+                found.append((stat.st_atime, path, stat.st_size, stat.st_mtime))
+        for _, path, file_size, mtime in sorted(found):
+            entries[path] = (file_size, mtime)
+            size += file_size
+        return entries, size
+
+    def _path(self, z, x, y):
+        return os.path.join(self.root, str(z), str(x), f'{y}.png')
+
+    # Accès disque bloquant exécuté dans le pool de threads de la boucle
+    def _run(self, function, *args):
+        return asyncio.get_running_loop().run_in_executor(None, function, *args)
+
+    # Session HTTP partagée : un seul pool de connexions pour toutes les requêtes
+    async def start(self):
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.pool_size), timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+
+    async def get(self, z, x, y):
+        """Return tile bytes from the cache, fetching them upstream on a miss"""
+        start = time.perf_counter()
+        path = self._path(z, x, y)
+        entry = self._entries.get(path) or await self._adopt(path)
+        data = None
+        if entry is not None and time.time() - entry[1] < self.ttl:
+            data = await self._run(self._read, path, entry)
+            if data is None:
+                self._forget(path)
+        if data is not None:
+            if path in self._entries:
+                self._entries.move_to_end(path)
+            self.hits += 1
+        else:
+            self.misses += 1
+            # Une seule requête amont par tuile, même si plusieurs sessions la demandent en même temps
+            task = self._inflight.get(path)
+            if task is None:
+                task = asyncio.ensure_future(self._fetch(z, x, y, path))
+                self._inflight[path] = task
+                task.add_done_callback(lambda _: self._inflight.pop(path, None))
+            data = await asyncio.shield(task)
+        self.latencies.append(time.perf_counter() - start)
+        del self.latencies[:-1000]
+        return data
+
+    # Tuile écrite par un autre processus depuis la dernière lecture de l'index : ajoutée à l'index
+    async def _adopt(self, path):
+        try:
+            stat = await self._run(os.stat, path)
+        except FileNotFoundError:
+            return None
+        self._forget(path)
+        self._entries[path] = (stat.st_size, stat.st_mtime)
+        self._size += stat.st_size
+        return self._entries[path]
+
+    # Tuile retirée de l'index (supprimée par un autre processus, ou sur le point d'être remplacée)
+    def _forget(self, path):
+        previous = self._entries.pop(path, None)
+        if previous is not None:
+            self._size -= previous[0]
+
+    # Lecture d'une tuile en cache, None si un autre processus l'a supprimée
+    # (date d'accès mise à jour pour que les autres processus voient la tuile comme récente)
+    @staticmethod
+    def _read(path, entry):
+        try:
+            with open(path, 'rb') as file:
+                data = file.read()
+            os.utime(path, (time.time(), entry[1]))
+        except FileNotFoundError:
+            return None
+        return data
+
+    # Écriture atomique d'une tuile (fichier temporaire renommé)
+    @staticmethod
+    def _write(path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+
+    async def _fetch(self, z, x, y, path):
+        async with self.session.get(self.upstream.format(z=z, x=x, y=y)) as response:
+            response.raise_for_status()
+            data = await response.read()
+
+        # Écriture atomique puis mise à jour de l'index LRU
+        await self._run(self._write, path, data)
+        self._forget(path)
+        self._entries[path] = (len(data), time.time())
+        self._size += len(data)
+        self._writes += 1
+        if self._size > self.max_bytes or self._writes >= tile_cache_rescan_writes:
+            await self._evict()
+        return data
+
+    # Suppression des tuiles les moins récemment utilisées au-delà de la taille maximale, une éviction à la fois
+    # (les écritures qui la déclenchent pendant qu'elle tourne attendent la même éviction)
+    async def _evict(self):
+        if self._eviction is None:
+            self._writes = 0
+            self._eviction = asyncio.ensure_future(self._run(self._evict_disk))
+            try:
+                self._entries, self._size = await self._eviction
+            finally:
+                self._eviction = None
+        else:
+            await asyncio.shield(self._eviction)
+
+    # Éviction sur disque (dans le pool de threads), sous verrou, d'après l'index relu depuis le disque : la taille et
+    # l'ordre LRU tiennent compte des tuiles écrites et lues par les autres processus, et deux processus n'évincent pas
+    # en même temps. Renvoie le nouvel index (les tuiles écrites entre-temps sont reprises par _adopt à leur
+    # prochaine lecture)
+    def _evict_disk(self):
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, '.lock'), 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            entries, size = self._scan()
+            while size > self.max_bytes and entries:
+                path, (file_size, _) = entries.popitem(last=False)
+                size -= file_size
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+        return entries, size
+
+    def metrics(self):
+        """Hit rate, size and latency of the cache"""
+        requests = self.hits + self.misses
+        latencies = sorted(self.latencies)
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / requests if requests else 0.0,
+            'tiles': len(self._entries),
+            'bytes': self._size,
+            'latency_ms_p50': 1000 * latencies[len(latencies) // 2] if latencies else 0.0,
+            'latency_ms_p95': 1000 * latencies[int(len(latencies) * 0.95)] if latencies else 0.0,
+        }
+
+    # Pré-chargement d'une liste de tuiles avec un nombre borné de requêtes simultanées
+    async def seed(self, tiles, concurrency=8):
+        """Fetch every tile of the list into the cache"""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch_one(tile):
+            async with semaphore:
+                await self.get(*tile)
+
+        await asyncio.gather(*(fetch_one(tile) for tile in tiles))
+
+#-----------------------------------------------------#
+#                    Serveur HTTP                     #
+#-----------------------------------------------------#
+
+# Application aiohttp : /tiles/{z}/{x}/{y}.png et /metrics
+def make_app(cache):
+    """aiohttp application serving the cache"""
+    async def tile(request):
+        z, x, y = (int(request.match_info[key]) for key in ('z', 'x', 'y'))
+        try:
+            data = await cache.get(z, x, y)
+        except aiohttp.ClientResponseError as error:    # Réponse d'erreur du serveur amont : même statut
+            return web.Response(status=error.status)
+        except aiohttp.ClientError:                     # Serveur amont injoignable ou connexion interrompue
+            return web.Response(status=502)
+        except asyncio.TimeoutError:                    # Serveur amont trop lent (tile_fetch_timeout)
+            return web.Response(status=504)
+        return web.Response(body=data, content_type='image/png', headers={
+            'Cache-Control': 'public, max-age=86400', 'Access-Control-Allow-Origin': '*',
+        })
+
+    async def metrics(request):
+        return web.json_response(cache.metrics())
+
+    async def on_startup(app):
+        await cache.start()
+
+    async def on_cleanup(app):
+        await cache.close()
+
+    app = web.Application()
+    app.router.add_get('/tiles/{z}/{x}/{y}.png', tile)
+    app.router.add_get('/metrics', metrics)
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    return app
+
+# Démarrage du proxy dans un thread de fond avec sa propre boucle asyncio (une fois par processus Streamlit)
+# (port libre par défaut : plusieurs processus de l'application démarrent chacun le leur sans conflit)
+def start_tile_proxy(upstream, host='127.0.0.1', port=0, **cache_options):
+    """Start the tile proxy in a daemon thread and return its base URL"""
+    loop = asyncio.new_event_loop()
+    runner = web.AppRunner(make_app(TileCache(upstream, **cache_options)))
+    loop.run_until_complete(runner.setup())
+    site = web.TCPSite(runner, host, port)
+    loop.run_until_complete(site.start())
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    host, port = runner.addresses[0][:2]
+    return f'http://{host}:{port}'
+
+# URL amont MapTiler (clé lue dans le .env, jamais envoyée au navigateur)
+def maptiler_upstream():
+    """MapTiler dataviz tile URL template with the API key"""
+    load_dotenv()
+    return f"https://api.maptiler.com/maps/dataviz/{{z}}/{{x}}/{{y}}.png?key={os.getenv('maptiler_api_key')}"
+
+# Pré-chargement de l'emprise de Bordeaux
+async def seed_bordeaux(upstream, zooms=seed_zooms):
+    """Seed the cache with the Bordeaux bounding box"""
+    cache = TileCache(upstream)
+    await cache.start()
+    try:
+        await cache.seed(list(tiles_for_bbox(bordeaux_bbox, zooms)))
+    finally:
+        await cache.close()
+    return cache.metrics()
+
+if __name__ == '__main__':
+    # Usage : python tile_proxy.py serve [port] [hôte]   (proxy commun publié par le reverse proxy : tile_proxy_url)
+    #         python tile_proxy.py seed [zoom ...]
+    args = sys.argv[1:] or ['serve']
+    if args[0] == 'seed':
+        print(asyncio.run(seed_bordeaux(maptiler_upstream(), [int(z) for z in args[1:]] or seed_zooms)))
+    else:
+        web.run_app(make_app(TileCache(maptiler_upstream())), host=args[2] if len(args) > 2 else '127.0.0.1',
+                    port=int(args[1]) if len(args) > 1 else 8766)
@@ -0,0 +1,98 @@
+
+#-----------------------------------------------------#
+#                      Imports                        #
+#-----------------------------------------------------#
+
+import re                                               # Lecture des routes /network/z/x/y et /vcub/clé/z/x/y
+import sys                                              # Arguments de la ligne de commande
+import sqlite3                                          # Lecture de l'archive MBTiles
+import threading                                        # Serveur lancé en tâche de fond
+from contextlib import closing                          # Connexion fermée à la fin de chaque requête
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # Serveur HTTP local minimal
+from vector_tiles import read_tile, tile_archive_is_current, tile_archive_path  # Lecture et version de l'archive
+
+#-----------------------------------------------------#
+#                   Global Variables                  #
+#-----------------------------------------------------#
+
+# Routes des tuiles : lignes du réseau et instantanés VCub
+# (recherchées en fin de chemin : le serveur peut être publié sous un préfixe par un reverse proxy, ex. /tiles/network/...)
+network_route = re.compile(r'/network/(\d+)/(\d+)/(\d+)\.pbf$')
+vcub_route = re.compile(r'/vcub/([0-9T:-]+)/(\d+)/(\d+)/(\d+)\.pbf$')
+
+#-----------------------------------------------------#
+#                     Functions                       #
+#-----------------------------------------------------#
+
+# Gestionnaire HTTP : une connexion SQLite en lecture seule ouverte puis fermée à chaque requête
+# (ThreadingHTTPServer crée un thread par requête : une connexion par thread ne serait jamais réutilisée ni fermée)
+class TileRequestHandler(BaseHTTPRequestHandler):
+    """Serve gzipped MVT tiles from the local archive"""
+    archive_path = tile_archive_path
+
+    def _connection(self):
+        return closing(sqlite3.connect(f'file:{self.archive_path}?mode=ro', uri=True))
+
+    def do_GET(self):
+        match = network_route.search(self.path)
+        if match:
+            z, x, y = map(int, match.groups())
+            snapshot = None
+        else:
+            match = vcub_route.search(self.path)
+            if not match:
+                self.send_error(404)
+                return
+            snapshot = match.group(1)
+            z, x, y = map(int, match.groups()[1:])
+        with self._connection() as connection:
+            data = read_tile(connection, z, x, y, snapshot=snapshot)
+
+        # Tuile vide : 204 pour que Leaflet n'affiche pas d'erreur
+        if data is None:
+            self.send_response(204)
+            self._send_common_headers()
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-protobuf')
+        self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(data)))
+        self._send_common_headers()
+        self.end_headers()
+        self.wfile.write(data)
+
+    # La carte est affichée dans une iframe Streamlit d'une autre origine : CORS + cache navigateur
+    def _send_common_headers(self):
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Cache-Control', 'public, max-age=86400')
+
+    # Journal silencieux (une ligne par tuile serait trop bavard)
+    def log_message(self, format, *args):
+        pass
+
+# Création du serveur de tuiles pour une archive donnée (port 0 : port libre choisi par le système)
+def make_tile_server(archive_path=tile_archive_path, host='127.0.0.1', port=0):
+    """Return a ThreadingHTTPServer serving the archive"""
+    handler = type('ArchiveTileRequestHandler', (TileRequestHandler,), {'archive_path': archive_path})
+    return ThreadingHTTPServer((host, port), handler)
+
+# Démarrage du serveur de tuiles dans un thread de fond (une fois par processus Streamlit)
+# (port libre par défaut : plusieurs processus de l'application démarrent chacun le leur sans conflit)
+def start_tile_server(archive_path=tile_archive_path, host='127.0.0.1', port=0):
+    """Start the tile server in a daemon thread and return it (actual port in server_address)"""
+    server = make_tile_server(archive_path, host, port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+if __name__ == '__main__':
+    # Usage : python tile_server.py [port] [hôte]
+    # Serveur commun à tous les processus, publié par le reverse proxy (URL publique : vector_tiles_url dans le .env)
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    host = sys.argv[2] if len(sys.argv) > 2 else '127.0.0.1'
+    # Archive construite à partir d'un autre fichier des lignes : refus de servir des tuiles périmées
+    if not tile_archive_is_current():
+        sys.exit(f"Archive de tuiles absente ou périmée ({tile_archive_path}) : relancer python vector_tiles.py")
+    server = make_tile_server(host=host, port=port)
+    print(f"Serveur de tuiles : http://{host}:{server.server_address[1]}/network/{{z}}/{{x}}/{{y}}.pbf")
+    server.serve_forever()
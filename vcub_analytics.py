@@ -0,0 +1,215 @@
+
+#-----------------------------------------------------#
+#                      Imports                        #
+#-----------------------------------------------------#
+
+import os                                               # Fichiers de cache des agrégats
+import sys                                              # Arguments de la ligne de commande
+import numpy as np                                      # Recherche du premier relevé non intégré
+import pandas as pd                                     # Manipulation des bases de données
+import pyarrow.feather as feather                       # Agrégats matérialisés (Feather)
+from vcub_data import (                                 # Sources des relevés VCub
+    compact_types, ensure_cache, partition_dates, read_partition, vcub_partition_root,
+)
+
+#-----------------------------------------------------#
+#                   Global Variables                  #
+#-----------------------------------------------------#
+
+# Agrégats matérialisés et état de reprise (dernier relevé de chaque station)
+rollup_path = './Data/vcub_rollups.feather'
+rollup_carry_path = './Data/vcub_rollups_carry.feather'
+
+# Taille des blocs lus dans le cache trié (bornée, quel que soit le volume total)
+chunk_rows = 500_000
+
+# Écart maximal entre deux relevés compté dans les durées (au-delà : interruption de la collecte)
+max_gap_seconds = 15 * 60
+
+# Colonnes utiles aux agrégats
+rollup_input_columns = ['mdate', 'nom', 'nbvelos', 'nbelec', 'nbclassiq', 'nbplaces']
+
+# Sommes accumulées par (station, heure)
+rollup_sum_columns = [
+    'observations', 'occupancy_sum', 'bikes_sum', 'elec_sum', 'classic_sum',
+    'observed_seconds', 'empty_seconds', 'full_seconds', 'turnover',
+]
+
+#-----------------------------------------------------#
+#                     Functions                       #
+#-----------------------------------------------------#
+
+# Sources en blocs dans l'ordre chronologique : cache Feather trié (lu par memory-map), ou partitions journalières
+# (le CSV n'est pas forcément trié : il n'est lu qu'à travers le cache, trié par ingest_csv ; seules les lignes
+#  postérieures à after sont lues, les précédentes ne sont même pas parcourues)
+def iter_cache_chunks(chunksize=chunk_rows, after=None):
+    """Yield VCub rows from the sorted Feather cache in bounded chunks (optionally only rows after a time)"""
+    table = feather.read_table(ensure_cache(), columns=rollup_input_columns, memory_map=True)
+    first = 0 if after is None else first_row_after(table.column('mdate'), after)
+    for start in range(first, table.num_rows, chunksize):
+        yield table.slice(start, chunksize).to_pandas()
+
+# Première ligne postérieure à un instant dans une colonne triée : recherche bloc par bloc
+# (seul le dernier relevé des blocs précédents et le bloc contenant l'instant sont lus)
+def first_row_after(column, after):
+    """Index of the first row of a sorted timestamp column strictly later than after"""
+    offset = 0
+    after = np.datetime64(pd.Timestamp(after).asm8)
+    for chunk in column.chunks:
+        if len(chunk) and np.datetime64(chunk[len(chunk) - 1].value, chunk.type.unit) > after:
+            values = chunk.to_numpy().astype('datetime64[ns]')
+            return offset + int(np.searchsorted(values, after, side='right'))
+        offset += len(chunk)
+    return offset
+
+def iter_partition_days(root=vcub_partition_root, after=None):
+    """Yield one expanded day partition at a time (optionally only days after a date)"""
+    for date in sorted(partition_dates(root)):
+        if after is None or date >= after:
+            yield read_partition(root, date)[rollup_input_columns]
+
+# Agrégation en continu : seul un bloc et le dernier relevé de chaque station sont en mémoire
+class RollupEngine:
+    """Streaming per-station / per-hour VCub rollups with incremental updates"""
+
+    def __init__(self, sums=None, carry=None):
+        self.sums = sums if sums is not None else pd.DataFrame(
+            columns=rollup_sum_columns, index=pd.MultiIndex.from_arrays([[], []], names=['nom', 'hour'])
+        ).astype('float64')
+        self.carry = carry if carry is not None else pd.DataFrame(columns=rollup_input_columns)
+
+    # Relevé le plus récent intégré (journée à partir de laquelle relire les partitions lors d'une reprise)
+    @property
+    def watermark(self):
+        return self.carry['mdate'].max() if len(self.carry) else None
+
+    # Relevés postérieurs au dernier relevé intégré de leur station (reprise depuis un état sauvegardé)
+    def unseen(self, chunk):
+        """Rows of the chunk newer than their station's carried reading"""
+        if not len(self.carry):
+            return chunk
+        last = self.carry.set_index(self.carry['nom'].astype(str))['mdate']
+        carried = chunk['nom'].astype(str).map(last)
+        return chunk[carried.isna().to_numpy() | (chunk['mdate'] > carried).to_numpy()]
+
+    def update(self, chunk):
+        """Fold one chunk of VCub rows into the rollups (chunks in chronological order per station)"""
+        chunk = chunk[rollup_input_columns].copy()
+        chunk['nom'] = chunk['nom'].astype(str)
+        if chunk.empty:
+            return self
+
+        # Un relevé antérieur ou égal au dernier relevé intégré de sa station fausserait les intervalles
+        if len(self.carry):
+            last = self.carry.set_index('nom')['mdate']
+            first = chunk.groupby('nom')['mdate'].min()
+            late = first[first <= last.reindex(first.index)]
+            if len(late):
+                raise ValueError(
+                    f"Relevés non chronologiques pour {len(late)} station(s) (ex. {late.index[0]} à {late.iloc[0]})"
+                )
+
+        # Le dernier relevé connu de chaque station ouvre l'intervalle avec le premier relevé du bloc
+        rows = chunk.assign(carried=False)
+        if len(self.carry):
+            rows = pd.concat([self.carry.assign(carried=True), rows], ignore_index=True)
+        rows = rows.sort_values(['nom', 'mdate'], kind='stable').reset_index(drop=True)
+        rows['carried'] = rows['carried'].astype(bool)
+        for col in ['nbvelos', 'nbelec', 'nbclassiq', 'nbplaces']:
+            rows[col] = rows[col].astype('float64')
+
+        # Intervalle jusqu'au relevé suivant de la même station, attribué à l'état du relevé courant
+        following = rows.groupby('nom', sort=False)[['mdate', 'nbvelos']].shift(-1)
+        seconds = (following['mdate'] - rows['mdate']).dt.total_seconds()
+        seconds = seconds.where(seconds <= max_gap_seconds, 0).fillna(0)
+        capacity = rows['nbvelos'] + rows['nbplaces']
+
+        rows['hour'] = rows['mdate'].dt.hour
+        contributions = pd.DataFrame({
+            'nom': rows['nom'],
+            'hour': rows['hour'],
+            # Les sommes « par relevé » ne comptent que les nouveaux relevés (le relevé reporté est déjà compté)
+            'observations': (~rows['carried']).astype('float64'),
+            'occupancy_sum': (rows['nbvelos'] / capacity.where(capacity > 0)).fillna(0).where(~rows['carried'], 0),
+            'bikes_sum': rows['nbvelos'].where(~rows['carried'], 0),
+            'elec_sum': rows['nbelec'].where(~rows['carried'], 0),
+            'classic_sum': rows['nbclassiq'].where(~rows['carried'], 0),
+            # Les durées et la rotation portent sur l'intervalle qui suit chaque relevé, reporté compris
+            'observed_seconds': seconds,
+            'empty_seconds': seconds.where(rows['nbvelos'] == 0, 0),
+            'full_seconds': seconds.where(rows['nbplaces'] == 0, 0),
+            'turnover': (following['nbvelos'] - rows['nbvelos']).abs().fillna(0),
+        })
+        partial = contributions.groupby(['nom', 'hour']).sum()
+        self.sums = self.sums.add(partial, fill_value=0)
+
+        # Report du dernier relevé de chaque station pour le bloc suivant
+        self.carry = rows.groupby('nom', sort=False).tail(1)[rollup_input_columns].reset_index(drop=True)
+        return self
+
+    # Indicateurs par station : taux d'occupation, durées vide / pleine, part électrique, rotation
+    def station_rollup(self):
+        """Per-station indicators"""
+        return derive_indicators(self.sums.groupby(level='nom').sum())
+
+    # Indicateurs par heure de la journée, toutes stations confondues
+    def hourly_rollup(self):
+        """Per-hour indicators"""
+        return derive_indicators(self.sums.groupby(level='hour').sum())
+
+    def save(self, path=rollup_path, carry_path=rollup_carry_path):
+        """Materialize sums and carry rows to small Feather files"""
+        feather.write_feather(self.sums.reset_index(), path)
+        feather.write_feather(compact_types(self.carry.copy()), carry_path)
+
+    @classmethod
+    def load(cls, path=rollup_path, carry_path=rollup_carry_path):
+        """Load materialized rollups, or an empty engine"""
+        if not (os.path.exists(path) and os.path.exists(carry_path)):
+            return cls()
+        sums = feather.read_feather(path).set_index(['nom', 'hour'])
+        carry = feather.read_feather(carry_path)
+        carry['nom'] = carry['nom'].astype(str)
+        return cls(sums, carry)
+
+# Ratios calculés à partir des sommes (une seule fois, après agrégation)
+def derive_indicators(sums):
+    """Turn accumulated sums into readable indicators"""
+    observed = sums['observed_seconds'].where(sums['observed_seconds'] > 0)
+    return pd.DataFrame({
+        'observations': sums['observations'].astype('int64'),
+        'occupancy_rate': sums['occupancy_sum'] / sums['observations'].where(sums['observations'] > 0),
+        'empty_hours': sums['empty_seconds'] / 3600,
+        'full_hours': sums['full_seconds'] / 3600,
+        'empty_share': sums['empty_seconds'] / observed,
+        'full_share': sums['full_seconds'] / observed,
+        'elec_share': sums['elec_sum'] / (sums['elec_sum'] + sums['classic_sum']).where(lambda total: total > 0),
+        'turnover_per_hour': sums['turnover'] / (observed / 3600),
+    })
+
+# Mise à jour incrémentale des agrégats matérialisés depuis les partitions (ou, à défaut, le cache trié du CSV)
+# (reprise au dernier relevé intégré : journées suivantes des partitions, lignes suivantes du cache trié)
+def refresh_rollups(path=rollup_path, carry_path=rollup_carry_path):
+    """Fold new VCub rows into the materialized rollups and return the engine"""
+    engine = RollupEngine.load(path, carry_path)
+    # Reprise : seuls les relevés postérieurs au dernier relevé sauvegardé de chaque station sont intégrés
+    resumed = RollupEngine(carry=engine.carry)
+    watermark = engine.watermark
+    if partition_dates(vcub_partition_root):
+        chunks = iter_partition_days(after=watermark.date() if watermark is not None else None)
+    else:
+        chunks = iter_cache_chunks(after=watermark)
+    for chunk in chunks:
+        engine.update(resumed.unseen(chunk))
+    engine.save(path, carry_path)
+    return engine
+
+if __name__ == '__main__':
+    # Usage : python vcub_analytics.py          (mise à jour incrémentale des agrégats)
+    #         python vcub_analytics.py --rebuild (recalcul complet)
+    if '--rebuild' in sys.argv[1:]:
+        for stale in (rollup_path, rollup_carry_path):
+            if os.path.exists(stale):
+                os.remove(stale)
+    engine = refresh_rollups()
+    print(engine.hourly_rollup().round(3).to_string())
@@ -0,0 +1,185 @@
+
+#-----------------------------------------------------#
+#                      Imports                        #
+#-----------------------------------------------------#
+
+import os                                               # Écriture atomique des fichiers de partition
+import sys                                              # Arguments de la ligne de commande
+import json                                             # Lecture du flux des stations
+import time                                             # Intervalle entre deux relevés
+import urllib.request                                   # Interrogation du flux des stations
+import pandas as pd                                     # Manipulation des bases de données
+import pyarrow.feather as feather                       # Fichiers de partition colonne (Feather)
+from dotenv import load_dotenv                          # URL du flux dans le .env
+from vcub_data import (                                 # Types compacts et organisation des partitions
+    compact_types, partition_path, partition_dates, read_changes, vcub_csv_path, vcub_partition_root,
+)
+
+#-----------------------------------------------------#
+#                   Global Variables                  #
+#-----------------------------------------------------#
+
+# Colonnes d'un relevé de station et colonnes comparées pour détecter un changement
+station_columns = ['mdate', 'nom', 'etat', 'latitude', 'longitude', 'nbvelos', 'nbelec', 'nbclassiq', 'nbplaces']
+state_columns = ['etat', 'nbvelos', 'nbelec', 'nbclassiq', 'nbplaces']
+
+#-----------------------------------------------------#
+#                      Sources                        #
+#-----------------------------------------------------#
+
+# Flux temps réel des stations (API JSON type OpenDataSoft : une liste d'enregistrements)
+class HttpStationSource:
+    """Poll a JSON station feed and return one snapshot per call"""
+
+    def __init__(self, url, timeout=30):
+        self.url = url
+        self.timeout = timeout
+
+    def fetch(self):
+        """Return the current snapshot as a DataFrame"""
+        with urllib.request.urlopen(self.url, timeout=self.timeout) as response:
+            payload = json.load(response)
+        records = payload.get('results') or [record.get('fields', record) for record in payload.get('records', [])]
+        data = pd.DataFrame(records)
+
+        # Coordonnées fournies sous forme de point géographique
+        if 'geo_point_2d' in data and 'latitude' not in data:
+            points = data.pop('geo_point_2d')
+            data['latitude'] = [p['lat'] if isinstance(p, dict) else p[0] for p in points]
+            data['longitude'] = [p['lon'] if isinstance(p, dict) else p[1] for p in points]
+
+        # Heure du relevé : celle du flux si présente, sinon l'heure de l'interrogation
+        data['mdate'] = pd.to_datetime(data['mdate']) if 'mdate' in data else pd.Timestamp.now()
+        return data[[col for col in station_columns if col in data]]
+
+# Rejeu d'un fichier de relevés existant (ex. stations_VCube.csv) : un instantané par appel
+class FixtureReplaySource:
+    """Replay recorded snapshots in chronological order"""
+
+    def __init__(self, csv_path=vcub_csv_path):
+        data = pd.read_csv(csv_path, parse_dates=['mdate'])
+        data = data[[col for col in station_columns if col in data]]
+        self._snapshots = iter([group for _, group in data.groupby('mdate', sort=True)])
+
+    def fetch(self):
+        """Return the next recorded snapshot, or None when exhausted"""
+        return next(self._snapshots, None)
+
+#-----------------------------------------------------#
+#                     Collecteur                      #
+#-----------------------------------------------------#
+
+# Écriture en ajout seul : chaque relevé produit un nouveau fichier, jamais de réécriture
+class PartitionWriter:
+    """Append changed station rows into day-partitioned Feather files"""
+
+    def __init__(self, root=vcub_partition_root):
+        self.root = root
+        self._last_state = None
+        self.last_date = None
+
+        # Reprise après redémarrage : dernier état connu de chaque station dans la partition la plus récente
+        dates = sorted(partition_dates(root))
+        if dates:
+            changes = read_changes(root, dates[-1])
+            if not changes.empty:
+                self._last_state = self._state(changes.groupby('nom', observed=True).tail(1))
+                self.last_date = dates[-1]
+
+    # État comparable d'un relevé, indexé par station
+    @staticmethod
+    def _state(snapshot):
+        state = snapshot.set_index(snapshot['nom'].astype(str))[state_columns]
+        return state.astype({'etat': str})
+
+    # Lignes à écrire : relevé complet au premier relevé de la journée, sinon stations modifiées seulement
+    def changed_rows(self, snapshot):
+        """Rows of the snapshot whose station state changed"""
+        snapshot = snapshot.drop_duplicates(subset=['nom'], keep='last')
+        date = snapshot['mdate'].iloc[0].date()
+        if self._last_state is None or date != self.last_date:
+            return snapshot
+        current = self._state(snapshot)
+        previous = self._last_state.reindex(current.index)
+        changed = (current.ne(previous) & ~(current.isna() & previous.isna())).any(axis=1)
+        return snapshot[changed.to_numpy()]
+
+    def write(self, snapshot):
+        """Write the changed rows of one snapshot and return how many were written"""
+        if snapshot is None or snapshot.empty:
+            return 0
+        rows = self.changed_rows(snapshot)
+        date = snapshot['mdate'].iloc[0].date()
+
+        # Mise à jour de l'état connu (stations absentes du relevé : dernier état conservé)
+        current = self._state(snapshot.drop_duplicates(subset=['nom'], keep='last'))
+        if self._last_state is None or date != self.last_date:
+            self._last_state = current
+        else:
+            self._last_state = pd.concat([self._last_state.drop(current.index, errors='ignore'), current])
+        self.last_date = date
+
+        if rows.empty:
+            return 0
+        directory = partition_path(self.root, date)
+        os.makedirs(directory, exist_ok=True)
+        stamp = snapshot['mdate'].iloc[0].strftime('%H%M%S')
+        write_atomic(compact_types(rows.reset_index(drop=True)), os.path.join(directory, f'part-{stamp}.feather'))
+        return len(rows)
+
+# Écriture dans un fichier temporaire puis renommage : un lecteur ne voit jamais un fichier partiel
+def write_atomic(data, path):
+    """Write a Feather file atomically"""
+    tmp_path = f'{path}.tmp'
+    feather.write_feather(data, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, path)
+
+# Compactage d'une journée : un seul fichier trié, doublons et relevés sans changement supprimés
+def compact_partition(root, date):
+    """Merge the part files of one day into a single deduplicated file"""
+    directory = partition_path(root, date)
+    parts = sorted(name for name in os.listdir(directory) if name.startswith('part-') and name.endswith('.feather'))
+    if not parts:
+        return 0
+    changes = read_changes(root, date).drop_duplicates(subset=['mdate', 'nom'], keep='last')
+    changes['nom'] = changes['nom'].astype(str)
+
+    # Une ligne identique à la précédente pour la même station n'apporte rien
+    previous = changes.groupby('nom')[state_columns].shift()
+    current = changes[state_columns]
+    unchanged = (current.eq(previous) | (current.isna() & previous.isna())).all(axis=1)
+    changes = changes[~unchanged.to_numpy()]
+
+    write_atomic(compact_types(changes.reset_index(drop=True)), os.path.join(directory, 'compacted.feather'))
+    for name in parts:
+        os.remove(os.path.join(directory, name))
+    return len(changes)
+
+# Boucle de collecte : un relevé par intervalle, compactage des journées terminées
+def collect(source, writer, interval=60, iterations=None):
+    """Poll the source on a schedule and append changes to the partitions"""
+    count = 0
+    while iterations is None or count < iterations:
+        snapshot = source.fetch()
+        if snapshot is None:
+            break
+        previous_date = writer.last_date
+        written = writer.write(snapshot)
+        print(f"{snapshot['mdate'].iloc[0]} : {written} station(s) modifiée(s)")
+
+        # Changement de jour : la journée précédente ne recevra plus de données
+        if previous_date is not None and previous_date != writer.last_date:
+            compact_partition(writer.root, previous_date)
+        count += 1
+        if interval:
+            time.sleep(interval)
+
+if __name__ == '__main__':
+    # Usage : python vcub_collector.py [intervalle_s]        (flux défini par vcub_feed_url dans le .env)
+    #         python vcub_collector.py --replay [fichier.csv] (rejeu d'un fichier de relevés)
+    load_dotenv()
+    args = sys.argv[1:]
+    if args and args[0] == '--replay':
+        collect(FixtureReplaySource(*args[1:2]), PartitionWriter(), interval=0)
+    else:
+        collect(HttpStationSource(os.getenv("vcub_feed_url")), PartitionWriter(), interval=int(args[0]) if args else 60)
@@ -0,0 +1,369 @@
+
+#-----------------------------------------------------#
+#                      Imports                        #
+#-----------------------------------------------------#
+
+import os                                               # Vérification de la fraîcheur du cache binaire
+import tempfile                                         # Fichiers intermédiaires de la conversion du CSV
+import datetime                                         # Dates des partitions journalières
+import threading                                        # Verrou du cache des journées (store partagé)
+from collections import OrderedDict                     # Cache LRU des journées chargées
+import numpy as np                                      # Détection des ruptures entre instantanés
+import pandas as pd                                     # Manipulation des bases de données
+import pyarrow as pa                                    # Métadonnées du cache (version de la source)
+import pyarrow.feather as feather                       # Cache colonne binaire (Arrow IPC / Feather)
+from babel.dates import format_date                     # Formater les dates
+
+#-----------------------------------------------------#
+#                   Global Variables                  #
+#-----------------------------------------------------#
+
+# Fichier source et cache binaire colonne des relevés VCub
+vcub_csv_path = './Data/stations_VCube.csv'
+vcub_cache_path = './Data/stations_VCube.feather'
+
+# Nombre de lignes du CSV lues à la fois lors de la conversion
+ingest_chunk_rows = 500_000
+
+# Dossier racine des partitions journalières alimentées par le collecteur (vcub_collector.py)
+vcub_partition_root = './Data/vcub'
+
+# Types compacts des colonnes connues du relevé VCub
+vcub_category_columns = ['nom', 'etat']
+vcub_count_columns = ['nbvelos', 'nbelec', 'nbclassiq', 'nbplaces']
+vcub_coordinate_columns = ['latitude', 'longitude']
+
+#-----------------------------------------------------#
+#                     Functions                       #
+#-----------------------------------------------------#
+
+# Conversion unique du CSV en fichier colonne typé (catégories, petits entiers, float32)
+# (lecture par blocs et tri journée par journée : la mémoire utilisée ne dépend pas de la taille du CSV)
+def ingest_csv(csv_path=vcub_csv_path, cache_path=vcub_cache_path, chunksize=ingest_chunk_rows):
+    """Convert stations_VCube.csv into a typed, uncompressed Feather file sorted by time"""
+    # Version relevée avant la lecture : un CSV modifié pendant la conversion sera reconverti au prochain appel
+    version = file_version(csv_path)
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(cache_path) or '.', prefix='.ingest-') as spill:
+        # Passe 1 : chaque bloc du CSV est réparti en fichiers temporaires par journée ; on relève au passage
+        # les valeurs des colonnes catégorielles, les compteurs incomplets et le schéma de chaque bloc
+        categories = {col: set() for col in vcub_category_columns}
+        nullable, schemas, days = set(), [], set()
+        for index, chunk in enumerate(pd.read_csv(csv_path, parse_dates=['mdate'], chunksize=chunksize)):
+            for col in vcub_category_columns:
+                if col in chunk:
+                    categories[col].update(chunk[col].dropna().astype(str).unique())
+            nullable.update(col for col in vcub_count_columns if col in chunk and chunk[col].hasnans)
+            schemas.append(pa.Schema.from_pandas(chunk, preserve_index=False))
+            for day, rows in chunk.groupby(chunk['mdate'].dt.date):
+                days.add(day)
+                rows.reset_index(drop=True).to_feather(os.path.join(spill, f'{day.isoformat()}-{index:06d}.feather'))
+
+        # Passe 2 : journées dans l'ordre chronologique, chacune triée puis ajoutée au fichier final
+        # (mêmes catégories et mêmes types pour toutes les journées : un seul schéma pour tout le fichier)
+        categories = {col: sorted(values) for col, values in categories.items()}
+        unified = pa.unify_schemas(schemas, promote_options='permissive') if schemas else None
+        spill_files = sorted(os.listdir(spill))
+        tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            writer = None
+            for day in sorted(days):
+                names = [name for name in spill_files if name.startswith(day.isoformat())]
+                data = pd.concat([pd.read_feather(os.path.join(spill, name)) for name in names], ignore_index=True)
+                data = data.sort_values('mdate', kind='stable').reset_index(drop=True)
+                table = pa.Table.from_pandas(compact_types(data, categories, nullable), preserve_index=False)
+                if writer is None:
+                    schema = cache_schema(table.schema, unified, version)
+                    writer = pa.ipc.new_file(sink, schema)
+                writer.write_table(table.cast(schema))
+            if writer is None:
+                # CSV sans relevé : fichier vide avec les colonnes du CSV
+                empty = compact_types(pd.read_csv(csv_path, parse_dates=['mdate'], nrows=0), categories, nullable)
+                table = pa.Table.from_pandas(empty, preserve_index=False)
+                writer = pa.ipc.new_file(sink, cache_schema(table.schema, None, version))
+                writer.write_table(table.cast(writer.schema))
+            writer.close()
+    # Sans compression pour permettre la lecture par memory-map ; fichier temporaire puis remplacement atomique
+    # (les processus qui ont mappé l'ancien fichier continuent de le lire, jamais un fichier à moitié écrit)
+    os.replace(tmp_path, cache_path)
+    return cache_path
+
+# Schéma du cache : types compacts des colonnes connues, types unifiés sur tous les blocs pour les autres colonnes,
+# et version du CSV source dans les métadonnées
+def cache_schema(schema, unified, version):
+    """Arrow schema of the Feather cache"""
+    typed = ['mdate'] + vcub_category_columns + vcub_count_columns + vcub_coordinate_columns
+    fields = [
+        unified.field(field.name) if unified is not None and field.name not in typed else field for field in schema
+    ]
+    return pa.schema(fields, metadata={**(schema.metadata or {}), b'source_version': version.encode()})
+
+# Réduction des types : catégories pour le texte répétitif, int16 pour les compteurs, float32 pour les coordonnées
+# (catégories et compteurs incomplets imposés pour produire le même schéma sur plusieurs blocs)
+def compact_types(data, categories=None, nullable=None):
+    """Downcast VCub columns to compact dtypes"""
+    for col in vcub_category_columns:
+        if col in data:
+            if categories is None:
+                data[col] = data[col].astype('category')
+            else:
+                data[col] = pd.Categorical(data[col].map(str, na_action='ignore'), categories=categories[col])
+    for col in vcub_count_columns:
+        if col in data:
+            missing = data[col].hasnans if nullable is None else col in nullable
+            data[col] = data[col].astype('Int16' if missing else 'int16')
+    for col in vcub_coordinate_columns:
+        if col in data:
+            data[col] = data[col].astype('float32')
+    return data
+
+# Ajout des colonnes heure et date formatée, calculées sur les valeurs uniques seulement
+def add_time_columns(data):
+    """Add 'time' (HH:MM) and French 'formatted_date' as categoricals"""
+    # Heure : code minute du jour (0..1439) vers les 1440 libellés 'HH:MM'
+    minute_of_day = (data['mdate'].dt.hour * 60 + data['mdate'].dt.minute).to_numpy()
+    time_labels = [f'{minute // 60:02d}:{minute % 60:02d}' for minute in range(24 * 60)]
+    data['time'] = pd.Categorical.from_codes(minute_of_day, categories=time_labels)
+
+    # Date : formatage babel une fois par jour distinct au lieu d'une fois par ligne
+    day_codes, days = pd.factorize(data['mdate'].dt.normalize())
+    date_labels = [format_date(day, 'EEEE d MMMM y', locale='fr') for day in days]
+    data['formatted_date'] = pd.Categorical.from_codes(day_codes, categories=date_labels)
+    return data
+
+# Version d'un fichier : change dès que le fichier est remplacé ou modifié (aucune lecture du contenu)
+def file_version(path):
+    """Version string of a file (modification time and size)"""
+    stat = os.stat(path)
+    return f'{stat.st_mtime_ns:x}-{stat.st_size:x}'
+
+# Version des relevés VCub : celle du CSV source, ou du cache binaire s'il est déployé seul
+def vcub_data_version(csv_path=vcub_csv_path, cache_path=vcub_cache_path):
+    """Version string of the VCub readings"""
+    return file_version(csv_path if os.path.exists(csv_path) else cache_path)
+
+# Version du CSV dont le cache est issu (métadonnées du schéma : aucune donnée lue), None si inconnue
+def cache_source_version(cache_path=vcub_cache_path):
+    """Source file version recorded in the Feather cache"""
+    try:
+        with pa.memory_map(cache_path) as source:
+            metadata = pa.ipc.open_file(source).schema.metadata or {}
+    except (FileNotFoundError, pa.ArrowInvalid):
+        return None
+    return metadata.get(b'source_version', b'').decode() or None
+
+# Cache binaire trié, reconstruit s'il est absent ou s'il n'est pas issu de la version actuelle du CSV
+# (comparaison de version et non de dates : un CSV remplacé par un fichier plus ancien est aussi reconverti)
+def ensure_cache(csv_path=vcub_csv_path, cache_path=vcub_cache_path):
+    """Path of an up-to-date Feather cache of the CSV"""
+    if not os.path.exists(cache_path) or (
+        os.path.exists(csv_path) and cache_source_version(cache_path) != file_version(csv_path)
+    ):
+        ingest_csv(csv_path, cache_path)
+    return cache_path
+
+# Chargement du relevé VCub depuis le cache binaire (reconstruit si le CSV a changé)
+def load_vcub_frame(csv_path=vcub_csv_path, cache_path=vcub_cache_path):
+    """Load VCub data memory-mapped from the Feather cache"""
+    table = feather.read_table(ensure_cache(csv_path, cache_path), memory_map=True)
+    # split_blocks : les colonnes numériques sans valeur manquante sont lues sans copie
+    data = table.to_pandas(split_blocks=True)
+    return add_time_columns(data)
+
+# Index des instantanés VCub par (date, heure) construit une seule fois au chargement
+class SnapshotStore:
+    """VCub data indexed by (date, 'HH:MM') snapshot key"""
+
+    def __init__(self, data):
+        # Tri par date pour que chaque instantané occupe un bloc contigu de lignes (déjà trié depuis le cache)
+        if not data['mdate'].is_monotonic_increasing:
+            data = data.sort_values('mdate', kind='stable').reset_index(drop=True)
+        self.data = data
+
+        # Repérage des ruptures de minute : chaque bloc [start, stop) est un instantané
+        minutes = data['mdate'].dt.floor('min').to_numpy()
+        starts = np.flatnonzero(np.r_[True, minutes[1:] != minutes[:-1]]) if len(data) else np.array([], dtype=int)
+        stops = np.append(starts[1:], len(data))
+
+        # Première ligne de chaque instantané : seules ces lignes servent à construire les clés
+        first_rows = data.iloc[starts]
+        first_dates = first_rows['mdate'].dt.date.tolist()
+        first_times = first_rows['time'].astype(str).tolist()
+        self._slices = {
+            (date, time): slice(int(start), int(stop))
+            for date, time, start, stop in zip(first_dates, first_times, starts, stops)
+        }
+
+        # Bloc contigu et heures de chaque journée (premier instantané -> dernier instantané du jour)
+        self._days = {}
+        self._day_times = {}
+        for (date, time), rows in self._slices.items():
+            first = self._days.get(date, rows)
+            self._days[date] = slice(first.start, rows.stop)
+            self._day_times.setdefault(date, []).append(time)
+
+        # Listes triées des dates (avec leur libellé) et des heures disponibles
+        labels = dict(zip(first_dates, first_rows['formatted_date'].astype(str).tolist()))
+        self.dates = sorted(labels.items())
+        self.times = sorted(set(first_times))
+
+    def __len__(self):
+        return len(self._slices)
+
+    def __contains__(self, key):
+        return key in self._slices
+
+    # Récupération d'un instantané : vue sur les lignes, sans copie
+    def snapshot(self, date, time):
+        """Return the rows of one (date, time) snapshot, empty if absent"""
+        rows = self._slices.get((date, time))
+        if rows is None:
+            return self.data.iloc[0:0]
+        return self.data.iloc[rows]
+
+    # Récupération d'une journée complète : vue sur les lignes, sans copie
+    def day(self, date):
+        """Return all rows of one date, empty if absent"""
+        rows = self._days.get(date)
+        if rows is None:
+            return self.data.iloc[0:0]
+        return self.data.iloc[rows]
+
+    # Heures disponibles pour une date donnée
+    def times_for(self, date):
+        """Sorted 'HH:MM' times of one date"""
+        return self._day_times.get(date, [])
+
+    def keys(self):
+        """Sorted (date, time) snapshot keys"""
+        return list(self._slices)
+
+# Relevés VCub partitionnés par jour : seules les journées consultées sont lues (et gardées en mémoire)
+# (les partitions alimentées par le collecteur pendant que le store est utilisé sont prises en compte)
+class PartitionedSnapshotStore:
+    """SnapshotStore-compatible view over day partitions, loaded on demand"""
+
+    def __init__(self, root=vcub_partition_root, max_days=4):
+        self.root = root
+        self.max_days = max_days
+        self._loaded = OrderedDict()
+        self._lock = threading.Lock()
+        self._listing = None
+        self._dates = []
+
+    # Liste des dates à partir des seuls noms de dossiers (aucune lecture de données),
+    # relue quand le dossier racine change (nouvelle journée créée par le collecteur)
+    @property
+    def dates(self):
+        """Sorted (date, French label) pairs of the partitions"""
+        listing = os.stat(self.root).st_mtime_ns if os.path.isdir(self.root) else None
+        if listing != self._listing:
+            days = sorted(partition_dates(self.root))
+            self._dates = [(day, format_date(day, 'EEEE d MMMM y', locale='fr')) for day in days]
+            self._listing = listing
+        return self._dates
+
+    # Journée indexée, lue depuis sa partition puis gardée dans un petit cache LRU
+    # (relue quand les fichiers de la partition changent : nouveaux relevés du jour, compactage)
+    def day_store(self, date):
+        """SnapshotStore of one date partition"""
+        version = partition_version(self.root, date)
+        # Store partagé entre les sessions : accès au cache protégé par un verrou
+        with self._lock:
+            entry = self._loaded.get(date)
+            if entry is not None and entry[0] == version:
+                self._loaded.move_to_end(date)
+                return entry[1]
+            store = SnapshotStore(add_time_columns(read_partition(self.root, date)))
+            self._loaded[date] = (version, store)
+            self._loaded.move_to_end(date)
+            if len(self._loaded) > self.max_days:
+                self._loaded.popitem(last=False)
+            return store
+
+    def snapshot(self, date, time):
+        """Return the rows of one (date, time) snapshot, empty if absent"""
+        return self.day_store(date).snapshot(date, time)
+
+    def day(self, date):
+        """Return all rows of one date, empty if absent"""
+        return self.day_store(date).day(date)
+
+    def times_for(self, date):
+        """Sorted 'HH:MM' times of one date"""
+        return self.day_store(date).times_for(date)
+
+    def keys(self):
+        """Sorted (date, time) snapshot keys (reads every partition)"""
+        return [(date, time) for date, _ in self.dates for time in self.times_for(date)]
+
+#-----------------------------------------------------#
+#               Partitions journalières               #
+#-----------------------------------------------------#
+
+# Dossier d'une journée (ex. ./Data/vcub/date=2023-07-14)
+def partition_path(root, date):
+    """Directory of one day partition"""
+    return os.path.join(root, f'date={date.isoformat()}')
+
+# Dates disponibles d'après les dossiers de partition
+def partition_dates(root):
+    """Dates that have a partition directory"""
+    if not os.path.isdir(root):
+        return []
+    return [
+        datetime.date.fromisoformat(name.split('=', 1)[1])
+        for name in os.listdir(root) if name.startswith('date=')
+    ]
+
+# Version d'une journée : date de modification de son dossier, qui change à chaque fichier ajouté, renommé ou supprimé
+# (les fichiers de partition ne sont jamais réécrits en place : écriture atomique par renommage)
+def partition_version(root, date):
+    """Version string of one day partition, None if absent"""
+    directory = partition_path(root, date)
+    return f'{os.stat(directory).st_mtime_ns:x}' if os.path.isdir(directory) else None
+
+# Version de l'ensemble des partitions : nombre de journées, journée la plus récente et version de cette journée
+def partitions_version(root=vcub_partition_root):
+    """Version string of the day partitions, None if there are none"""
+    dates = partition_dates(root)
+    if not dates:
+        return None
+    newest = max(dates)
+    return f'{len(dates)}-{newest.isoformat()}-{partition_version(root, newest)}'
+
+# Lecture des seuls changements d'une journée (tous les fichiers de la partition)
+def read_changes(root, date, attempts=3):
+    """Concatenate the change rows of one day partition"""
+    directory = partition_path(root, date)
+    for attempt in range(attempts):
+        files = sorted(name for name in os.listdir(directory) if name.endswith('.feather')) if os.path.isdir(directory) else []
+        if not files:
+            return pd.DataFrame(columns=['mdate', 'nom'])
+        try:
+            parts = [feather.read_feather(os.path.join(directory, name), memory_map=True) for name in files]
+        except FileNotFoundError:
+            # Fichiers supprimés par un compactage pendant la lecture : nouvelle liste des fichiers
+            if attempt == attempts - 1:
+                raise
+            continue
+        return pd.concat(parts, ignore_index=True).sort_values('mdate', kind='stable')
+
+# Reconstitution des instantanés complets d'une journée à partir des changements
+# (le premier relevé de chaque journée est écrit en entier, les suivants ne contiennent que les stations modifiées)
+def read_partition(root, date):
+    """Expand one day of change rows into full per-minute snapshots"""
+    changes = read_changes(root, date)
+    if changes.empty:
+        return changes.assign(mdate=pd.to_datetime(changes['mdate']))
+    changes = changes.drop_duplicates(subset=['mdate', 'nom'], keep='last')
+    changes['nom'] = changes['nom'].astype(str)
+
+    # Grille relevé x station : chaque station garde son dernier état connu
+    value_columns = [col for col in changes.columns if col not in ('mdate', 'nom')]
+    grid = changes.set_index(['mdate', 'nom'])[value_columns].unstack('nom').ffill()
+    full = grid.stack('nom', dropna=True).reset_index()
+    return compact_types(full.sort_values('mdate', kind='stable').reset_index(drop=True))
+
+if __name__ == '__main__':
+    # Conversion ponctuelle : python vcub_data.py
+    print(f"Cache VCub écrit : {ingest_csv()}")
@@ -0,0 +1,151 @@
+
+#-----------------------------------------------------#
+#                      Imports                        #
+#-----------------------------------------------------#
+
+import numpy as np                                      # Matrices station x instantané et différences vectorisées
+import pandas as pd                                     # Construction des matrices et résultats des comparaisons
+
+#-----------------------------------------------------#
+#                   Global Variables                  #
+#-----------------------------------------------------#
+
+# Compteurs conservés dans la matrice (une matrice int16 par compteur)
+diff_count_columns = ['nbvelos', 'nbplaces', 'nbelec']
+
+# Valeur d'une station pas encore relevée à un instant donné
+missing = -1
+
+#-----------------------------------------------------#
+#                     Functions                       #
+#-----------------------------------------------------#
+
+# Matrice instantané x station : chaque comparaison est une soustraction de deux lignes
+class StationMatrix:
+    """Compact (snapshot x station) arrays of VCub counts and states"""
+
+    def __init__(self, keys, stations, latitude, longitude, counts, etat_codes, etats):
+        self.keys = keys                                # Clés (date, 'HH:MM') triées, une par ligne
+        self.stations = stations                        # Noms des stations, une par colonne
+        self.latitude = latitude
+        self.longitude = longitude
+        self.counts = counts                            # {compteur: ndarray int16 (instantanés, stations)}
+        self.etat_codes = etat_codes                    # ndarray int8 (instantanés, stations)
+        self.etats = etats                              # Libellés des codes d'état
+        self._rows = {key: row for row, key in enumerate(keys)}
+
+    # Construction depuis les relevés (une ou plusieurs journées) : dernier état connu reporté sur les instantanés suivants
+    @classmethod
+    def from_frame(cls, data):
+        """Build the matrix from VCub rows (mdate, nom, etat, coordinates, counts)"""
+        minutes = data['mdate'].dt.floor('min')
+        row, unique_minutes = pd.factorize(minutes, sort=True)
+        col, stations = pd.factorize(data['nom'].astype(str), sort=True)
+        etat_col, etats = pd.factorize(data['etat'].astype(str), sort=True)
+        shape = (len(unique_minutes), len(stations))
+
+        def matrix(values, dtype):
+            grid = np.full(shape, np.nan)
+            grid[row, col] = values
+            filled = pd.DataFrame(grid).ffill().fillna(missing).to_numpy()
+            return filled.astype(dtype)
+
+        counts = {name: matrix(data[name].astype('float64').to_numpy(), 'int16') for name in diff_count_columns}
+        etat_codes = matrix(etat_col.astype('float64'), 'int8')
+
+        # Dernière position connue de chaque station
+        last = pd.DataFrame({'col': col, 'lat': data['latitude'].to_numpy(), 'lon': data['longitude'].to_numpy()})
+        last = last.groupby('col').last().reindex(range(len(stations)))
+
+        keys = [(minute.date(), minute.strftime('%H:%M')) for minute in unique_minutes]
+        return cls(
+            keys, np.asarray(stations), last['lat'].to_numpy('float64'), last['lon'].to_numpy('float64'),
+            counts, etat_codes, list(etats),
+        )
+
+    def __len__(self):
+        return len(self.keys)
+
+    def row(self, key):
+        """Row of a (date, 'HH:MM') key (KeyError if absent)"""
+        return self._rows[tuple(key)]
+
+    # Variations par station entre deux instants : une soustraction de deux lignes par compteur
+    def diff(self, before, after, changed_only=True):
+        """Per-station deltas, empty/full flips and state changes from one key to another"""
+        i0, i1 = self.row(before), self.row(after)
+        bikes0, bikes1 = self.counts['nbvelos'][i0], self.counts['nbvelos'][i1]
+        docks0, docks1 = self.counts['nbplaces'][i0], self.counts['nbplaces'][i1]
+        elec0, elec1 = self.counts['nbelec'][i0], self.counts['nbelec'][i1]
+        etat0, etat1 = self.etat_codes[i0], self.etat_codes[i1]
+
+        # Stations relevées aux deux instants seulement
+        known = (bikes0 != missing) & (bikes1 != missing)
+        result = pd.DataFrame({
+            'nom': self.stations,
+            'latitude': self.latitude,
+            'longitude': self.longitude,
+            'nbvelos_avant': bikes0,
+            'nbvelos_apres': bikes1,
+            'delta_velos': bikes1.astype('int32') - bikes0,
+            'delta_places': docks1.astype('int32') - docks0,
+            'delta_elec': elec1.astype('int32') - elec0,
+            'devenue_vide': (bikes0 > 0) & (bikes1 == 0),
+            'devenue_pleine': (docks0 > 0) & (docks1 == 0),
+            'plus_vide': (bikes0 == 0) & (bikes1 > 0),
+            'plus_pleine': (docks0 == 0) & (docks1 > 0),
+            'etat_avant': np.asarray(self.etats + ['?'], dtype=object)[etat0],
+            'etat_apres': np.asarray(self.etats + ['?'], dtype=object)[etat1],
+        })[known]
+        result['changement_etat'] = result['etat_avant'] != result['etat_apres']
+        if changed_only:
+            changed = (
+                (result['delta_velos'] != 0) | (result['delta_places'] != 0) | (result['delta_elec'] != 0)
+                | result['changement_etat']
+            )
+            result = result[changed]
+        return result.sort_values('delta_velos', key=np.abs, ascending=False).reset_index(drop=True)
+
+    # Variations sur une fenêtre glissante de window instantanés : une soustraction de matrices décalées
+    def rolling_deltas(self, window, column='nbvelos'):
+        """(snapshots - window, stations) array of count changes over each window"""
+        values = self.counts[column].astype('int32')
+        deltas = values[window:] - values[:-window]
+        deltas[(values[window:] == missing) | (values[:-window] == missing)] = 0
+        return deltas
+
+    # Variations absolues entre instantanés consécutifs (0 si la station n'est pas relevée)
+    def _steps(self, column):
+        values = self.counts[column].astype('int32')
+        steps = np.abs(np.diff(values, axis=0))
+        steps[(values[1:] == missing) | (values[:-1] == missing)] = 0
+        return steps
+
+    # Activité sur une fenêtre : somme des variations absolues, par différence de sommes cumulées
+    def rolling_activity(self, window, column='nbvelos'):
+        """(snapshots - window, stations) array of absolute movements over each window"""
+        steps = self._steps(column)
+        cumulated = np.vstack([np.zeros((1, steps.shape[1]), dtype='int64'), steps.cumsum(axis=0)])
+        return cumulated[window:] - cumulated[:-window]
+
+    # Stations les plus actives sur la fenêtre qui se termine à un instant donné
+    def hotspots(self, key, window, top=15):
+        """Most active stations over the window of snapshots ending at key"""
+        end = self.row(key)
+        start = max(0, end - window)
+        activity = self._steps('nbvelos')[start:end].sum(axis=0)
+        bikes = self.counts['nbvelos']
+        change = np.where((bikes[end] == missing) | (bikes[start] == missing), 0,
+                          bikes[end].astype('int32') - bikes[start])
+        order = np.argsort(-activity, kind='stable')[:top]
+        return pd.DataFrame({
+            'nom': self.stations[order],
+            'mouvements': activity[order],
+            'delta_velos': change[order],
+        })
+
+# Matrice des journées demandées (SnapshotStore ou PartitionedSnapshotStore : seules ces journées sont lues)
+def station_matrix(store, dates):
+    """StationMatrix over the given dates of a snapshot store"""
+    days = [store.day(date) for date in sorted(set(dates))]
+    return StationMatrix.from_frame(pd.concat(days, ignore_index=True) if len(days) > 1 else days[0])
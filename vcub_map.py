@@ -0,0 +1,488 @@
+
+#-----------------------------------------------------#
+#                      Imports                        #
+#-----------------------------------------------------#
+
+import numpy as np                                      # Encodage différentiel des comptages
+import pandas as pd                                     # Matrice heure x station d'une journée
+import folium                                           # Afficher le choix de carte Folium
+from branca.element import MacroElement                 # Couche GeoJSON des stations VCub stylée côté navigateur
+from jinja2 import Template                             # Gabarit JavaScript de la couche des stations VCub
+
+#-----------------------------------------------------#
+#                   Global Variables                  #
+#-----------------------------------------------------#
+
+# Couleur des stations VCub en fonction de leur état
+etat_color_map = {
+    'CONNECTEE': '#E37222',
+    'MAINTENANCE': '#0A8A9F',
+    'DECONNECTEE': 'red'
+}
+
+# Colonnes des stations VCub transmises au navigateur comme propriétés GeoJSON
+v3_properties = ['nom', 'etat', 'nbplaces', 'nbvelos', 'nbelec', 'nbclassiq']
+
+# Mode agrégé : zooms précalculés et taille d'une cellule de la grille à l'écran (pixels)
+grid_zooms = [10, 11, 12, 13, 14, 15, 16]
+grid_cell_px = 64
+
+# Demi-circonférence de la projection Web Mercator (m)
+mercator_extent = 20037508.342789244
+
+#-----------------------------------------------------#
+#                     Functions                       #
+#-----------------------------------------------------#
+
+# Couche GeoJSON des stations VCub : le style et les popups sont construits par Leaflet à partir des propriétés
+class StationsLayer(MacroElement):
+    """VCub stations as a single client-side styled GeoJSON layer"""
+    _template = Template(u"""
+        {% macro script(this, kwargs) %}
+            var {{ this.get_name() }} = L.geoJson({{ this.data if this.data is string else this.data|tojson }}, {
+                pointToLayer: function(feature, latlng) {
+                    var p = feature.properties;
+                    var popup_text = `
+                        <div style="font-size:12px">
+                        <h4 style="color:${p.color};margin-bottom:0">${p.nom}</h4>
+                        <p style="margin-bottom:0"><b>État:</b> ${p.etat}</p>
+                        <p style="margin-bottom:0"><b>Places disponible:</b> ${p.nbplaces}</p>
+                        <p style="margin-bottom:0"><b>Vélos disponible:</b> ${p.nbvelos}</p>
+                        <p style="margin-bottom:0"><b>Vélos électriques:</b> ${p.nbelec}</p>
+                        <p style="margin-bottom:0"><b>Vélos classiques:</b> ${p.nbclassiq}</p>
+                        </div>`;
+                    return L.circleMarker(latlng, {
+                        color: p.color,
+                        fill: {{ this.fill|tojson }},
+                        fillColor: p.color,
+                        radius: p.radius,
+                        weight: 1
+                    }).bindPopup(popup_text, {maxWidth: 250});
+                }
+            }).addTo({{ this._parent.get_name() }});
+        {% endmacro %}
+    """)
+
+    # data : FeatureCollection (dict) ou texte JSON déjà sérialisé (artefact de vcub_precompute.py, inséré tel quel)
+    def __init__(self, data, fill=False):
+        super().__init__()
+        self._name = 'StationsLayer'
+        self.data = data
+        self.fill = fill
+
+# Construction de la FeatureCollection des stations en une seule passe vectorisée
+def build_v3_geojson(filtered_data):
+    """Build V3 stations FeatureCollection"""
+    if filtered_data.empty:
+        return {'type': 'FeatureCollection', 'features': []}
+
+    # Couleur depuis l'état et rayon depuis le nombre de VCub disponible, calculés sur toute la colonne
+    # (coordonnées float32 du cache arrondies pour éviter des décimales parasites dans le JSON)
+    properties = filtered_data[v3_properties].copy()
+    properties['color'] = filtered_data['etat'].astype(str).map(etat_color_map).fillna('gray')
+    properties['radius'] = filtered_data['nbvelos'] * 1.5
+
+    features = [
+        {
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': [longitude, latitude]},
+            'properties': props
+        }
+        for longitude, latitude, props in zip(
+            filtered_data['longitude'].astype('float64').round(6).tolist(),
+            filtered_data['latitude'].astype('float64').round(6).tolist(),
+            properties.to_dict('records')
+        )
+    ]
+    return {'type': 'FeatureCollection', 'features': features}
+
+# Coordonnées Web Mercator (m) : les cellules de la grille correspondent à des carrés de pixels à l'écran
+def mercator_xy(longitude, latitude):
+    """Project WGS84 arrays to Web Mercator metres"""
+    x = np.asarray(longitude, dtype='float64') * mercator_extent / 180.0
+    y = np.log(np.tan((90.0 + np.asarray(latitude, dtype='float64')) * np.pi / 360.0)) * mercator_extent / np.pi
+    return x, y
+
+# Agrégation des stations par cellule de grille pour un zoom : sommes des vélos et places, position moyenne
+def aggregate_grid(filtered_data, zoom, cell_px=grid_cell_px):
+    """Sum VCub counts per grid cell of cell_px pixels at a zoom level"""
+    cell_m = 2 * mercator_extent / (256 * 2 ** zoom) * cell_px
+    x, y = mercator_xy(filtered_data['longitude'], filtered_data['latitude'])
+    cells = pd.DataFrame({
+        'cx': np.floor(x / cell_m).astype('int64'),
+        'cy': np.floor(y / cell_m).astype('int64'),
+        'latitude': filtered_data['latitude'].astype('float64').to_numpy(),
+        'longitude': filtered_data['longitude'].astype('float64').to_numpy(),
+        'nbvelos': filtered_data['nbvelos'].astype('float64').to_numpy(),
+        'nbplaces': filtered_data['nbplaces'].astype('float64').to_numpy(),
+        'nbelec': filtered_data['nbelec'].astype('float64').to_numpy(),
+    })
+    return cells.groupby(['cx', 'cy'], sort=False).agg(
+        stations=('nbvelos', 'size'),
+        latitude=('latitude', 'mean'),
+        longitude=('longitude', 'mean'),
+        nbvelos=('nbvelos', 'sum'),
+        nbplaces=('nbplaces', 'sum'),
+        nbelec=('nbelec', 'sum'),
+    ).reset_index(drop=True)
+
+# Grille précalculée pour tous les zooms d'un instantané (colonnes compactes : une liste par propriété)
+# (le nombre de cellules dépend de l'emprise couverte, pas du nombre de stations)
+def build_grid_levels(filtered_data, zooms=grid_zooms):
+    """Aggregated cells of one snapshot for every zoom level"""
+    levels = {}
+    for zoom in zooms:
+        cells = aggregate_grid(filtered_data, zoom) if not filtered_data.empty else pd.DataFrame(
+            columns=['stations', 'latitude', 'longitude', 'nbvelos', 'nbplaces', 'nbelec']
+        )
+        levels[str(zoom)] = {
+            'lat': cells['latitude'].round(6).tolist(),
+            'lon': cells['longitude'].round(6).tolist(),
+            'stations': cells['stations'].astype('int64').tolist(),
+            'nbvelos': cells['nbvelos'].astype('int64').tolist(),
+            'nbplaces': cells['nbplaces'].astype('int64').tolist(),
+            'nbelec': cells['nbelec'].astype('int64').tolist(),
+        }
+    return {'zooms': list(zooms), 'levels': levels}
+
+# Couche agrégée : le navigateur affiche le niveau de grille du zoom courant (aucun aller-retour serveur)
+class GridLayer(MacroElement):
+    """Zoom-dependent aggregated VCub cells drawn as circle markers"""
+    _template = Template(u"""
+        {% macro script(this, kwargs) %}
+            var {{ this.get_name() }} = (function(map, grid) {
+                var group = L.layerGroup().addTo(map);
+                function level_for(zoom) {
+                    var chosen = grid.zooms[0];
+                    grid.zooms.forEach(function(z) { if (z <= zoom) { chosen = z; } });
+                    return grid.levels[String(chosen)];
+                }
+                function draw() {
+                    group.clearLayers();
+                    var level = level_for(map.getZoom());
+                    for (var i = 0; i < level.lat.length; i++) {
+                        var bikes = level.nbvelos[i], docks = level.nbplaces[i];
+                        var rate = bikes + docks > 0 ? bikes / (bikes + docks) : 0;
+                        var color = rate < 0.1 ? 'red' : (rate < 0.33 ? '#E37222' : '#8cc43d');
+                        var popup_text = `
+                            <div style="font-size:12px">
+                            <h4 style="color:${color};margin-bottom:0">${level.stations[i]} station(s)</h4>
+                            <p style="margin-bottom:0"><b>Places disponible:</b> ${docks}</p>
+                            <p style="margin-bottom:0"><b>Vélos disponible:</b> ${bikes}</p>
+                            <p style="margin-bottom:0"><b>Vélos électriques:</b> ${level.nbelec[i]}</p>
+                            <p style="margin-bottom:0"><b>Vélos classiques:</b> ${bikes - level.nbelec[i]}</p>
+                            </div>`;
+                        L.circleMarker([level.lat[i], level.lon[i]], {
+                            color: color,
+                            fill: true,
+                            fillColor: color,
+                            fillOpacity: 0.5,
+                            radius: Math.min(30, 4 + 2 * Math.sqrt(bikes)),
+                            weight: 1
+                        }).bindPopup(popup_text, {maxWidth: 250}).addTo(group);
+                    }
+                }
+                map.on('zoomend', draw);
+                draw();
+                return group;
+            })({{ this._parent.get_name() }}, {{ this.grid|tojson }});
+        {% endmacro %}
+    """)
+
+    def __init__(self, grid):
+        super().__init__()
+        self._name = 'GridLayer'
+        self.grid = grid
+
+# Création de la carte pour la 2ème presentation
+def create_v3_map(filtered_data, selected_tile, mode='geojson', grid=None, geojson=None):
+    """Create V3 map ('geojson': single layer, 'markers': one CircleMarker per station, 'grid': aggregated cells)"""
+    # Creating a folium map with specified location, zoom and tile style
+    m = folium.Map(
+        location=[44.8378, -0.5792],
+        zoom_start=13,
+        tiles=selected_tile,
+        attr='Map data © OpenStreetMap contributors'
+    )
+
+    # Affichage de la carte jour / nuit en fonction de l'heure choisis
+    fill = True if selected_tile in ['Stamen Toner', 'OpenStreetMap'] else False
+
+    # Mode agrégé : grille précalculée par zoom (fournie par le cache de l'application, sinon calculée ici)
+    if mode == 'grid':
+        GridLayer(grid if grid is not None else build_grid_levels(filtered_data)).add_to(m)
+        return m
+
+    # Mode par défaut : une seule couche GeoJSON stylée côté navigateur (pré-rendue si l'artefact est fourni)
+    if mode == 'geojson':
+        StationsLayer(geojson if geojson is not None else build_v3_geojson(filtered_data), fill=fill).add_to(m)
+        return m
+
+    # Mode historique : iteration à travers les données filtré et ajout des marqueur de cercle sur la carte
+    for index, row in filtered_data.iterrows():
+
+        # Extraction des informations pertinente
+        nom = row['nom']  # Nom de station
+        nbvelos = row['nbvelos']  # Nombre de VCub disponible
+        latitude = row['latitude']  # Latitude de la station
+        longitude = row['longitude']  # Longitude dela station
+        etat = row['etat']  # Status de la station 
+        nbelec = row['nbelec']  # Nombre de VCub electrique
+        nbclassiq = row['nbclassiq']  # Nombre de VCub classique
+        nbplaces = row['nbplaces']  # Nombre de place disponible
+
+        # Determiner la couleur basé en fonction du status de la station
+        color = etat_color_map.get(etat, 'gray')
+
+        # Determiner la grosseur du rayon de cercle basé sur le nombre de VCub disponible
+        radius = nbvelos * 1.5
+
+        fill_color = color if fill else None
+
+        # Creatiion du text des Popups
+        popup_text = f"""
+        <div style="font-size:12px">
+        <h4 style="color:{color};margin-bottom:0">{nom}</h4>
+        <p style="margin-bottom:0"><b>État:</b> {etat}</p>
+        <p style="margin-bottom:0"><b>Places disponible:</b> {nbplaces}</p>
+        <p style="margin-bottom:0"><b>Vélos disponible:</b> {nbvelos}</p>
+        <p style="margin-bottom:0"><b>Vélos électriques:</b> {nbelec}</p>
+        <p style="margin-bottom:0"><b>Vélos classiques:</b> {nbclassiq}</p>
+        </div>
+        """
+        popup = folium.Popup(popup_text, max_width=250)  # Creating a popup with the text
+
+        # Creation des marqueurs et ajout à la carte
+        marker = folium.CircleMarker(
+            location=[latitude, longitude], 
+            color=color, 
+            fill=fill, 
+            fill_color=fill_color,
+            radius=radius,
+            weight=1,
+            popup=popup  # Adding the popup to the marker
+        )
+        marker.add_to(m)  # Adding the marker to the map
+
+    return m  # Returning the map object
+
+# Encodage compact d'une journée : état initial puis, pour chaque heure, seulement les stations qui changent
+def build_day_playback(day_data):
+    """Delta-encode one day of VCub snapshots for client-side playback"""
+    if day_data.empty:
+        return {'times': [], 'stations': [], 'etats': [], 'initial': [], 'initial_etat': [], 'deltas': [], 'etat_changes': []}
+
+    # Matrice heure x station des vélos disponibles et des codes d'état (dernière valeur connue si absente)
+    etats = list(etat_color_map)
+    day_data = day_data.assign(
+        time=day_data['time'].astype(str),
+        nom=day_data['nom'].astype(str),
+        etat_code=pd.Categorical(day_data['etat'].astype(str), categories=etats).codes,
+    )
+    counts = day_data.pivot_table(index='time', columns='nom', values='nbvelos', aggfunc='last')
+    etat_codes = day_data.pivot_table(index='time', columns='nom', values='etat_code', aggfunc='last')
+    etat_codes = etat_codes.reindex_like(counts)
+    times = counts.index.tolist()
+    counts = counts.ffill().bfill().fillna(0).to_numpy(dtype='int16')
+    etat_codes = etat_codes.ffill().bfill().fillna(-1).to_numpy(dtype='int8')
+
+    # Coordonnées de chaque station (arrondies, comme la couche GeoJSON)
+    stations = day_data.groupby('nom', sort=True)[['latitude', 'longitude']].first()
+    stations = [
+        [nom, round(float(latitude), 6), round(float(longitude), 6)]
+        for nom, latitude, longitude in stations.itertuples()
+    ]
+
+    return {
+        'times': times,
+        'stations': stations,
+        'etats': [[etat, etat_color_map[etat]] for etat in etats],
+        'initial': counts[0].tolist(),
+        'initial_etat': etat_codes[0].tolist(),
+        'deltas': sparse_deltas(np.diff(counts, axis=0)),
+        'etat_changes': sparse_deltas(etat_codes[1:], changed=etat_codes[1:] != etat_codes[:-1]),
+    }
+
+# Pour chaque pas de temps : liste aplatie [station, valeur, station, valeur, ...] des cellules modifiées
+def sparse_deltas(values, changed=None):
+    """Flatten non-zero (or changed) cells of a time x station matrix per time step"""
+    changed = values != 0 if changed is None else changed
+    steps, stations = np.nonzero(changed)
+    bounds = np.searchsorted(steps, np.arange(len(values) + 1))
+    pairs = np.column_stack((stations, values[steps, stations])).astype('int64')
+    return [pairs[start:stop].ravel().tolist() for start, stop in zip(bounds[:-1], bounds[1:])]
+
+# Couche de lecture animée : toute la journée est envoyée une fois, l'animation se fait dans le navigateur
+class PlaybackLayer(MacroElement):
+    """Client-side time slider over a delta-encoded day of VCub snapshots"""
+    _template = Template(u"""
+        {% macro script(this, kwargs) %}
+            (function() {
+                var data = {{ this.data|tojson }};
+                var map = {{ this._parent.get_name() }};
+                if (!data.times.length) { return; }
+
+                // Reconstruction des états successifs à partir des deltas
+                var counts = [data.initial.slice()], etats = [data.initial_etat.slice()];
+                for (var t = 0; t < data.deltas.length; t++) {
+                    var c = counts[t].slice(), e = etats[t].slice();
+                    var d = data.deltas[t], ec = data.etat_changes[t];
+                    for (var k = 0; k < d.length; k += 2) { c[d[k]] += d[k + 1]; }
+                    for (var k = 0; k < ec.length; k += 2) { e[ec[k]] = ec[k + 1]; }
+                    counts.push(c); etats.push(e);
+                }
+
+                var current = 0;
+                var color = function(code) { return code >= 0 ? data.etats[code][1] : 'gray'; };
+                var markers = data.stations.map(function(s, i) {
+                    return L.circleMarker([s[1], s[2]], {weight: 1, fill: {{ this.fill|tojson }}})
+                        .bindPopup(function() {
+                            var etat = etats[current][i] >= 0 ? data.etats[etats[current][i]][0] : '';
+                            return `<div style="font-size:12px">
+                                <h4 style="color:${color(etats[current][i])};margin-bottom:0">${s[0]}</h4>
+                                <p style="margin-bottom:0"><b>État:</b> ${etat}</p>
+                                <p style="margin-bottom:0"><b>Heure:</b> ${data.times[current]}</p>
+                                <p style="margin-bottom:0"><b>Vélos disponible:</b> ${counts[current][i]}</p>
+                                </div>`;
+                        }, {maxWidth: 250})
+                        .addTo(map);
+                });
+
+                // Contrôle : bouton lecture / pause, curseur et heure affichée
+                var control = L.control({position: 'bottomleft'});
+                control.onAdd = function() {
+                    var div = L.DomUtil.create('div', 'leaflet-bar');
+                    div.style.background = 'white';
+                    div.style.padding = '6px';
+                    div.innerHTML = '<button>▶</button> '
+                        + '<input type="range" min="0" max="' + (data.times.length - 1) + '" value="0" style="width:300px"> '
+                        + '<b></b>';
+                    L.DomEvent.disableClickPropagation(div);
+                    return div;
+                };
+                control.addTo(map);
+                var container = control.getContainer();
+                var button = container.querySelector('button');
+                var slider = container.querySelector('input');
+                var label = container.querySelector('b');
+
+                var show = function(t) {
+                    current = t;
+                    slider.value = t;
+                    label.innerHTML = data.times[t];
+                    markers.forEach(function(marker, i) {
+                        var c = color(etats[t][i]);
+                        marker.setStyle({color: c, fillColor: c});
+                        marker.setRadius(counts[t][i] * 1.5);
+                    });
+                };
+
+                var timer = null;
+                button.onclick = function() {
+                    if (timer) { clearInterval(timer); timer = null; button.innerHTML = '▶'; return; }
+                    button.innerHTML = '❚❚';
+                    timer = setInterval(function() { show((current + 1) % data.times.length); }, {{ this.interval }});
+                };
+                slider.oninput = function() { show(parseInt(slider.value)); };
+                show(0);
+            })();
+        {% endmacro %}
+    """)
+
+    def __init__(self, data, fill=False, interval=200):
+        super().__init__()
+        self._name = 'PlaybackLayer'
+        self.data = data
+        self.fill = fill
+        self.interval = interval
+
+# Carte de lecture animée d'une journée VCub
+def create_v3_playback_map(playback, selected_tile):
+    """Create the VCub map with a client-side playback of one day"""
+    m = folium.Map(
+        location=[44.8378, -0.5792],
+        zoom_start=13,
+        tiles=selected_tile,
+        attr='Map data © OpenStreetMap contributors'
+    )
+    PlaybackLayer(playback).add_to(m)
+    return m
+
+# Couleurs de la carte des variations : gain, perte, changement d'état sans variation du nombre de vélos
+diff_color_map = {'gain': '#8cc43d', 'perte': 'red', 'etat': '#0A8A9F'}
+
+# Stations modifiées entre deux instants (résultat de StationMatrix.diff) en FeatureCollection
+def build_diff_geojson(changes):
+    """Build the FeatureCollection of changed stations"""
+    if changes.empty:
+        return {'type': 'FeatureCollection', 'features': []}
+    delta = changes['delta_velos'].to_numpy()
+    properties = changes[['nom', 'nbvelos_avant', 'nbvelos_apres', 'delta_velos', 'etat_avant', 'etat_apres']].copy()
+    properties['color'] = np.where(delta > 0, diff_color_map['gain'],
+                                   np.where(delta < 0, diff_color_map['perte'], diff_color_map['etat']))
+    properties['radius'] = np.minimum(30, 4 + 2 * np.sqrt(np.abs(delta))).round(1)
+    # Passage à vide ou à plein : contour épais
+    properties['flip'] = np.select(
+        [changes['devenue_vide'], changes['devenue_pleine'], changes['plus_vide'], changes['plus_pleine']],
+        ['devenue vide', 'devenue pleine', 'n\'est plus vide', 'n\'est plus pleine'],
+        default='',
+    )
+    features = [
+        {
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': [longitude, latitude]},
+            'properties': props
+        }
+        for longitude, latitude, props in zip(
+            changes['longitude'].astype('float64').round(6).tolist(),
+            changes['latitude'].astype('float64').round(6).tolist(),
+            properties.to_dict('records')
+        )
+    ]
+    return {'type': 'FeatureCollection', 'features': features}
+
+# Couche des stations modifiées : seules ces stations sont envoyées au navigateur
+class DiffLayer(MacroElement):
+    """Changed VCub stations between two snapshots, coloured by gain or loss"""
+    _template = Template(u"""
+        {% macro script(this, kwargs) %}
+            var {{ this.get_name() }} = L.geoJson({{ this.data|tojson }}, {
+                pointToLayer: function(feature, latlng) {
+                    var p = feature.properties;
+                    var sign = p.delta_velos > 0 ? '+' : '';
+                    var popup_text = `
+                        <div style="font-size:12px">
+                        <h4 style="color:${p.color};margin-bottom:0">${p.nom}</h4>
+                        <p style="margin-bottom:0"><b>Vélos disponible:</b> ${p.nbvelos_avant} → ${p.nbvelos_apres} (${sign}${p.delta_velos})</p>
+                        <p style="margin-bottom:0"><b>État:</b> ${p.etat_avant} → ${p.etat_apres}</p>
+                        ${p.flip ? `<p style="margin-bottom:0"><b>Station ${p.flip}</b></p>` : ''}
+                        </div>`;
+                    return L.circleMarker(latlng, {
+                        color: p.flip ? '#000' : p.color,
+                        fill: true,
+                        fillColor: p.color,
+                        fillOpacity: 0.6,
+                        radius: p.radius,
+                        weight: p.flip ? 3 : 1
+                    }).bindPopup(popup_text, {maxWidth: 250});
+                }
+            }).addTo({{ this._parent.get_name() }});
+        {% endmacro %}
+    """)
+
+    def __init__(self, data):
+        super().__init__()
+        self._name = 'DiffLayer'
+        self.data = data
+
+# Carte des variations entre deux instants
+def create_v3_diff_map(changes, selected_tile):
+    """Create the VCub map showing only the stations that changed"""
+    m = folium.Map(
+        location=[44.8378, -0.5792],
+        zoom_start=13,
+        tiles=selected_tile,
+        attr='Map data © OpenStreetMap contributors'
+    )
+    DiffLayer(build_diff_geojson(changes)).add_to(m)
+    return m
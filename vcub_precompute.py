@@ -0,0 +1,183 @@
+
+#-----------------------------------------------------#
+#                      Imports                        #
+#-----------------------------------------------------#
+
+import os                                               # Arborescence des artefacts
+import sys                                              # Arguments de la ligne de commande
+import gzip                                             # Artefacts compressés
+import json                                             # Sérialisation des FeatureCollection
+import time                                             # Débit affiché pendant le calcul
+import argparse                                         # Options de la commande
+import datetime                                         # Dates des partitions d'artefacts
+from concurrent.futures import ProcessPoolExecutor, as_completed  # Rendu en parallèle, une journée par tâche
+from vcub_data import (                                 # Sources des instantanés VCub et leurs versions
+    SnapshotStore, PartitionedSnapshotStore, load_vcub_frame, partition_dates, partition_version, vcub_data_version,
+    vcub_partition_root,
+)
+from vcub_map import build_v3_geojson                   # FeatureCollection d'un instantané (même rendu que l'application)
+
+#-----------------------------------------------------#
+#                   Global Variables                  #
+#-----------------------------------------------------#
+
+# Dossier des artefacts (la version change quand le format des propriétés de build_v3_geojson change)
+artifact_version = 1
+artifact_root = f'./Data/vcub_artifacts/v{artifact_version}'
+
+# Version des données sources d'une journée, enregistrée à côté de ses artefacts
+manifest_name = 'source.json'
+
+# Store du processus de calcul (chargé une fois par processus du pool)
+_worker_store = None
+
+#-----------------------------------------------------#
+#                     Functions                       #
+#-----------------------------------------------------#
+
+# Artefact d'un instantané : ./Data/vcub_artifacts/v1/date=YYYY-MM-DD/HHMM.geojson.gz
+def artifact_path(root, date, time_):
+    """Path of the compressed GeoJSON artifact of one (date, 'HH:MM') snapshot"""
+    return os.path.join(root, f'date={date.isoformat()}', f"{time_.replace(':', '')}.geojson.gz")
+
+# Version des données d'une journée : dossier de sa partition, ou CSV source (toute correction invalide alors tout)
+def source_version(date, partition_root=vcub_partition_root):
+    """Version string of the source data of one date"""
+    if partition_dates(partition_root):
+        return partition_version(partition_root, date)
+    return vcub_data_version()
+
+# Version des données avec laquelle les artefacts d'une journée ont été rendus (None si inconnue)
+def read_manifest(root, date):
+    """Source version recorded for the artifacts of one date"""
+    try:
+        with open(os.path.join(root, f'date={date.isoformat()}', manifest_name), encoding='utf-8') as file:
+            return json.load(file)['source_version']
+    except (FileNotFoundError, KeyError, ValueError):
+        return None
+
+# Lecture d'un artefact pour l'application : texte JSON prêt à être inséré dans la carte, ou None
+# (None aussi si les données de la journée ont changé depuis le rendu : l'application construit alors la carte)
+def read_artifact(date, time_, root=artifact_root):
+    """Decompressed GeoJSON text of one snapshot, None if not precomputed or stale"""
+    if read_manifest(root, date) != source_version(date):
+        return None
+    try:
+        with gzip.open(artifact_path(root, date, time_), 'rt', encoding='utf-8') as file:
+            return file.read()
+    except FileNotFoundError:
+        return None
+
+# Instantanés déjà rendus (noms de fichiers seulement, aucune lecture)
+def rendered_keys(root=artifact_root):
+    """Set of (date, 'HH:MM') keys with an artifact on disk"""
+    keys = set()
+    if not os.path.isdir(root):
+        return keys
+    for name in os.listdir(root):
+        if not name.startswith('date='):
+            continue
+        date = datetime.date.fromisoformat(name[len('date='):])
+        for file_name in os.listdir(os.path.join(root, name)):
+            if file_name.endswith('.geojson.gz'):
+                keys.add((date, f'{file_name[:2]}:{file_name[2:4]}'))
+    return keys
+
+# Store des relevés : partitions du collecteur si présentes, sinon cache Feather (memory-map, partagé par le système)
+def open_store():
+    """Snapshot store used by the precompute job"""
+    if partition_dates(vcub_partition_root):
+        return PartitionedSnapshotStore(vcub_partition_root, max_days=1)
+    return SnapshotStore(load_vcub_frame())
+
+def _init_worker():
+    global _worker_store
+    _worker_store = open_store()
+
+# Tâche d'un processus du pool : rendu des instantanés d'une journée, écriture atomique de chaque artefact
+# (artefacts d'une version précédente des données supprimés avant d'enregistrer la nouvelle version)
+def render_day(root, date, times, version):
+    """Render and write the artifacts of one date, return how many were written"""
+    directory = os.path.join(root, f'date={date.isoformat()}')
+    if read_manifest(root, date) != version:
+        if os.path.isdir(directory):
+            for name in os.listdir(directory):
+                if name.endswith('.geojson.gz'):
+                    os.remove(os.path.join(directory, name))
+        os.makedirs(directory, exist_ok=True)
+        tmp_manifest = os.path.join(directory, f'{manifest_name}.tmp')
+        with open(tmp_manifest, 'w', encoding='utf-8') as file:
+            json.dump({'source_version': version}, file)
+        os.replace(tmp_manifest, os.path.join(directory, manifest_name))
+
+    for time_ in times:
+        data = json.dumps(build_v3_geojson(_worker_store.snapshot(date, time_)), separators=(',', ':'))
+        path = artifact_path(root, date, time_)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=6) as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+    return len(times)
+
+# Instantanés à rendre : sous-ensemble demandé, sans ceux déjà rendus (reprise) ou antérieurs au dernier rendu (incrémental)
+# (les journées dont les données ont changé depuis leur rendu sont entièrement rendues à nouveau)
+def pending_keys(store, root=artifact_root, dates=None, start=None, stop=None, incremental=False, force=False):
+    """({date: [times]} of the snapshots to render, {date: source version})"""
+    selected = [date for date, _ in store.dates if not dates or date in dates]
+    versions = {date: source_version(date) for date in selected}
+    stale = {date for date in selected if force or read_manifest(root, date) != versions[date]}
+    done = {key for key in rendered_keys(root) if key[0] in versions and key[0] not in stale}
+    watermark = max(done) if incremental and done else None
+    pending = {}
+    for date in selected:
+        if date not in stale and watermark is not None and date < watermark[0]:
+            continue
+        for time_ in store.times_for(date):
+            key = (date, time_)
+            if (start and time_ < start) or (stop and time_ > stop):
+                continue
+            if key in done or (date not in stale and watermark is not None and key <= watermark):
+                continue
+            pending.setdefault(date, []).append(time_)
+    return pending, versions
+
+# Rendu de tous les instantanés en attente avec un pool de processus (une tâche par journée)
+def precompute(root=artifact_root, workers=None, **selection):
+    """Render every pending snapshot artifact and report progress"""
+    pending, versions = pending_keys(open_store(), root, **selection)
+    total = sum(len(times) for times in pending.values())
+    print(f"{total} instantané(s) à rendre sur {len(pending)} journée(s)")
+    if not total:
+        return 0
+
+    written = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = {
+            pool.submit(render_day, root, date, times, versions[date]): date for date, times in pending.items()
+        }
+        for future in as_completed(futures):
+            written += future.result()
+            elapsed = time.perf_counter() - start
+            print(f"[{written}/{total}] {futures[future].isoformat()} terminé ({written / elapsed:.0f} instantanés/s)",
+                  flush=True)
+    return written
+
+if __name__ == '__main__':
+    # Usage : python vcub_precompute.py                       (tout rendre, reprise des artefacts existants)
+    #         python vcub_precompute.py --incremental         (seulement les relevés postérieurs au dernier rendu)
+    #         python vcub_precompute.py --dates 2023-07-14 --from 20:00 --to 23:59 --workers 4
+    #         python vcub_precompute.py --force               (tout re-rendre)
+    parser = argparse.ArgumentParser(description="Pré-rendu des instantanés VCub")
+    parser.add_argument('--dates', nargs='+', type=datetime.date.fromisoformat)
+    parser.add_argument('--from', dest='start', help="première heure (HH:MM)")
+    parser.add_argument('--to', dest='stop', help="dernière heure (HH:MM)")
+    parser.add_argument('--incremental', action='store_true')
+    parser.add_argument('--force', action='store_true')
+    parser.add_argument('--workers', type=int)
+    args = parser.parse_args(sys.argv[1:])
+    precompute(
+        workers=args.workers, dates=set(args.dates) if args.dates else None, start=args.start, stop=args.stop,
+        incremental=args.incremental, force=args.force,
+    )
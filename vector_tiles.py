@@ -0,0 +1,335 @@
+
+#-----------------------------------------------------#
+#                      Imports                        #
+#-----------------------------------------------------#
+
+import os                                               # Présence de l'archive et du fichier des lignes
+import sys                                              # Arguments de la ligne de commande
+import json                                             # Couleurs des véhicules transmises au JavaScript
+import math                                             # Calcul des tuiles (Web Mercator)
+import gzip                                             # Compression des tuiles (convention MBTiles)
+import sqlite3                                          # Archive de tuiles en un seul fichier (MBTiles)
+from contextlib import closing                          # Fermeture de la connexion de lecture des métadonnées
+import numpy as np                                      # Projection et sélection vectorisée des stations
+import geopandas as gpd                                 # Traiter les données Géospatial
+import shapely                                          # Découpage et simplification par tuile
+import mapbox_vector_tile                               # Encodage des tuiles vectorielles (MVT)
+import folium                                           # Couches Leaflet des cartes clientes
+from folium.elements import JSCSSMixin                  # Chargement du plugin Leaflet.VectorGrid
+from jinja2 import Template                             # Gabarit JavaScript des couches vectorielles
+from vcub_map import etat_color_map, v3_properties      # Style et popups des stations VCub
+from network_map import DelayControl, add_draw_control, file_digest, vehicle_color_map  # Carte réseau, empreinte
+from network_simplify import network_raw_path           # Fichier brut des lignes (version source de l'archive)
+
+#-----------------------------------------------------#
+#                   Global Variables                  #
+#-----------------------------------------------------#
+
+# Archive de tuiles locale (lignes du réseau + instantanés VCub)
+tile_archive_path = './Data/tiles.mbtiles'
+
+# Demi-étendue du monde en Web Mercator (EPSG:3857)
+mercator_extent = 20037508.342789244
+
+# Résolution interne d'une tuile MVT et marge de découpage (en unités de tuile)
+tile_extent = 4096
+tile_buffer = 64
+
+# Niveaux de zoom précalculés pour chaque jeu de données
+network_zooms = range(10, 17)
+stations_zooms = range(11, 17)
+
+# Propriétés des lignes conservées dans les tuiles (popups côté navigateur)
+network_properties = ['ligne_com', 'libelle', 'vehicule', 'retard', 'vitesse', 'nb_vehicule']
+
+#-----------------------------------------------------#
+#                     Functions                       #
+#-----------------------------------------------------#
+
+# Emprise Web Mercator d'une tuile (z, x, y) en schéma XYZ
+def tile_bounds(z, x, y):
+    """Return (minx, miny, maxx, maxy) of a tile in EPSG:3857"""
+    size = 2 * mercator_extent / 2 ** z
+    minx = -mercator_extent + x * size
+    maxy = mercator_extent - y * size
+    return minx, maxy - size, minx + size, maxy
+
+# Tuiles (x, y) couvrant une emprise Web Mercator au zoom z
+def tiles_for_bounds(bounds, z):
+    """Yield (x, y) tiles covering EPSG:3857 bounds at zoom z"""
+    size = 2 * mercator_extent / 2 ** z
+    last = 2 ** z - 1
+    minx, miny, maxx, maxy = bounds
+    x0 = max(0, int(math.floor((minx + mercator_extent) / size)))
+    x1 = min(last, int(math.floor((maxx + mercator_extent) / size)))
+    y0 = max(0, int(math.floor((mercator_extent - maxy) / size)))
+    y1 = min(last, int(math.floor((mercator_extent - miny) / size)))
+    for x in range(x0, x1 + 1):
+        for y in range(y0, y1 + 1):
+            yield x, y
+
+# Projection vectorisée longitude / latitude vers Web Mercator
+def lonlat_to_mercator(longitude, latitude):
+    """Project WGS84 arrays to EPSG:3857"""
+    x = np.radians(np.asarray(longitude, dtype='float64')) * 6378137.0
+    y = np.log(np.tan(np.pi / 4 + np.radians(np.asarray(latitude, dtype='float64')) / 2)) * 6378137.0
+    return x, y
+
+# Encodage d'une couche MVT à partir de géométries déjà découpées à l'emprise de la tuile
+def encode_layer(name, geometries, properties):
+    """Return an MVT layer dict, or None when no feature falls in the tile"""
+    features = [
+        {'geometry': geometry, 'properties': props}
+        for geometry, props in zip(geometries, properties)
+        if not geometry.is_empty
+    ]
+    return {'name': name, 'features': features} if features else None
+
+# Encodage d'une tuile complète (gzip) à partir de ses couches
+def encode_tile(layers, bounds):
+    """Return gzipped MVT bytes, or None for an empty tile"""
+    layers = [layer for layer in layers if layer is not None]
+    if not layers:
+        return None
+    data = mapbox_vector_tile.encode(
+        layers, default_options={'quantize_bounds': bounds, 'extents': tile_extent}
+    )
+    return gzip.compress(data)
+
+# Tuiles des lignes Bus, Tram et BatCub pour chaque zoom
+def network_tiles(gdf, zooms=network_zooms):
+    """Yield (z, x, y, data) tiles for the network lines"""
+    gdf = gdf.to_crs('EPSG:3857')
+    columns = [col for col in network_properties if col in gdf]
+    records = gdf[columns].to_dict('records')
+    geometries = gdf.geometry.values
+    tree = shapely.STRtree(geometries)
+
+    for z in zooms:
+        for x, y in tiles_for_bounds(gdf.total_bounds, z):
+            bounds = tile_bounds(z, x, y)
+            margin = (bounds[2] - bounds[0]) * tile_buffer / tile_extent
+            clip = (bounds[0] - margin, bounds[1] - margin, bounds[2] + margin, bounds[3] + margin)
+            idx = tree.query(shapely.box(*clip), predicate='intersects')
+            if not len(idx):
+                continue
+            clipped = shapely.clip_by_rect(geometries[idx], *clip)
+            clipped = shapely.simplify(clipped, (bounds[2] - bounds[0]) / tile_extent, preserve_topology=True)
+            layer = encode_layer('network', clipped, [records[i] for i in idx])
+            data = encode_tile([layer], bounds)
+            if data is not None:
+                yield z, x, y, data
+
+# Tuiles des stations VCub d'un instantané pour chaque zoom
+def station_tiles(snapshot, zooms=stations_zooms):
+    """Yield (z, x, y, data) tiles for one VCub snapshot"""
+    if snapshot.empty:
+        return
+    x_merc, y_merc = lonlat_to_mercator(snapshot['longitude'], snapshot['latitude'])
+    properties = snapshot[v3_properties].astype({'nom': str, 'etat': str}).to_dict('records')
+    for props in properties:
+        props['color'] = etat_color_map.get(props['etat'], 'gray')
+    bounds_all = (x_merc.min(), y_merc.min(), x_merc.max(), y_merc.max())
+
+    for z in zooms:
+        for x, y in tiles_for_bounds(bounds_all, z):
+            bounds = tile_bounds(z, x, y)
+            margin = (bounds[2] - bounds[0]) * tile_buffer / tile_extent
+            inside = np.flatnonzero(
+                (x_merc >= bounds[0] - margin) & (x_merc <= bounds[2] + margin)
+                & (y_merc >= bounds[1] - margin) & (y_merc <= bounds[3] + margin)
+            )
+            if not len(inside):
+                continue
+            points = shapely.points(x_merc[inside], y_merc[inside])
+            layer = encode_layer('stations', points, [properties[i] for i in inside])
+            data = encode_tile([layer], bounds)
+            if data is not None:
+                yield z, x, y, data
+
+# Clé texte d'un instantané dans l'archive et dans l'URL des tuiles (ex. 2023-07-14T20:04)
+def snapshot_key(date, time):
+    """Return the archive key of a (date, 'HH:MM') snapshot"""
+    return f'{date.isoformat()}T{time}'
+
+# Création de l'archive : table MBTiles standard pour le réseau, table dédiée pour les instantanés VCub
+# (source_version : empreinte du fichier des lignes, enregistrée dans metadata pour détecter une archive périmée)
+def build_tile_archive(gdf, store, archive_path=tile_archive_path, snapshot_keys=None, source_version=None):
+    """Write network and VCub snapshot tiles into one MBTiles file"""
+    connection = sqlite3.connect(archive_path)
+    with connection:
+        connection.executescript("""
+            DROP TABLE IF EXISTS metadata;
+            DROP TABLE IF EXISTS tiles;
+            DROP TABLE IF EXISTS snapshot_tiles;
+            CREATE TABLE metadata (name TEXT, value TEXT);
+            CREATE TABLE tiles (zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, tile_data BLOB);
+            CREATE UNIQUE INDEX tile_index ON tiles (zoom_level, tile_column, tile_row);
+            CREATE TABLE snapshot_tiles (snapshot TEXT, zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, tile_data BLOB);
+            CREATE UNIQUE INDEX snapshot_tile_index ON snapshot_tiles (snapshot, zoom_level, tile_column, tile_row);
+        """)
+        connection.executemany("INSERT INTO metadata VALUES (?, ?)", [
+            ('name', 'TBM'), ('format', 'pbf'), ('type', 'overlay'),
+            ('minzoom', str(min(network_zooms))), ('maxzoom', str(max(network_zooms))),
+        ] + ([('source_version', source_version)] if source_version is not None else []))
+
+        # Lignes du réseau (tile_row en schéma TMS, comme le veut MBTiles)
+        connection.executemany(
+            "INSERT INTO tiles VALUES (?, ?, ?, ?)",
+            ((z, x, 2 ** z - 1 - y, data) for z, x, y, data in network_tiles(gdf))
+        )
+
+        # Instantanés VCub (tous, ou seulement ceux demandés)
+        for date, time in snapshot_keys if snapshot_keys is not None else store.keys():
+            key = snapshot_key(date, time)
+            connection.executemany(
+                "INSERT INTO snapshot_tiles VALUES (?, ?, ?, ?, ?)",
+                ((key, z, x, 2 ** z - 1 - y, data) for z, x, y, data in station_tiles(store.snapshot(date, time)))
+            )
+    connection.close()
+    return archive_path
+
+# Version des lignes du réseau dont l'archive a été construite (None : archive absente, illisible ou sans version)
+def archive_source_version(archive_path=tile_archive_path):
+    """Source version recorded in the archive metadata"""
+    if not os.path.exists(archive_path):
+        return None
+    try:
+        with closing(sqlite3.connect(f'file:{archive_path}?mode=ro', uri=True)) as connection:
+            row = connection.execute("SELECT value FROM metadata WHERE name='source_version'").fetchone()
+    except sqlite3.Error:
+        return None
+    return row[0] if row else None
+
+# Archive à jour : construite à partir du fichier des lignes actuel (archive déployée seule : utilisée telle quelle)
+def tile_archive_is_current(archive_path=tile_archive_path, raw_path=network_raw_path):
+    """True when the archive was built from the current network lines file"""
+    if not os.path.exists(raw_path):
+        return os.path.exists(archive_path)
+    return archive_source_version(archive_path) == file_digest(raw_path)
+
+# Lecture d'une tuile depuis l'archive (y en schéma XYZ)
+def read_tile(connection, z, x, y, snapshot=None):
+    """Return gzipped tile bytes, or None if the tile is empty"""
+    row_y = 2 ** z - 1 - y
+    if snapshot is None:
+        row = connection.execute(
+            "SELECT tile_data FROM tiles WHERE zoom_level=? AND tile_column=? AND tile_row=?", (z, x, row_y)
+        ).fetchone()
+    else:
+        row = connection.execute(
+            "SELECT tile_data FROM snapshot_tiles WHERE snapshot=? AND zoom_level=? AND tile_column=? AND tile_row=?",
+            (snapshot, z, x, row_y)
+        ).fetchone()
+    return row[0] if row else None
+
+#-----------------------------------------------------#
+#                  Cartes clientes                    #
+#-----------------------------------------------------#
+
+# Couche Leaflet.VectorGrid : seules les tuiles visibles sont téléchargées depuis le serveur local
+class VectorTileLayer(JSCSSMixin, folium.MacroElement):
+    """Leaflet.VectorGrid protobuf layer with a JavaScript style and popup"""
+    _template = Template(u"""
+        {% macro script(this, kwargs) %}
+            var {{ this.get_name() }} = L.vectorGrid.protobuf({{ this.url|tojson }}, {
+                rendererFactory: L.canvas.tile,
+                interactive: true,
+                maxNativeZoom: {{ this.max_zoom }},
+                vectorTileLayerStyles: {
+                    {{ this.layer_name|tojson }}: function(p, zoom) { {{ this.style_js }} }
+                }
+            }).on('click', function(e) {
+                var p = e.layer.properties;
+                L.popup({maxWidth: 300}).setLatLng(e.latlng).setContent(`{{ this.popup_js }}`)
+                    .openOn({{ this._parent.get_name() }});
+            }).addTo({{ this._parent.get_name() }});
+            {% if this.registry %}
+            (window[{{ this.registry|tojson }}] = window[{{ this.registry|tojson }}] || []).push({{ this.get_name() }});
+            {% endif %}
+        {% endmacro %}
+    """)
+
+    default_js = [
+        ('leaflet_vectorgrid', 'https://unpkg.com/leaflet.vectorgrid@1.3.0/dist/Leaflet.VectorGrid.bundled.js'),
+    ]
+
+    def __init__(self, url, layer_name, style_js, popup_js, max_zoom, registry=None):
+        super().__init__()
+        self._name = 'VectorTileLayer'
+        self.url = url
+        self.layer_name = layer_name
+        self.style_js = style_js
+        self.popup_js = popup_js
+        self.max_zoom = max_zoom
+        self.registry = registry                        # Liste window[registry] des couches (redessinées par un contrôle)
+
+# Carte VCub cliente : les stations de l'instantané sont chargées tuile par tuile
+def create_v3_tile_map(tile_server_url, date, time, selected_tile):
+    """Create the VCub map as a thin client of the local tile server"""
+    m = folium.Map(
+        location=[44.8378, -0.5792],
+        zoom_start=13,
+        tiles=selected_tile,
+        attr='Map data © OpenStreetMap contributors'
+    )
+    VectorTileLayer(
+        f'{tile_server_url}/vcub/{snapshot_key(date, time)}/{{z}}/{{x}}/{{y}}.pbf',
+        'stations',
+        style_js="return {radius: p.nbvelos * 1.5, color: p.color, weight: 1, fill: false};",
+        popup_js="""<div style="font-size:12px">
+            <h4 style="color:${p.color};margin-bottom:0">${p.nom}</h4>
+            <p style="margin-bottom:0"><b>État:</b> ${p.etat}</p>
+            <p style="margin-bottom:0"><b>Places disponible:</b> ${p.nbplaces}</p>
+            <p style="margin-bottom:0"><b>Vélos disponible:</b> ${p.nbvelos}</p>
+            <p style="margin-bottom:0"><b>Vélos électriques:</b> ${p.nbelec}</p>
+            <p style="margin-bottom:0"><b>Vélos classiques:</b> ${p.nbclassiq}</p>
+            </div>""",
+        max_zoom=max(stations_zooms),
+    ).add_to(m)
+    return m
+
+# Carte Bus • Tram • BatCub cliente : lignes chargées tuile par tuile, retards en rouge au-delà du seuil
+# (même contrôle des retards que la carte GeoJSON : le style lit window.network_delay, la couche est redessinée ;
+#  late_lines : lignes en retard par seuil, network_delay.late_lines_by_threshold)
+def build_network_tile_map(tile_server_url, tile, retard_seuil=100, late_lines=None):
+    """Build the network map as a thin client of the local tile server"""
+    m = folium.Map((44.84101, -0.64265), tiles=None, zoom_start=12)
+    folium.TileLayer(tile, attr='© MapTiler © OpenStreetMap contributors', name='Dataviz Map').add_to(m)
+    colors = dict(vehicle_color_map, **{'default': '#8dc63f'})
+    VectorTileLayer(
+        f'{tile_server_url}/network/{{z}}/{{x}}/{{y}}.pbf',
+        'network',
+        style_js=(
+            f"var colors = {json.dumps(colors)};"
+            f" var delay = window.network_delay || {{enabled: true, threshold: {retard_seuil}}};"
+            " var late = delay.enabled && p.retard > delay.threshold;"
+            " return {color: late ? 'red' : (colors[p.vehicule] || colors['default']), weight: 2};"
+        ),
+        popup_js="""<div style="font-size:12px; padding:10px; min-width: 300px;">
+            <h4 style="margin-bottom:10px">${p.ligne_com}</h4>
+            <p style="margin-bottom:5px"><b>Terminus:</b> ${p.libelle}</p>
+            <p style="margin-bottom:5px"><b>Vehicule:</b> ${p.vehicule}</p>
+            <p style="margin-bottom:5px"><b>Retard Moyen:</b> ${(p.retard / 60).toFixed(2)} minutes</p>
+            <p style="margin-bottom:5px"><b>Vitesse Moyenne (km/h):</b> ${p.vitesse}</p>
+            <p style="margin-bottom:5px"><b>Nombre de véhicule/ligne:</b> ${p.nb_vehicule}</p>
+            </div>""",
+        max_zoom=max(network_zooms),
+        registry='network_tile_layers',
+    ).add_to(m)
+    DelayControl(retard_seuil, late_lines=late_lines).add_to(m)
+    add_draw_control(m)
+    return m
+
+if __name__ == '__main__':
+    # Usage : python vector_tiles.py [date heure ...]   (ex. 2023-07-14 20:04) — sans argument, tous les instantanés
+    from datetime import date as date_type
+    from vcub_data import SnapshotStore, load_vcub_frame
+
+    args = sys.argv[1:]
+    keys = [(date_type.fromisoformat(d), t) for d, t in zip(args[::2], args[1::2])] or None
+    path = build_tile_archive(
+        gpd.read_file(network_raw_path), SnapshotStore(load_vcub_frame()), snapshot_keys=keys,
+        source_version=file_digest(network_raw_path),
+    )
+    print(f"Archive de tuiles écrite : {path}")